@@ -1,11 +1,37 @@
-from flask import Flask, request, jsonify, session
+from flask import Flask, Response, request, jsonify, session, stream_with_context
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from functools import lru_cache
 from dotenv import load_dotenv
 import requests
 import psycopg2
+import psycopg2.extensions
+from psycopg2.extras import execute_values
+import threading
+import secrets
+import select
+import signal
+import socket
+import base64
+import csv
+import io
+import bisect
+import hashlib
+import html
+import json
+import multiprocessing
+import random
+import re
+import atexit
+import time
 import os
+import sys
 
 load_dotenv()
 
@@ -24,8 +50,205 @@ else:
 # DB_PASS = os.getenv("DB_PASS")
 # DB_PORT = "5432"
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = float(os.getenv("DB_POOL_PRE_PING", "30"))
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes available within the timeout"""
+
+class PooledConnection:
+    """
+    Thin proxy around a psycopg2 connection checked out of a ConnectionPool.
+    Everything is delegated to the real connection except close(), which hands
+    the connection back to the pool instead of tearing down the socket.
+    """
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._returned = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self, discard=False):
+        if not self._returned:
+            self._returned = True
+            self._pool.putconn(self._raw, discard=discard)
+
+class ConnectionPool:
+    """
+    Per-process pool of psycopg2 connections.
+
+    Connections are opened lazily up to `maxconn`. On checkout, connections that
+    are closed, older than `recycle` seconds, or that fail a `SELECT 1` pre-ping
+    after sitting idle for `pre_ping` seconds are transparently replaced. When the
+    pool is exhausted, callers wait up to `timeout` seconds before PoolTimeout.
+    """
+    def __init__(self, dsn, maxconn=10, timeout=10.0, recycle=1800.0, pre_ping=30.0):
+        self.dsn = dsn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self._cond = threading.Condition()
+        self._idle = []
+        self._created_at = {}
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._reconnects = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _connect(self):
+        raw = psycopg2.connect(self.dsn)
+        self._created_at[id(raw)] = time.monotonic()
+        return raw
+
+    def _discard(self, raw):
+        self._created_at.pop(id(raw), None)
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, raw, last_used):
+        if raw.closed:
+            return False
+        now = time.monotonic()
+        if self.recycle and now - self._created_at.get(id(raw), now) > self.recycle:
+            return False
+        if self.pre_ping is not None and now - last_used >= self.pre_ping:
+            try:
+                cur = raw.cursor()
+                cur.execute("SELECT 1")
+                cur.close()
+                raw.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    def getconn(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        entry = None
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._size < self.maxconn:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(f"No database connection available within {self.timeout}s")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            waited = time.monotonic() - start
+            self._in_use += 1
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+        try:
+            if entry is None:
+                raw = self._connect()
+            else:
+                raw, last_used = entry
+                if not self._is_usable(raw, last_used):
+                    self._discard(raw)
+                    raw = self._connect()
+                    with self._cond:
+                        self._reconnects += 1
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._size -= 1
+                self._cond.notify()
+            raise
+        return PooledConnection(self, raw)
+
+    def putconn(self, raw, discard=False):
+        if not discard and not raw.closed:
+            status = raw.get_transaction_status()
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                discard = True
+            elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    raw.rollback()
+                except psycopg2.Error:
+                    discard = True
+        with self._cond:
+            self._in_use -= 1
+            if discard or raw.closed:
+                self._size -= 1
+                self._discard(raw)
+            else:
+                self._idle.append((raw, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.getconn()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def closeall(self):
+        with self._cond:
+            for raw, _ in self._idle:
+                self._discard(raw)
+            self._size -= len(self._idle)
+            self._idle = []
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self._size,
+                'maxSize': self.maxconn,
+                'inUse': self._in_use,
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'reconnects': self._reconnects,
+                'totalWaitSeconds': round(self._total_wait, 6),
+                'avgWaitSeconds': round(self._total_wait / self._checkouts, 6) if self._checkouts else 0.0,
+                'maxWaitSeconds': round(self._max_wait, 6)
+            }
+
+_db_pool = None
+_db_pool_pid = None
+_db_pool_lock = threading.Lock()
+
+def get_db_pool():
+    """Return this worker's connection pool, creating it on first use (and again after a fork)"""
+    global _db_pool, _db_pool_pid
+    if _db_pool is None or _db_pool_pid != os.getpid():
+        with _db_pool_lock:
+            if _db_pool is None or _db_pool_pid != os.getpid():
+                _db_pool = ConnectionPool(
+                    os.getenv("DATABASE_URL"),
+                    maxconn=DB_POOL_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    recycle=DB_POOL_RECYCLE,
+                    pre_ping=DB_POOL_PRE_PING
+                )
+                _db_pool_pid = os.getpid()
+    return _db_pool
+
 def get_db_connection():
-    """Create and return a database connection"""
+    """Check out a pooled database connection; close() returns it to the pool"""
     # conn = psycopg2.connect(
     #     host=DB_HOST,
     #     database=DB_NAME,
@@ -33,21 +256,183 @@ def get_db_connection():
     #     password=DB_PASS,
     #     port=DB_PORT
     # )
-    conn = psycopg2.connect(os.getenv("DATABASE_URL"))
-    return conn
+    return get_db_pool().getconn()
+
+def db_connection():
+    """Context manager that checks out a pooled connection and always returns it"""
+    return get_db_pool().connection()
+
+@atexit.register
+def _close_db_pool():
+    if _db_pool is not None and _db_pool_pid == os.getpid():
+        _db_pool.closeall()
+
+USER_ID_CACHE_SIZE = int(os.getenv("USER_ID_CACHE_SIZE", "10000"))
+USER_ID_CACHE_TTL = float(os.getenv("USER_ID_CACHE_TTL", "300"))
+USER_INVALIDATION_CHANNEL = 'planit_users'
+USER_INVALIDATION_KEEPALIVE = 30
+
+class UserIdCache:
+    """
+    Per-process LRU+TTL of user id parameter (internal UserId as int, or Google id
+    as str) -> internal UserId for _get_internal_user_id.
+
+    Only existing, undeleted users are cached. Deletes and changes of GoogleId or
+    DeletedAt reach every worker through the planit_users channel as 'user:<UserId>'
+    (see db/migrations/0016_user_invalidation_by_id.sql). start() runs a LISTEN
+    thread with its own connection that turns them into invalidate_user() calls;
+    while it is down `listening` is False, the cache is bypassed, and it is
+    cleared on reconnect.
+    A lookup only populates the cache if nothing was invalidated while it ran,
+    so a delete racing the SELECT cannot leave a stale entry behind.
+    """
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.listening = False
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._listener_pid = None
+
+    def start(self):
+        """Starts this process's invalidation listener unless it is already running"""
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            self._listener_pid = os.getpid()
+            self.listening = False
+        threading.Thread(target=self._listen, name='user-id-cache-listener', daemon=True).start()
+
+    def _listen(self):
+        backoff = 1
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(os.getenv("DATABASE_URL"))
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cur = conn.cursor()
+                cur.execute(f"LISTEN {USER_INVALIDATION_CHANNEL}")
+                # Anything changed while we were disconnected has to be dropped now.
+                self.clear()
+                self.listening = True
+                backoff = 1
+                while True:
+                    if select.select([conn], [], [], USER_INVALIDATION_KEEPALIVE) == ([], [], []):
+                        cur.execute("SELECT 1")
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        payload = conn.notifies.pop(0).payload
+                        if payload.startswith('user:'):
+                            self.invalidate_user(int(payload[5:]))
+                        else:
+                            # Published by the triggers from 0008/0015 before 0016 is applied.
+                            self.invalidate(payload)
+            except Exception as e:
+                print(f"User id cache listener error: {e}")
+            finally:
+                self.listening = False
+                if conn:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def put(self, key, user_id, generation):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (user_id, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, google_id):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(google_id, None)
+
+    def invalidate_user(self, user_id):
+        """Drops every key that resolves to `user_id`"""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key, entry in self._entries.items() if entry[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxEntries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else None,
+                'listening': self.listening
+            }
+
+user_id_cache = UserIdCache(USER_ID_CACHE_SIZE, USER_ID_CACHE_TTL)
 
 def _get_internal_user_id(cur, user_id_param):
     """
-    Resolves a user ID parameter to an internal integer ID.
-    If the parameter can be cast to an integer, it is returned.
+    Resolves a user ID parameter to an internal integer ID, or None for unknown and deleted users.
+    If the parameter can be cast to an integer, it is checked against Users by UserId.
     If not, it's assumed to be a Google ID and the internal ID is looked up using the provided cursor.
+    Both go through user_id_cache while the invalidation listener is connected.
     """
     try:
-        return int(user_id_param)
+        key = int(user_id_param)
     except (ValueError, TypeError):
-        cur.execute("SELECT UserId FROM Users WHERE GoogleId = %s", (str(user_id_param),))
-        result = cur.fetchone()
-        return result[0] if result else None
+        key = str(user_id_param)
+
+    user_id_cache.start()
+    use_cache = user_id_cache.listening
+    if use_cache:
+        cached = user_id_cache.get(key)
+        if cached is not None:
+            return cached
+        generation = user_id_cache.generation()
+    if isinstance(key, int):
+        cur.execute("SELECT UserId FROM Users WHERE UserId = %s AND DeletedAt IS NULL", (key,))
+    else:
+        cur.execute("SELECT UserId FROM Users WHERE GoogleId = %s AND DeletedAt IS NULL", (key,))
+    result = cur.fetchone()
+    if result is None:
+        return None
+    if use_cache and user_id_cache.listening:
+        user_id_cache.put(key, result[0], generation)
+    return result[0]
 
 def format_time_to_hhmm(time_obj):
     """Convert time object to HH:MM format string"""
@@ -77,6 +462,497 @@ def parse_time_from_hhmm(time_str):
     except ValueError:
         return None
 
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(values):
+    """Encode keyset values (dates/times/ids) into an opaque URL-safe cursor string"""
+    payload = [v.isoformat() if hasattr(v, 'isoformat') else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    """Decode a cursor produced by encode_cursor. Raises ValueError if it is malformed."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
+
+def parse_page_limit(limit_param):
+    """Parse an optional ?limit= value. Returns None when absent, raises ValueError when invalid."""
+    if limit_param in (None, ''):
+        return None
+    limit = int(limit_param)
+    if limit < 1:
+        raise ValueError('Limit must be positive')
+    return min(limit, MAX_PAGE_SIZE)
+
+def _get_user_data_version(cur, internal_user_id):
+    """Current per-user data version, bumped by triggers on every write the user can see"""
+    cur.execute("SELECT Version FROM UserDataVersions WHERE UserId = %s", (internal_user_id,))
+    result = cur.fetchone()
+    return result[0] if result else 0
+
+def _data_etag(resource, internal_user_id, version):
+    """Strong ETag for a per-user list response; the query string is folded in so pages and windows differ"""
+    query_digest = hashlib.sha1(request.query_string).hexdigest()[:12]
+    return f"{resource}-{internal_user_id}-{version}-{query_digest}"
+
+def _not_modified(etag):
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def _with_etag(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def _load_meeting_members(cur, meeting_ids):
+    """
+    Loads the invited members of many meetings with a single query.
+    Returns a dict of meeting id -> list of member dicts ordered by user name.
+    """
+    members_by_meeting = {}
+    if not meeting_ids:
+        return members_by_meeting
+
+    cur.execute(
+        """
+        SELECT mi.MeetingId, u.UserId, u.UserName, u.UserEmail, u.UserProfilePicture,
+               mi.Status, mi.InvitationType
+        FROM MeetingInvitations mi
+        JOIN Users u ON mi.UserId = u.UserId
+        WHERE mi.MeetingId = ANY(%s)
+        ORDER BY mi.MeetingId, u.UserName
+        """,
+        (list(meeting_ids),)
+    )
+    for member_row in cur.fetchall():
+        members_by_meeting.setdefault(member_row[0], []).append({
+            'userid': member_row[1],
+            'username': member_row[2],
+            'useremail': member_row[3],
+            'userprofilepicture': member_row[4],
+            'status': member_row[5],
+            'invitationtype': member_row[6]
+        })
+    return members_by_meeting
+
+def _conflict_window(date_from, date_to, start_time, end_time, timed_only=True):
+    """
+    Builds a (date_from, date_to, start, end) window for _find_schedule_conflicts.
+    Returns None for an untimed item when timed_only is set, since untimed activities
+    and meetings never conflicted in the editors. An end at or before the start runs to midnight.
+    """
+    if not start_time or not end_time:
+        return None if timed_only else (date_from, date_to, None, None)
+    if end_time <= start_time:
+        end_time = datetime.max.time()
+    return (date_from, date_to, start_time, end_time)
+
+def _find_schedule_conflicts(cur, user_ids, windows, exclude_activity=-1, exclude_goal=-1, exclude_meeting=-1):
+    """
+    Finds the activities, goal timelines and meetings of the given users that overlap
+    any of the windows, using one range-bounded query.
+    Windows are (date_from, date_to, start_time, end_time) tuples or None (skipped);
+    an untimed window overlaps everything on its days, and untimed existing items count as all day.
+    Returns a list of conflict dicts tagged with the index of the window they hit.
+    """
+    indexed = [(index, window) for index, window in enumerate(windows) if window]
+    if not user_ids or not indexed:
+        return []
+
+    cur.execute(
+        """
+        WITH w AS (
+            SELECT *
+            FROM unnest(%s::int[], %s::date[], %s::date[], %s::time[], %s::time[])
+                 AS w(idx, date_from, date_to, start_time, end_time)
+        ),
+        bounds AS (
+            SELECT MIN(date_from) AS first_day, MAX(date_to) AS last_day FROM w
+        ),
+        items AS (
+            SELECT 'activity' AS item_type, a.ActivityId AS item_id, a.ActivityTitle AS title,
+                   a.UserId AS user_id, a.ActivityDate AS date_from, a.ActivityDate AS date_to,
+                   a.ActivityStartTime AS start_time, a.ActivityEndTime AS end_time
+            FROM Activity a, bounds b
+            WHERE a.UserId = ANY(%s) AND a.ActivityId <> %s
+              AND a.ActivityDate BETWEEN b.first_day AND b.last_day
+            UNION ALL
+            SELECT 'goal', t.TimelineId, g.GoalTitle || ' - ' || t.TimelineTitle,
+                   g.UserId, t.TimelineStartDate, t.TimelineEndDate,
+                   t.TimelineStartTime, t.TimelineEndTime
+            FROM Timeline t
+            JOIN Goal g ON t.GoalId = g.GoalId, bounds b
+            WHERE g.UserId = ANY(%s) AND g.GoalId <> %s
+              AND t.TimelineStartDate <= b.last_day AND t.TimelineEndDate >= b.first_day
+            UNION ALL
+            SELECT * FROM (
+                SELECT 'meeting', tm.TeamMeetingId, tm.MeetingTitle,
+                       mi.UserId, tm.MeetingDate, tm.MeetingDate,
+                       tm.MeetingStartTime, tm.MeetingEndTime
+                FROM MeetingInvitations mi
+                JOIN TeamMeeting tm ON mi.MeetingId = tm.TeamMeetingId, bounds b
+                WHERE mi.UserId = ANY(%s) AND mi.Status = 'accepted' AND tm.TeamMeetingId <> %s
+                  AND tm.MeetingDate BETWEEN b.first_day AND b.last_day
+                UNION
+                SELECT 'meeting', tm.TeamMeetingId, tm.MeetingTitle,
+                       t.CreatedByUserId, tm.MeetingDate, tm.MeetingDate,
+                       tm.MeetingStartTime, tm.MeetingEndTime
+                FROM TeamMeeting tm
+                JOIN Team t ON tm.TeamId = t.TeamId, bounds b
+                WHERE t.CreatedByUserId = ANY(%s) AND tm.TeamMeetingId <> %s
+                  AND tm.MeetingDate BETWEEN b.first_day AND b.last_day
+            ) meetings
+        )
+        SELECT w.idx, i.item_type, i.item_id, i.title, i.user_id, u.UserName,
+               i.date_from, i.date_to, i.start_time, i.end_time
+        FROM w
+        JOIN items i ON i.date_from <= w.date_to AND i.date_to >= w.date_from
+        JOIN Users u ON u.UserId = i.user_id
+        WHERE w.start_time IS NULL OR i.start_time IS NULL OR i.end_time IS NULL
+           OR (i.start_time < w.end_time AND (i.end_time > w.start_time OR i.end_time <= i.start_time))
+        ORDER BY w.idx, i.date_from, i.start_time NULLS FIRST, i.item_type, i.item_id, i.user_id
+        """,
+        (
+            [index for index, _ in indexed],
+            [window[0] for _, window in indexed],
+            [window[1] for _, window in indexed],
+            [window[2] for _, window in indexed],
+            [window[3] for _, window in indexed],
+            list(user_ids), exclude_activity,
+            list(user_ids), exclude_goal,
+            list(user_ids), exclude_meeting,
+            list(user_ids), exclude_meeting
+        )
+    )
+
+    conflicts = []
+    for row in cur.fetchall():
+        conflict = {
+            'window': row[0],
+            'type': row[1],
+            'id': row[2],
+            'title': row[3],
+            'userid': row[4],
+            'username': row[5],
+            'date': row[6].isoformat(),
+            'time': f"{format_time_to_hhmm(row[8])} - {format_time_to_hhmm(row[9])}" if row[8] and row[9] else 'All day'
+        }
+        if row[1] == 'goal':
+            conflict['enddate'] = row[7].isoformat()
+        conflicts.append(conflict)
+    return conflicts
+
+def _timeline_conflict_windows(timelines):
+    """Conflict windows for goal timelines; incomplete timelines are skipped."""
+    windows = []
+    for timeline in timelines:
+        start_date = timeline.get('timelineStartDate')
+        end_date = timeline.get('timelineEndDate')
+        if not (timeline.get('timelineTitle') or '').strip() or not start_date or not end_date:
+            windows.append(None)
+            continue
+        windows.append(_conflict_window(
+            start_date, end_date,
+            parse_time_from_hhmm(timeline.get('timelineStartTime')),
+            parse_time_from_hhmm(timeline.get('timelineEndTime')),
+            timed_only=False
+        ))
+    return windows
+
+def _timeline_values(timeline):
+    """(title, start date, end date, start time, end time) of a timeline from a request body"""
+    return (
+        timeline.get('timelineTitle'),
+        timeline.get('timelineStartDate'),
+        timeline.get('timelineEndDate'),
+        parse_time_from_hhmm(timeline.get('timelineStartTime')) if timeline.get('timelineStartTime') else None,
+        parse_time_from_hhmm(timeline.get('timelineEndTime')) if timeline.get('timelineEndTime') else None
+    )
+
+def _insert_timelines(cur, rows):
+    """Inserts (title, start date, end date, start time, end time, goal id) rows in one statement; returns their ids in order"""
+    if not rows:
+        return []
+    result = execute_values(
+        cur,
+        """
+        INSERT INTO Timeline (TimelineTitle, TimelineStartDate, TimelineEndDate,
+                              TimelineStartTime, TimelineEndTime, GoalId)
+        VALUES %s
+        RETURNING TimelineId
+        """,
+        rows,
+        page_size=len(rows),
+        fetch=True
+    )
+    return [row[0] for row in result]
+
+def _conflicts_response(conflicts):
+    return jsonify({'success': False, 'message': 'Schedule conflicts found', 'conflicts': conflicts}), 409
+
+def _resolve_invitee_emails(cur, emails):
+    """
+    Resolves invitee emails with one lookup.
+    Returns ({email: user id}, unknown emails); blank and repeated emails are dropped.
+    """
+    cleaned = list(dict.fromkeys(email.strip() for email in emails if email and email.strip()))
+    users, unknown_emails, _ = _resolve_users(cur, emails=cleaned)
+    return {email: user_id for user_id, (_, email) in users.items()}, unknown_emails
+
+def _invite_users(cur, team_id, meeting_id, user_ids, invitation_type, notification=None):
+    """
+    Adds users to the team (if missing) and invites the ones not already invited to the meeting,
+    and queues an optional (title, message) notification for those, in at most three statements
+    whatever the invitee count. Returns the newly invited user ids.
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return []
+
+    cur.execute(
+        """
+        INSERT INTO TeamMembers (TeamId, UserId)
+        SELECT %s, new_member FROM unnest(%s::int[]) AS new_member
+        WHERE NOT EXISTS (
+            SELECT 1 FROM TeamMembers WHERE TeamId = %s AND UserId = new_member
+        )
+        """,
+        (team_id, user_ids, team_id)
+    )
+
+    status = 'accepted' if invitation_type == 'mandatory' else 'pending'
+    invited_ids = [row[0] for row in execute_values(
+        cur,
+        """
+        INSERT INTO MeetingInvitations (MeetingId, UserId, InvitationType, Status) VALUES %s
+        ON CONFLICT (MeetingId, UserId) DO NOTHING
+        RETURNING UserId
+        """,
+        [(meeting_id, user_id, invitation_type, status) for user_id in user_ids],
+        page_size=len(user_ids),
+        fetch=True
+    )]
+
+    if notification:
+        title, message = notification
+        _queue_notifications(cur, invited_ids, 'meeting_invitation', title, message, meeting_id)
+    return invited_ids
+
+def _meeting_request_notification(title, description, date, start_time, end_time, team_name):
+    """Title and message of the invitation sent for 'request' meetings"""
+    meeting_time_info = ""
+    if start_time and end_time:
+        meeting_time_info = f" on {date} from {start_time} to {end_time}"
+    elif date:
+        meeting_time_info = f" on {date}"
+
+    message = f'You have been invited to join the meeting "{title}"{meeting_time_info} in team "{team_name}"'
+    if description:
+        message += f'. Description: {description}'
+    return f'Meeting Invitation: {title}', message
+
+JOB_CHANNEL = 'planit_jobs'
+JOB_LOCK_ID = 0x6a6f6273  # first key of the per-queue pg_advisory_xact_lock taken while claiming
+# Worker threads per queue. The same number caps the running jobs of a queue across all workers.
+JOB_QUEUES = {
+    'notifications': int(os.getenv("JOB_NOTIFICATIONS_CONCURRENCY", "4")),
+    'ai': int(os.getenv("JOB_AI_CONCURRENCY", "2")),
+}
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_LEASE = int(os.getenv("JOB_LEASE", "300"))
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "5"))
+JOB_BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", "600"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "5"))
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", str(7 * 24 * 3600)))
+# Set to 1 where `python api/index.py worker` runs next to the app. Without a worker (e.g. on
+# Vercel) jobs run inline in the enqueuing transaction and account purges run in delete_user.
+JOB_WORKER_ENABLED = os.getenv("JOB_WORKER_ENABLED", "0") == "1"
+
+JOB_HANDLERS = {}
+
+def job_handler(kind, queue):
+    """Registers fn(cur, payload) to run `kind` jobs on `queue`; its return value is stored as the job result"""
+    def register(fn):
+        JOB_HANDLERS[kind] = (queue, fn)
+        return fn
+    return register
+
+def enqueue_job(cur, kind, payload, delay=0, max_attempts=JOB_MAX_ATTEMPTS):
+    """
+    Queues a job on the caller's cursor, so it is committed or rolled back together with
+    the change that caused it. Returns the job id. Without a worker the handler runs right
+    away on the same cursor instead, no job row is written, and None is returned.
+    """
+    if not JOB_WORKER_ENABLED:
+        # Round-trip through JSON so the handler sees the payload as it would come out of Jobs.
+        JOB_HANDLERS[kind][1](cur, json.loads(json.dumps(payload)))
+        return None
+    cur.execute(
+        """
+        INSERT INTO Jobs (Queue, Kind, Payload, MaxAttempts, RunAt)
+        VALUES (%s, %s, %s, %s, now() + make_interval(secs => %s))
+        RETURNING JobId
+        """,
+        (JOB_HANDLERS[kind][0], kind, json.dumps(payload), max_attempts, delay)
+    )
+    return cur.fetchone()[0]
+
+def _queue_notifications(cur, user_ids, notification_type, title, message, related_id=None):
+    """Queues one notification per user; the rows are written by the notify_users job"""
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return None
+    return enqueue_job(cur, 'notify_users', {
+        'userIds': user_ids,
+        'type': notification_type,
+        'title': title,
+        'message': message,
+        'relatedId': related_id
+    })
+
+@job_handler('notify_users', queue='notifications')
+def _notify_users_job(cur, payload):
+    """
+    Inserts the queued notifications in one statement. Users deleted since the job was
+    queued are skipped, and meeting invitations only go to users still invited.
+    """
+    cur.execute(
+        """
+        INSERT INTO Notifications (UserId, Type, Title, Message, RelatedId)
+        SELECT u.UserId, %(type)s, %(title)s, %(message)s, %(related_id)s
+        FROM Users u
+        WHERE u.UserId = ANY(%(user_ids)s::int[]) AND u.DeletedAt IS NULL
+          AND (%(type)s <> 'meeting_invitation' OR EXISTS (
+              SELECT 1 FROM MeetingInvitations mi
+              WHERE mi.MeetingId = %(related_id)s AND mi.UserId = u.UserId
+          ))
+        """,
+        {
+            'user_ids': payload['userIds'],
+            'type': payload['type'],
+            'title': payload['title'],
+            'message': payload['message'],
+            'related_id': payload.get('relatedId')
+        }
+    )
+    return {'notified': cur.rowcount}
+
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "pbkdf2:sha256:600000")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(max(PASSWORD_HASH_WORKERS, 1) * 16)))
+PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "30"))
+
+class PasswordHasherBusy(Exception):
+    """Raised when PASSWORD_HASH_MAX_PENDING hash jobs are already queued"""
+
+class PasswordHasher:
+    """
+    Runs werkzeug's password hashing and verification on a bounded process pool so
+    the deliberately slow key derivation never occupies request threads.
+
+    Spawned (not forked) children only import werkzeug. With `workers` = 0, or where
+    processes cannot be started (e.g. serverless runtimes without /dev/shm), work
+    runs inline. More than `max_pending` outstanding jobs raise PasswordHasherBusy.
+    """
+    def __init__(self, method, workers, max_pending):
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self.submitted = 0
+        self.rejected = 0
+        self.pending = 0
+        self._latencies = deque(maxlen=1000)
+        self._executor = None
+        self._inline = workers <= 0
+        self._broken = 0
+        self._canonical_method = None
+        self._lock = threading.Lock()
+
+    def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy('Too many sign-in requests, try again shortly')
+            self.pending += 1
+            self.submitted += 1
+            executor = self._get_executor()
+        started = time.monotonic()
+        try:
+            if executor is None:
+                return fn(*args)
+            try:
+                return executor.submit(fn, *args).result(timeout=PASSWORD_HASH_TIMEOUT)
+            except BrokenProcessPool:
+                with self._lock:
+                    if self._executor is executor:
+                        self._executor = None
+                        self._broken += 1
+                        if self._broken >= 3:
+                            print("Password hashing pool keeps failing, hashing inline")
+                            self._inline = True
+                return fn(*args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self._latencies.append(time.monotonic() - started)
+
+    def _get_executor(self):
+        if self._inline:
+            return None
+        if self._executor is None:
+            try:
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+            except (OSError, NotImplementedError) as e:
+                print(f"Password hashing pool unavailable, hashing inline: {e}")
+                self._inline = True
+        return self._executor
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        return self._run(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        """True if `stored_hash` was made with different parameters than PASSWORD_HASH_METHOD"""
+        if self._canonical_method is None:
+            # werkzeug fills in default parameters, e.g. "pbkdf2:sha256" is stored as "pbkdf2:sha256:<iterations>".
+            self._canonical_method = self._run(generate_password_hash, '', self.method).split('$', 1)[0]
+        return stored_hash.split('$', 1)[0] != self._canonical_method
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                'method': self.method,
+                'workers': 0 if self._inline else self.workers,
+                'pending': self.pending,
+                'maxPending': self.max_pending,
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'p50Ms': round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+                'p99Ms': round(latencies[int(len(latencies) * 0.99)] * 1000, 1) if latencies else None
+            }
+
+_password_hasher = None
+_password_hasher_pid = None
+
+def get_password_hasher():
+    global _password_hasher, _password_hasher_pid
+    if _password_hasher is None or _password_hasher_pid != os.getpid():
+        with _db_pool_lock:
+            if _password_hasher is None or _password_hasher_pid != os.getpid():
+                _password_hasher = PasswordHasher(PASSWORD_HASH_METHOD, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+                _password_hasher_pid = os.getpid()
+    return _password_hasher
+
 @app.route('/api/register', methods=['POST'])
 def register():
     data = request.get_json()
@@ -92,13 +968,17 @@ def register():
     if not google_id and not password:
         return jsonify({'success': False, 'message': 'Password is required for non-Google users'}), 400
     
-    hashed_password = generate_password_hash(password) if password else None
     parsed_dob = None
     if dob:
         try:
             parsed_dob = datetime.strptime(dob, '%Y-%m-%d').date()
         except ValueError:
             return jsonify({'success': False, 'message': 'Invalid date format for date of birth'}), 400
+
+    try:
+        hashed_password = get_password_hasher().hash(password) if password and not google_id else None
+    except (PasswordHasherBusy, FutureTimeoutError):
+        return jsonify({'success': False, 'message': 'Server is busy, please try again'}), 503
     
     conn = None
     try:
@@ -135,6 +1015,8 @@ def register():
         
         user_id = cur.fetchone()[0]
         conn.commit()
+        if google_id:
+            user_id_cache.invalidate(str(google_id))
         
         return jsonify({'success': True, 'message': 'User registered successfully', 'userId': user_id}), 201
         
@@ -184,8 +1066,16 @@ def login():
         is_authenticated = False
         if google_id:
             is_authenticated = True
-        elif len(user_record) > 3 and user_record[3] and check_password_hash(user_record[3], password):
-            is_authenticated = True
+        elif len(user_record) > 3 and user_record[3]:
+            hasher = get_password_hasher()
+            is_authenticated = hasher.verify(user_record[3], password)
+            if is_authenticated and hasher.needs_rehash(user_record[3]):
+                # Upgrade hashes made with an older work factor while we have the plaintext.
+                cur.execute(
+                    "UPDATE Users SET UserPassword = %s WHERE UserId = %s AND UserPassword = %s",
+                    (hasher.hash(password), user_record[0], user_record[3])
+                )
+                conn.commit()
 
         if is_authenticated:
             if remember_me:
@@ -216,6 +1106,9 @@ def login():
         else:
             return jsonify({'success': False, 'message': 'Invalid credentials'}), 401
     
+    except (PasswordHasherBusy, FutureTimeoutError):
+        return jsonify({'success': False, 'message': 'Server is busy, please try again'}), 503
+
     except Exception as e:
         print(f"Error: {str(e)}")
         return jsonify({'success': False, 'message': 'Login failed', 'error': str(e)}), 500
@@ -234,6 +1127,7 @@ def create_activity():
     date = data.get('activityDate')
     start_time = data.get('activityStartTime')
     end_time = data.get('activityEndTime')
+    check_conflicts = bool(data.get('checkConflicts'))
     
     if not user_id_param or not title or not date:
         return jsonify({'success': False, 'message': 'User ID, title, and date are required'}), 400
@@ -250,6 +1144,13 @@ def create_activity():
         if internal_user_id is None:
             return jsonify({'success': False, 'message': 'User not found'}), 404
 
+        if check_conflicts:
+            conflicts = _find_schedule_conflicts(
+                cur, [internal_user_id], [_conflict_window(date, date, parsed_start_time, parsed_end_time)]
+            )
+            if conflicts:
+                return _conflicts_response(conflicts)
+
         cur.execute(
             """
             INSERT INTO Activity (ActivityTitle, ActivityDescription, ActivityCategory, 
@@ -281,9 +1182,34 @@ def create_activity():
 
 @app.route('/api/activities', methods=['GET'])
 def get_activities():
+    """
+    List a user's activities ordered by date, start time and id.
+    Optional `from`/`to` (YYYY-MM-DD, inclusive) restrict the date window, and
+    `limit` + `cursor` page through it by keyset; `nextCursor` is returned
+    while more rows remain.
+    """
     user_id_param = request.args.get('userId')
     if not user_id_param:
         return jsonify({'success': False, 'message': 'User ID is required'}), 400
+
+    try:
+        date_from = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else None
+        date_to = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid date format, expected YYYY-MM-DD'}), 400
+
+    try:
+        limit = parse_page_limit(request.args.get('limit'))
+        after = None
+        if request.args.get('cursor'):
+            cursor_date, cursor_time, cursor_id = decode_cursor(request.args['cursor'])
+            after = (
+                datetime.strptime(cursor_date, '%Y-%m-%d').date(),
+                parse_time_from_hhmm(cursor_time),
+                int(cursor_id)
+            )
+    except (ValueError, TypeError):
+        return jsonify({'success': False, 'message': 'Invalid limit or cursor'}), 400
     
     conn = None
     try:
@@ -294,19 +1220,46 @@ def get_activities():
         if internal_user_id is None:
             return jsonify({'success': False, 'message': 'User not found'}), 404
 
-        cur.execute(
-            """
+        etag = _data_etag('activities', internal_user_id, _get_user_data_version(cur, internal_user_id))
+        if request.if_none_match.contains(etag):
+            return _not_modified(etag)
+
+        # Activities without a start time sort last within their day (TIME '24:00'),
+        # matching idx_activity_user_window so the window is an index range scan.
+        conditions = ["UserId = %s"]
+        params = [internal_user_id]
+        if date_from:
+            conditions.append("ActivityDate >= %s")
+            params.append(date_from)
+        if date_to:
+            conditions.append("ActivityDate <= %s")
+            params.append(date_to)
+        if after:
+            conditions.append("(ActivityDate, COALESCE(ActivityStartTime, TIME '24:00'), ActivityId) > (%s, COALESCE(%s, TIME '24:00'), %s)")
+            params.extend(after)
+
+        query = f"""
             SELECT ActivityId, ActivityTitle, ActivityDescription, ActivityCategory,
                    ActivityUrgency, ActivityDate, ActivityStartTime, ActivityEndTime
             FROM Activity 
-            WHERE UserId = %s
-            ORDER BY ActivityDate, ActivityStartTime
-            """,
-            (internal_user_id,)
-        )
+            WHERE {' AND '.join(conditions)}
+            ORDER BY ActivityDate, COALESCE(ActivityStartTime, TIME '24:00'), ActivityId
+            """
+        if limit:
+            query += " LIMIT %s"
+            params.append(limit + 1)
+
+        cur.execute(query, params)
+        rows = cur.fetchall()
+
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor([last[5], last[6].strftime('%H:%M:%S') if last[6] else None, last[0]])
         
         activities = []
-        for row in cur.fetchall():
+        for row in rows:
             activities.append({
                 'activityid': row[0],
                 'activitytitle': row[1],
@@ -318,10 +1271,11 @@ def get_activities():
                 'activityendtime': format_time_to_hhmm(row[7])
             })
         
-        return jsonify({
+        return _with_etag(jsonify({
             'success': True,
-            'activities': activities
-        }), 200
+            'activities': activities,
+            'nextCursor': next_cursor
+        }), etag), 200
         
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -342,6 +1296,7 @@ def update_activity(activity_id):
     date = data.get('activityDate')
     start_time = data.get('activityStartTime')
     end_time = data.get('activityEndTime')
+    check_conflicts = bool(data.get('checkConflicts'))
     
     if not title or not date:
         return jsonify({'success': False, 'message': 'Title and date are required'}), 400
@@ -353,6 +1308,18 @@ def update_activity(activity_id):
     try:
         conn = get_db_connection()
         cur = conn.cursor()
+
+        if check_conflicts:
+            cur.execute("SELECT UserId FROM Activity WHERE ActivityId = %s", (activity_id,))
+            owner = cur.fetchone()
+            if not owner:
+                return jsonify({'success': False, 'message': 'Activity not found'}), 404
+            conflicts = _find_schedule_conflicts(
+                cur, [owner[0]], [_conflict_window(date, date, parsed_start_time, parsed_end_time)],
+                exclude_activity=activity_id
+            )
+            if conflicts:
+                return _conflicts_response(conflicts)
         
         cur.execute(
             """
@@ -426,6 +1393,7 @@ def create_goal():
     category = data.get('goalCategory')
     progress = data.get('goalProgress')
     timelines = data.get('timelines', [])
+    check_conflicts = bool(data.get('checkConflicts'))
     
     if not user_id or not title:
         return jsonify({'success': False, 'message': 'User ID and title are required'}), 400
@@ -437,6 +1405,15 @@ def create_goal():
     try:
         conn = get_db_connection()
         cur = conn.cursor()
+
+        internal_user_id = _get_internal_user_id(cur, user_id)
+        if internal_user_id is None:
+            return jsonify({'success': False, 'message': 'User not found'}), 404
+
+        if check_conflicts:
+            conflicts = _find_schedule_conflicts(cur, [internal_user_id], _timeline_conflict_windows(timelines))
+            if conflicts:
+                return _conflicts_response(conflicts)
         
         cur.execute(
             """
@@ -444,33 +1421,12 @@ def create_goal():
             VALUES (%s, %s, %s, %s, %s)
             RETURNING GoalId
             """,
-            (title, description, category, progress, user_id)
+            (title, description, category, progress, internal_user_id)
         )
         
         goal_id = cur.fetchone()[0]
         
-        timeline_ids = []
-        for timeline in timelines:
-            start_time = parse_time_from_hhmm(timeline.get('timelineStartTime')) if timeline.get('timelineStartTime') else None
-            end_time = parse_time_from_hhmm(timeline.get('timelineEndTime')) if timeline.get('timelineEndTime') else None
-            
-            cur.execute(
-                """
-                INSERT INTO Timeline (TimelineTitle, TimelineStartDate, TimelineEndDate, 
-                                     TimelineStartTime, TimelineEndTime, GoalId)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING TimelineId
-                """,
-                (
-                    timeline.get('timelineTitle'),
-                    timeline.get('timelineStartDate'),
-                    timeline.get('timelineEndDate'),
-                    start_time,
-                    end_time,
-                    goal_id
-                )
-            )
-            timeline_ids.append(cur.fetchone()[0])
+        timeline_ids = _insert_timelines(cur, [_timeline_values(timeline) + (goal_id,) for timeline in timelines])
         
         conn.commit()
         
@@ -491,6 +1447,87 @@ def create_goal():
         if conn:
             conn.close()
 
+GOAL_BATCH_MAX = 100
+
+@app.route('/api/goals/batch', methods=['POST'])
+def create_goals_batch():
+    """Create several goals with their timelines in one transaction"""
+    data = request.get_json()
+    
+    user_id = data.get('userId')
+    goals = data.get('goals', [])
+    check_conflicts = bool(data.get('checkConflicts'))
+    
+    if not user_id or not goals:
+        return jsonify({'success': False, 'message': 'User ID and goals are required'}), 400
+    
+    if len(goals) > GOAL_BATCH_MAX:
+        return jsonify({'success': False, 'message': f'At most {GOAL_BATCH_MAX} goals can be created at once'}), 400
+    
+    for index, goal in enumerate(goals):
+        if not goal.get('goalTitle'):
+            return jsonify({'success': False, 'message': f'Goal {index} is missing a title'}), 400
+        if not goal.get('timelines'):
+            return jsonify({'success': False, 'message': f'Goal {index} needs at least one timeline'}), 400
+    
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+
+        internal_user_id = _get_internal_user_id(cur, user_id)
+        if internal_user_id is None:
+            return jsonify({'success': False, 'message': 'User not found'}), 404
+
+        if check_conflicts:
+            windows = [window for goal in goals for window in _timeline_conflict_windows(goal['timelines'])]
+            conflicts = _find_schedule_conflicts(cur, [internal_user_id], windows)
+            if conflicts:
+                return _conflicts_response(conflicts)
+        
+        goal_ids = [row[0] for row in execute_values(
+            cur,
+            """
+            INSERT INTO Goal (GoalTitle, GoalDescription, GoalCategory, GoalProgress, UserId)
+            VALUES %s
+            RETURNING GoalId
+            """,
+            [
+                (goal.get('goalTitle'), goal.get('goalDescription'), goal.get('goalCategory'),
+                 goal.get('goalProgress'), internal_user_id)
+                for goal in goals
+            ],
+            page_size=len(goals),
+            fetch=True
+        )]
+        
+        timeline_ids = iter(_insert_timelines(cur, [
+            _timeline_values(timeline) + (goal_id,)
+            for goal, goal_id in zip(goals, goal_ids)
+            for timeline in goal['timelines']
+        ]))
+        
+        conn.commit()
+        
+        return jsonify({
+            'success': True,
+            'message': f'{len(goal_ids)} goals created successfully',
+            'goals': [
+                {'goalId': goal_id, 'timelineIds': [next(timeline_ids) for _ in goal['timelines']]}
+                for goal, goal_id in zip(goals, goal_ids)
+            ]
+        }), 201
+        
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to create goals', 'error': str(e)}), 500
+    
+    finally:
+        if conn:
+            conn.close()
+
 @app.route('/api/goals', methods=['GET'])
 def get_goals():
     user_id_param = request.args.get('userId')
@@ -506,6 +1543,10 @@ def get_goals():
         if internal_user_id is None:
             return jsonify({'success': False, 'message': 'User not found'}), 404
 
+        etag = _data_etag('goals', internal_user_id, _get_user_data_version(cur, internal_user_id))
+        if request.if_none_match.contains(etag):
+            return _not_modified(etag)
+
         cur.execute(
             """
             SELECT g.GoalId, g.GoalTitle, g.GoalDescription, g.GoalCategory, g.GoalProgress,
@@ -542,7 +1583,7 @@ def get_goals():
                     'timelineendtime': format_time_to_hhmm(row[10])
                 })
         
-        return jsonify({'success': True, 'goals': list(goals_dict.values())}), 200
+        return _with_etag(jsonify({'success': True, 'goals': list(goals_dict.values())}), etag), 200
         
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -561,6 +1602,7 @@ def update_goal(goal_id):
     category = data.get('goalCategory')
     progress = data.get('goalProgress')
     timelines = data.get('timelines', [])
+    check_conflicts = bool(data.get('checkConflicts'))
     
     if not title:
         return jsonify({'success': False, 'message': 'Title is required'}), 400
@@ -572,6 +1614,17 @@ def update_goal(goal_id):
     try:
         conn = get_db_connection()
         cur = conn.cursor()
+
+        if check_conflicts:
+            cur.execute("SELECT UserId FROM Goal WHERE GoalId = %s", (goal_id,))
+            owner = cur.fetchone()
+            if not owner:
+                return jsonify({'success': False, 'message': 'Goal not found'}), 404
+            conflicts = _find_schedule_conflicts(
+                cur, [owner[0]], _timeline_conflict_windows(timelines), exclude_goal=goal_id
+            )
+            if conflicts:
+                return _conflicts_response(conflicts)
         
         cur.execute(
             """
@@ -585,37 +1638,55 @@ def update_goal(goal_id):
         if cur.rowcount == 0:
             return jsonify({'success': False, 'message': 'Goal not found'}), 404
         
-        cur.execute("DELETE FROM Timeline WHERE GoalId = %s", (goal_id,))
-        
-        timeline_ids = []
+        cur.execute("SELECT TimelineId FROM Timeline WHERE GoalId = %s", (goal_id,))
+        existing_ids = {row[0] for row in cur.fetchall()}
+
+        # Timelines that carry one of this goal's ids are updated in place; anything else is new.
+        kept, added, order = [], [], []
         for timeline in timelines:
-            start_time = parse_time_from_hhmm(timeline.get('timelineStartTime')) if timeline.get('timelineStartTime') else None
-            end_time = parse_time_from_hhmm(timeline.get('timelineEndTime')) if timeline.get('timelineEndTime') else None
-            
+            timeline_id = timeline.get('timelineId')
+            if isinstance(timeline_id, int) and timeline_id in existing_ids:
+                existing_ids.discard(timeline_id)
+                kept.append((timeline_id,) + _timeline_values(timeline))
+                order.append(timeline_id)
+            else:
+                added.append(_timeline_values(timeline))
+                order.append(None)
+
+        kept_ids = [row[0] for row in kept]
+        cur.execute(
+            "DELETE FROM Timeline WHERE GoalId = %s AND NOT (TimelineId = ANY(%s))",
+            (goal_id, kept_ids)
+        )
+        deleted = cur.rowcount
+
+        updated = 0
+        if kept:
             cur.execute(
                 """
-                INSERT INTO Timeline (TimelineTitle, TimelineStartDate, TimelineEndDate, 
-                                     TimelineStartTime, TimelineEndTime, GoalId)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING TimelineId
+                UPDATE Timeline AS t
+                SET TimelineTitle = v.title, TimelineStartDate = v.start_date, TimelineEndDate = v.end_date,
+                    TimelineStartTime = v.start_time, TimelineEndTime = v.end_time
+                FROM unnest(%s::int[], %s::text[], %s::date[], %s::date[], %s::time[], %s::time[])
+                     AS v(id, title, start_date, end_date, start_time, end_time)
+                WHERE t.TimelineId = v.id AND t.GoalId = %s
+                  AND (t.TimelineTitle, t.TimelineStartDate, t.TimelineEndDate, t.TimelineStartTime, t.TimelineEndTime)
+                      IS DISTINCT FROM (v.title, v.start_date, v.end_date, v.start_time, v.end_time)
                 """,
-                (
-                    timeline.get('timelineTitle'),
-                    timeline.get('timelineStartDate'),
-                    timeline.get('timelineEndDate'),
-                    start_time,
-                    end_time,
-                    goal_id
-                )
+                [list(column) for column in zip(*kept)] + [goal_id]
             )
-            timeline_ids.append(cur.fetchone()[0])
+            updated = cur.rowcount
+
+        added_ids = iter(_insert_timelines(cur, [row + (goal_id,) for row in added]))
+        timeline_ids = [timeline_id if timeline_id is not None else next(added_ids) for timeline_id in order]
         
         conn.commit()
         
         return jsonify({
             'success': True,
             'message': 'Goal updated successfully',
-            'timelineIds': timeline_ids
+            'timelineIds': timeline_ids,
+            'timelineChanges': {'updated': updated, 'inserted': len(added), 'deleted': deleted}
         }), 200
         
     except Exception as e:
@@ -636,8 +1707,7 @@ def delete_goal(goal_id):
         conn = get_db_connection()
         cur = conn.cursor()
         
-        cur.execute("DELETE FROM Timeline WHERE GoalId = %s", (goal_id,))
-        
+        # Timelines cascade.
         cur.execute("DELETE FROM Goal WHERE GoalId = %s", (goal_id,))
         
         if cur.rowcount == 0:
@@ -704,31 +1774,389 @@ def delete_timeline(timeline_id):
         if conn:
             conn.close()
 
-@app.route('/api/teams', methods=['POST'])
-def create_team():
-    """Create a new team with meetings and invitations"""
-    data = request.get_json()
-    
-    created_by_user_id = data.get('createdByUserId')
-    team_name = data.get('teamName')
-    team_description = data.get('teamDescription')
-    team_start_working_hour = data.get('teamStartWorkingHour')
-    team_end_working_hour = data.get('teamEndWorkingHour')
-    meetings = data.get('meetings', [])
-    
-    if not created_by_user_id or not team_name:
-        return jsonify({'success': False, 'message': 'Creator user ID and team name are required'}), 400
-    
-    if not meetings:
-        return jsonify({'success': False, 'message': 'At least one meeting is required'}), 400
-    
-    parsed_start_hour = parse_time_from_hhmm(team_start_working_hour) if team_start_working_hour else None
-    parsed_end_hour = parse_time_from_hhmm(team_end_working_hour) if team_end_working_hour else None
-    
-    conn = None
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
+IMPORT_BATCH_SIZE = 5000
+IMPORT_MAX_REPORTED_ERRORS = 100
+
+# CSV header aliases (lowercased, spaces/underscores/dashes removed) -> event field
+IMPORT_CSV_COLUMNS = {
+    'title': 'title', 'summary': 'title', 'subject': 'title', 'activitytitle': 'title',
+    'description': 'description', 'activitydescription': 'description',
+    'category': 'category', 'activitycategory': 'category',
+    'urgency': 'urgency', 'activityurgency': 'urgency',
+    'date': 'date', 'startdate': 'date', 'activitydate': 'date',
+    'enddate': 'endDate',
+    'starttime': 'startTime', 'activitystarttime': 'startTime',
+    'endtime': 'endTime', 'activityendtime': 'endTime',
+}
+ICS_DURATION = re.compile(r'^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+
+def _unescape_ics_text(value):
+    return re.sub(r'\\([\;,nN])', lambda m: '\n' if m.group(1) in 'nN' else m.group(1), value)
+
+def _parse_ics_datetime(value):
+    """
+    Parses a DATE or DATE-TIME value into (datetime, has_time). Wall-clock times are
+    kept as written (a trailing Z or TZID is not converted); the app has no time zones.
+    """
+    value = value.strip().rstrip('Z')
+    if 'T' in value:
+        return datetime.strptime(value[:15], '%Y%m%dT%H%M%S'), True
+    return datetime.strptime(value[:8], '%Y%m%d'), False
+
+def _parse_ics_duration(value):
+    match = ICS_DURATION.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid DURATION '{value}'")
+    weeks, days, hours, minutes, seconds = (int(part or 0) for part in match.groups()[1:])
+    duration = timedelta(weeks=weeks, days=days, hours=hours, minutes=minutes, seconds=seconds)
+    return -duration if match.group(1) == '-' else duration
+
+def _iter_ics_lines(lines):
+    """Unfolds RFC 5545 continuation lines; yields (line number, logical line)"""
+    pending, pending_number = None, 0
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending_number, pending
+        pending, pending_number = line, number
+    if pending is not None:
+        yield pending_number, pending
+
+def _iter_ics_events(lines):
+    """
+    Streams VEVENTs out of an iCalendar file one at a time.
+    Yields (line number, event dict) with the same fields as a CSV row, or (line number, ValueError).
+    Recurrence rules are not expanded; each VEVENT imports once.
+    """
+    event, event_line, depth = None, 0, 0
+    for number, line in _iter_ics_lines(lines):
+        name, _, value = line.partition(':')
+        name, _, params = name.partition(';')
+        name = name.upper()
+        if name == 'BEGIN':
+            if value.strip().upper() == 'VEVENT' and event is None:
+                event, event_line, depth = {}, number, 0
+            elif event is not None:
+                depth += 1
+            continue
+        if name == 'END' and event is not None:
+            if depth:
+                depth -= 1
+                continue
+            try:
+                yield event_line, _ics_event_fields(event)
+            except ValueError as e:
+                yield event_line, e
+            event = None
+            continue
+        if event is not None and not depth and name in ('SUMMARY', 'DESCRIPTION', 'CATEGORIES',
+                                                         'DTSTART', 'DTEND', 'DURATION', 'PRIORITY'):
+            event[name] = value
+
+def _ics_event_fields(event):
+    if 'DTSTART' not in event:
+        raise ValueError('DTSTART is required')
+    start, timed = _parse_ics_datetime(event['DTSTART'])
+    if 'DTEND' in event:
+        end, _ = _parse_ics_datetime(event['DTEND'])
+    elif 'DURATION' in event:
+        end = start + _parse_ics_duration(event['DURATION'])
+    else:
+        end = start if timed else start + timedelta(days=1)
+    if not timed:
+        # All-day DTEND is exclusive.
+        end = max(end - timedelta(days=1), start)
+    elif end - start < timedelta(days=1):
+        # Shorter than a day but past midnight: keep it a single activity running to midnight.
+        end = datetime.combine(start.date(), end.time())
+
+    priority = event.get('PRIORITY', '').strip()
+    urgency = None
+    if priority.isdigit() and int(priority):
+        urgency = ('urgent', 'urgent', 'high', 'high', 'medium', 'low', 'low', 'low', 'low')[min(int(priority), 9) - 1]
+
+    return {
+        'title': _unescape_ics_text(event.get('SUMMARY', '')),
+        'description': _unescape_ics_text(event.get('DESCRIPTION', '')),
+        'category': _unescape_ics_text(event.get('CATEGORIES', '').split(',')[0]),
+        'urgency': urgency,
+        'date': start.date().isoformat(),
+        'endDate': end.date().isoformat(),
+        'startTime': start.strftime('%H:%M') if timed else None,
+        'endTime': end.strftime('%H:%M') if timed else None,
+    }
+
+def _iter_csv_events(lines):
+    """Streams CSV rows as event dicts; yields (row number, event dict)"""
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    fields = [IMPORT_CSV_COLUMNS.get(re.sub(r'[\s_-]', '', column.lower())) for column in header]
+    if 'title' not in fields or 'date' not in fields:
+        raise ValueError('CSV header must include title and date columns')
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        yield reader.line_num, {
+            field: cell.strip() for field, cell in zip(fields, row) if field
+        }
+
+# Calendars repeat the same dates and times constantly; caching the parsed values keeps
+# strptime off the hot path without changing the validation rules.
+@lru_cache(maxsize=4096)
+def _parse_import_time(value):
+    return parse_time_from_hhmm(value)
+
+@lru_cache(maxsize=4096)
+def _parse_import_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def _import_staging_row(event):
+    """
+    Validates an imported event with the same rules as the create routes and maps it to a
+    staging row: single-day events become activities, multi-day events goal timelines.
+    """
+    title = (event.get('title') or '').strip()
+    if not title:
+        raise ValueError('Title is required')
+    try:
+        start_date = _parse_import_date(event.get('date') or '')
+        end_date = _parse_import_date(event['endDate']) if event.get('endDate') else start_date
+    except ValueError:
+        raise ValueError('Dates must be YYYY-MM-DD')
+    if end_date < start_date:
+        raise ValueError('End date is before start date')
+
+    times = []
+    for key, label in (('startTime', 'start'), ('endTime', 'end')):
+        raw = event.get(key)
+        parsed = _parse_import_time(raw) if raw else None
+        if raw and parsed is None:
+            raise ValueError(f"Invalid {label} time '{raw}'")
+        times.append(parsed)
+
+    kind = 'activity' if end_date == start_date else 'timeline'
+    return (kind, title, event.get('description') or None, event.get('category') or None,
+            event.get('urgency') or 'medium', start_date, end_date, times[0], times[1])
+
+def _copy_text(value):
+    if value is None:
+        return '\\N'
+    if not isinstance(value, str):
+        return str(value)
+    return (value.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+def _copy_import_batch(cur, rows):
+    buffer = io.StringIO(''.join('\t'.join(_copy_text(value) for value in row) + '\n' for row in rows))
+    cur.copy_expert(
+        """
+        COPY import_staging (kind, title, description, category, urgency,
+                             start_date, end_date, start_time, end_time)
+        FROM STDIN
+        """,
+        buffer
+    )
+
+def _import_events(internal_user_id, events, source_name):
+    """
+    Streams events into a temporary staging table with batched COPY, then merges them
+    into Activity and Timeline in one transaction, skipping exact duplicates.
+    Yields NDJSON progress lines and a final summary.
+    """
+    rows_seen, staged = 0, 0
+    error_count, errors = 0, []
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(
+            """
+            CREATE TEMP TABLE import_staging (
+                kind TEXT, title TEXT, description TEXT, category TEXT, urgency TEXT,
+                start_date DATE, end_date DATE, start_time TIME, end_time TIME
+            ) ON COMMIT DROP
+            """
+        )
+
+        batch = []
+        for row_number, event in events:
+            rows_seen += 1
+            try:
+                if isinstance(event, ValueError):
+                    raise event
+                batch.append(_import_staging_row(event))
+            except ValueError as e:
+                error_count += 1
+                if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+                    errors.append({'row': row_number, 'message': str(e)})
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                _copy_import_batch(cur, batch)
+                staged += len(batch)
+                batch = []
+                yield json.dumps({'event': 'progress', 'rows': rows_seen, 'staged': staged, 'errorCount': error_count}) + '\n'
+        if batch:
+            _copy_import_batch(cur, batch)
+            staged += len(batch)
+        yield json.dumps({'event': 'progress', 'rows': rows_seen, 'staged': staged, 'errorCount': error_count}) + '\n'
+
+        cur.execute("ANALYZE import_staging")
+        cur.execute(
+            """
+            INSERT INTO Activity (ActivityTitle, ActivityDescription, ActivityCategory, ActivityUrgency,
+                                  ActivityDate, ActivityStartTime, ActivityEndTime, UserId)
+            SELECT s.title, s.description, s.category, s.urgency,
+                   s.start_date, s.start_time, s.end_time, %s
+            FROM import_staging s
+            WHERE s.kind = 'activity'
+              AND NOT EXISTS (
+                  SELECT 1 FROM Activity a
+                  WHERE a.UserId = %s AND a.ActivityDate = s.start_date
+                    AND a.ActivityTitle = s.title
+                    AND a.ActivityStartTime IS NOT DISTINCT FROM s.start_time
+              )
+            """,
+            (internal_user_id, internal_user_id)
+        )
+        activities_imported = cur.rowcount
+
+        goal_id = None
+        timelines_imported = 0
+        cur.execute("SELECT COUNT(*) FROM import_staging WHERE kind = 'timeline'")
+        if cur.fetchone()[0]:
+            cur.execute(
+                """
+                INSERT INTO Goal (GoalTitle, GoalDescription, GoalCategory, GoalProgress, UserId)
+                VALUES (%s, %s, %s, %s, %s)
+                RETURNING GoalId
+                """,
+                (f"Imported events ({source_name})", 'Multi-day events from a calendar import',
+                 'import', 'not-started', internal_user_id)
+            )
+            goal_id = cur.fetchone()[0]
+            cur.execute(
+                """
+                INSERT INTO Timeline (TimelineTitle, TimelineStartDate, TimelineEndDate,
+                                      TimelineStartTime, TimelineEndTime, GoalId)
+                SELECT s.title, s.start_date, s.end_date, s.start_time, s.end_time, %s
+                FROM import_staging s
+                WHERE s.kind = 'timeline'
+                  AND NOT EXISTS (
+                      SELECT 1 FROM Timeline t
+                      JOIN Goal g ON t.GoalId = g.GoalId
+                      WHERE g.UserId = %s AND t.TimelineTitle = s.title
+                        AND t.TimelineStartDate = s.start_date AND t.TimelineEndDate = s.end_date
+                  )
+                """,
+                (goal_id, internal_user_id)
+            )
+            timelines_imported = cur.rowcount
+            if not timelines_imported:
+                cur.execute("DELETE FROM Goal WHERE GoalId = %s", (goal_id,))
+                goal_id = None
+
+        conn.commit()
+        yield json.dumps({
+            'event': 'done',
+            'success': True,
+            'rows': rows_seen,
+            'activitiesImported': activities_imported,
+            'timelinesImported': timelines_imported,
+            'skippedDuplicates': staged - activities_imported - timelines_imported,
+            'goalId': goal_id,
+            'errorCount': error_count,
+            'errors': errors
+        }) + '\n'
+
+    except Exception as e:
+        if conn: conn.rollback()
+        print(f"Error importing calendar: {e}")
+        yield json.dumps({'event': 'error', 'success': False, 'message': 'Import failed', 'error': str(e),
+                          'rows': rows_seen, 'errors': errors}) + '\n'
+
+    finally:
+        if conn: conn.close()
+
+@app.route('/api/import', methods=['POST'])
+def import_calendar():
+    """
+    Bulk-import an ICS or CSV calendar sent as the raw request body, which is read as it arrives.
+    Query params: userId, format ('ics' or 'csv'; otherwise inferred from filename or Content-Type), filename.
+    The response is NDJSON: progress lines, then a 'done' (or 'error') summary with per-row errors.
+    """
+    user_id_param = request.args.get('userId')
+    if not user_id_param:
+        return jsonify({'success': False, 'message': 'User ID is required'}), 400
+
+    source_name = request.args.get('filename') or 'upload'
+    import_format = (request.args.get('format') or '').lower()
+    if not import_format:
+        if source_name.lower().endswith('.ics') or request.mimetype == 'text/calendar':
+            import_format = 'ics'
+        elif source_name.lower().endswith('.csv') or request.mimetype == 'text/csv':
+            import_format = 'csv'
+    if import_format not in ('ics', 'csv'):
+        return jsonify({'success': False, 'message': "format must be 'ics' or 'csv'"}), 400
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+
+        # Rejects unknown and deleted users before any of the upload is read.
+        internal_user_id = _get_internal_user_id(cur, user_id_param)
+        if internal_user_id is None:
+            return jsonify({'success': False, 'message': 'User not found'}), 404
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to start import', 'error': str(e)}), 500
+
+    finally:
+        if conn: conn.close()
+
+    lines = io.TextIOWrapper(request.stream, encoding='utf-8-sig', errors='replace', newline='')
+    if import_format == 'ics':
+        events = _iter_ics_events(lines)
+    else:
+        events = _iter_csv_events(lines)
+
+    # The generator keeps reading request.stream after the view returns.
+    return Response(
+        stream_with_context(_import_events(internal_user_id, events, source_name)),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/teams', methods=['POST'])
+def create_team():
+    """Create a new team with meetings and invitations"""
+    data = request.get_json()
+    
+    created_by_user_id = data.get('createdByUserId')
+    team_name = data.get('teamName')
+    team_description = data.get('teamDescription')
+    team_start_working_hour = data.get('teamStartWorkingHour')
+    team_end_working_hour = data.get('teamEndWorkingHour')
+    meetings = data.get('meetings', [])
+    
+    if not created_by_user_id or not team_name:
+        return jsonify({'success': False, 'message': 'Creator user ID and team name are required'}), 400
+    
+    if not meetings:
+        return jsonify({'success': False, 'message': 'At least one meeting is required'}), 400
+    
+    parsed_start_hour = parse_time_from_hhmm(team_start_working_hour) if team_start_working_hour else None
+    parsed_end_hour = parse_time_from_hhmm(team_end_working_hour) if team_end_working_hour else None
+    
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
         
         cur.execute(
             """
@@ -750,6 +2178,10 @@ def create_team():
             (team_id, created_by_user_id)
         )
         
+        user_ids_by_email, unknown_emails = _resolve_invitee_emails(
+            cur, [email for meeting in meetings for email in meeting.get('invitedEmails', [])]
+        )
+
         meeting_ids = []
         for meeting in meetings:
             meeting_start_time = parse_time_from_hhmm(meeting.get('meetingStartTime')) if meeting.get('meetingStartTime') else None
@@ -776,57 +2208,18 @@ def create_team():
             meeting_id = cur.fetchone()[0]
             meeting_ids.append(meeting_id)
             
-            invited_emails = meeting.get('invitedEmails', [])
-            for email in invited_emails:
-                if email.strip():
-                    cur.execute("SELECT UserId FROM Users WHERE UserEmail = %s", (email.strip(),))
-                    user_result = cur.fetchone()
-                    
-                    if user_result:
-                        user_id = user_result[0]
-                        cur.execute(
-                            """
-                            INSERT INTO TeamMembers (TeamId, UserId)
-                            SELECT %s, %s
-                            WHERE NOT EXISTS (
-                                SELECT 1 FROM TeamMembers WHERE TeamId = %s AND UserId = %s
-                            )
-                            """,
-                            (team_id, user_id, team_id, user_id)
-                        )
-                        
-                        cur.execute(
-                            """
-                            INSERT INTO MeetingInvitations (MeetingId, UserId, InvitationType, Status)
-                            VALUES (%s, %s, %s, %s)
-                            """,
-                            (meeting_id, user_id, invitation_type, 'accepted' if invitation_type == 'mandatory' else 'pending')
-                        )
-                        
-                        if invitation_type == 'request':
-                            meeting_time_info = ""
-                            if meeting.get('meetingStartTime') and meeting.get('meetingEndTime'):
-                                meeting_time_info = f" on {meeting.get('meetingDate')} from {meeting.get('meetingStartTime')} to {meeting.get('meetingEndTime')}"
-                            elif meeting.get('meetingDate'):
-                                meeting_time_info = f" on {meeting.get('meetingDate')}"
-                            
-                            notification_message = f'You have been invited to join the meeting "{meeting.get("meetingTitle")}"{meeting_time_info} in team "{team_name}"'
-                            if meeting.get('meetingDescription'):
-                                notification_message += f'. Description: {meeting.get("meetingDescription")}'
-                            
-                            cur.execute(
-                                """
-                                INSERT INTO Notifications (UserId, Type, Title, Message, RelatedId)
-                                VALUES (%s, %s, %s, %s, %s)
-                                """,
-                                (
-                                    user_id,
-                                    'meeting_invitation',
-                                    f'Meeting Invitation: {meeting.get("meetingTitle")}',
-                                    notification_message,
-                                    meeting_id
-                                )
-                            )
+            invitee_ids = [
+                user_ids_by_email[email.strip()]
+                for email in meeting.get('invitedEmails', [])
+                if email.strip() in user_ids_by_email
+            ]
+            notification = None
+            if invitation_type == 'request':
+                notification = _meeting_request_notification(
+                    meeting.get('meetingTitle'), meeting.get('meetingDescription'), meeting.get('meetingDate'),
+                    meeting.get('meetingStartTime'), meeting.get('meetingEndTime'), team_name
+                )
+            _invite_users(cur, team_id, meeting_id, invitee_ids, invitation_type, notification)
         
         conn.commit()
         
@@ -834,7 +2227,8 @@ def create_team():
             'success': True,
             'message': 'Team created successfully',
             'teamId': team_id,
-            'meetingIds': meeting_ids
+            'meetingIds': meeting_ids,
+            'unknownEmails': unknown_emails
         }), 201
         
     except Exception as e:
@@ -862,6 +2256,10 @@ def get_teams():
         if internal_user_id is None:
             return jsonify({'success': False, 'message': 'User not found'}), 404
 
+        etag = _data_etag('teams', internal_user_id, _get_user_data_version(cur, internal_user_id))
+        if request.if_none_match.contains(etag):
+            return _not_modified(etag)
+
         cur.execute(
             """
             SELECT t.TeamId, t.TeamName, t.TeamDescription,
@@ -885,34 +2283,31 @@ def get_teams():
                 'meetings': []
             }
 
-        for team_id, team_data in teams_dict.items():
-            if team_data['createdbyuserid'] == internal_user_id:
-                cur.execute(
-                    """
-                    SELECT tm.MeetingTitle, tm.MeetingDescription, tm.MeetingDate,
-                           tm.MeetingStartTime, tm.MeetingEndTime, tm.TeamMeetingId, tm.InvitationType
-                    FROM TeamMeeting tm
-                    WHERE tm.TeamId = %s
-                    ORDER BY tm.MeetingDate, tm.MeetingStartTime
-                    """,
-                    (team_id,)
-                )
-            else:
-                cur.execute(
-                    """
-                    SELECT tm.MeetingTitle, tm.MeetingDescription, tm.MeetingDate,
-                           tm.MeetingStartTime, tm.MeetingEndTime, tm.TeamMeetingId, tm.InvitationType
-                    FROM TeamMeeting tm
-                    INNER JOIN MeetingInvitations mi ON tm.TeamMeetingId = mi.MeetingId
-                    WHERE tm.TeamId = %s AND mi.UserId = %s AND mi.Status = 'accepted'
-                    ORDER BY tm.MeetingDate, tm.MeetingStartTime
-                    """,
-                    (team_id, internal_user_id)
-                )
+        team_ids = list(teams_dict.keys())
+        if team_ids:
+            cur.execute(
+                """
+                SELECT tm.MeetingTitle, tm.MeetingDescription, tm.MeetingDate,
+                       tm.MeetingStartTime, tm.MeetingEndTime, tm.TeamMeetingId, tm.InvitationType,
+                       tm.TeamId
+                FROM TeamMeeting tm
+                JOIN Team t ON tm.TeamId = t.TeamId
+                WHERE tm.TeamId = ANY(%s)
+                  AND (t.CreatedByUserId = %s
+                       OR EXISTS (
+                           SELECT 1 FROM MeetingInvitations mi
+                           WHERE mi.MeetingId = tm.TeamMeetingId AND mi.UserId = %s AND mi.Status = 'accepted'
+                       ))
+                ORDER BY tm.MeetingDate, tm.MeetingStartTime
+                """,
+                (team_ids, internal_user_id, internal_user_id)
+            )
+            meeting_rows = cur.fetchall()
+            members_by_meeting = _load_meeting_members(cur, [row[5] for row in meeting_rows])
 
-            for meeting_row in cur.fetchall():
+            for meeting_row in meeting_rows:
                 meeting_id = meeting_row[5]
-                meeting_data = {
+                teams_dict[meeting_row[7]]['meetings'].append({
                     'teammeetingid': meeting_id,
                     'meetingtitle': meeting_row[0],
                     'meetingdescription': meeting_row[1],
@@ -920,35 +2315,10 @@ def get_teams():
                     'meetingstarttime': format_time_to_hhmm(meeting_row[3]),
                     'meetingendtime': format_time_to_hhmm(meeting_row[4]),
                     'invitationtype': meeting_row[6],
-                    'members': []
-                }
-                
-                cur.execute(
-                    """
-                    SELECT u.UserId, u.UserName, u.UserEmail, 
-                           u.UserProfilePicture,
-                           mi.Status, mi.InvitationType
-                    FROM MeetingInvitations mi
-                    JOIN Users u ON mi.UserId = u.UserId
-                    WHERE mi.MeetingId = %s
-                    ORDER BY u.UserName
-                    """,
-                    (meeting_id,)
-                )
-
-                for member_row in cur.fetchall():
-                    meeting_data['members'].append({
-                        'userid': member_row[0],
-                        'username': member_row[1],
-                        'useremail': member_row[2],
-                        'userprofilepicture': member_row[3],
-                        'status': member_row[4],
-                        'invitationtype': member_row[5]
-                    })
-                
-                team_data['meetings'].append(meeting_data)
+                    'members': members_by_meeting.get(meeting_id, [])
+                })
 
-        return jsonify({'success': True, 'teams': list(teams_dict.values())}), 200
+        return _with_etag(jsonify({'success': True, 'teams': list(teams_dict.values())}), etag), 200
 
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -1024,9 +2394,12 @@ def get_team_details(team_id):
                 (team_id,)
             )
 
+        meeting_rows = cur.fetchall()
+        members_by_meeting = _load_meeting_members(cur, [row[0] for row in meeting_rows])
+
         meetings = []
-        for meeting_row in cur.fetchall():
-            meeting_data = {
+        for meeting_row in meeting_rows:
+            meetings.append({
                 'teammeetingid': meeting_row[0],
                 'meetingtitle': meeting_row[1],
                 'meetingdescription': meeting_row[2],
@@ -1034,32 +2407,8 @@ def get_team_details(team_id):
                 'meetingstarttime': format_time_to_hhmm(meeting_row[4]),
                 'meetingendtime': format_time_to_hhmm(meeting_row[5]),
                 'invitationtype': meeting_row[6],
-                'members': []
-            }
-
-            cur.execute(
-                """
-                SELECT u.UserId, u.UserName, u.UserEmail, u.UserProfilePicture,
-                       mi.Status, mi.InvitationType
-                FROM MeetingInvitations mi
-                JOIN Users u ON mi.UserId = u.UserId
-                WHERE mi.MeetingId = %s
-                ORDER BY u.UserName
-                """,
-                (meeting_row[0],)
-            )
-
-            for member_row in cur.fetchall():
-                meeting_data['members'].append({
-                    'userid': member_row[0],
-                    'username': member_row[1],
-                    'useremail': member_row[2],
-                    'userprofilepicture': member_row[3],
-                    'status': member_row[4],
-                    'invitationtype': member_row[5]
-                })
-
-            meetings.append(meeting_data)
+                'members': members_by_meeting.get(meeting_row[0], [])
+            })
 
         team_data['meetings'] = meetings
 
@@ -1138,6 +2487,7 @@ def add_team_meeting(team_id):
     meeting_end_time = data.get('meetingEndTime')
     invitation_type = data.get('invitationType', 'mandatory')
     invited_emails = data.get('invitedEmails', [])
+    check_conflicts = bool(data.get('checkConflicts'))
     
     if not meeting_title or not meeting_date:
         return jsonify({'success': False, 'message': 'Meeting title and date are required'}), 400
@@ -1150,12 +2500,21 @@ def add_team_meeting(team_id):
         conn = get_db_connection()
         cur = conn.cursor()
         
-        cur.execute("SELECT TeamName FROM Team WHERE TeamId = %s", (team_id,))
+        cur.execute("SELECT TeamName, CreatedByUserId FROM Team WHERE TeamId = %s", (team_id,))
         team_result = cur.fetchone()
         if not team_result:
             return jsonify({'success': False, 'message': 'Team not found'}), 404
         
         team_name = team_result[0]
+        user_ids_by_email, unknown_emails = _resolve_invitee_emails(cur, invited_emails)
+
+        if check_conflicts:
+            conflicts = _find_schedule_conflicts(
+                cur, set(user_ids_by_email.values()) | {team_result[1]},
+                [_conflict_window(meeting_date, meeting_date, parsed_start_time, parsed_end_time)]
+            )
+            if conflicts:
+                return _conflicts_response(conflicts)
         
         cur.execute(
             """
@@ -1169,64 +2528,20 @@ def add_team_meeting(team_id):
         
         meeting_id = cur.fetchone()[0]
         
-        for email in invited_emails:
-            if email.strip():
-                cur.execute("SELECT UserId FROM Users WHERE UserEmail = %s", (email.strip(),))
-                user_result = cur.fetchone()
-                
-                if user_result:
-                    user_id = user_result[0]
-                    
-                    cur.execute(
-                        """
-                        INSERT INTO TeamMembers (TeamId, UserId)
-                        SELECT %s, %s
-                        WHERE NOT EXISTS (
-                            SELECT 1 FROM TeamMembers WHERE TeamId = %s AND UserId = %s
-                        )
-                        """,
-                        (team_id, user_id, team_id, user_id)
-                    )
-                    
-                    cur.execute(
-                        """
-                        INSERT INTO MeetingInvitations (MeetingId, UserId, InvitationType, Status)
-                        VALUES (%s, %s, %s, %s)
-                        """,
-                        (meeting_id, user_id, invitation_type, 'accepted' if invitation_type == 'mandatory' else 'pending')
-                    )
-                    
-                    if invitation_type == 'request':
-                        meeting_time_info = ""
-                        if meeting_start_time and meeting_end_time:
-                            meeting_time_info = f" on {meeting_date} from {meeting_start_time} to {meeting_end_time}"
-                        elif meeting_date:
-                            meeting_time_info = f" on {meeting_date}"
-                        
-                        notification_message = f'You have been invited to join the meeting "{meeting_title}"{meeting_time_info} in team "{team_name}"'
-                        if meeting_description:
-                            notification_message += f'. Description: {meeting_description}'
-                        
-                        cur.execute(
-                            """
-                            INSERT INTO Notifications (UserId, Type, Title, Message, RelatedId)
-                            VALUES (%s, %s, %s, %s, %s)
-                            """,
-                            (
-                                user_id,
-                                'meeting_invitation',
-                                f'Meeting Invitation: {meeting_title}',
-                                notification_message,
-                                meeting_id
-                            )
-                        )
+        notification = None
+        if invitation_type == 'request':
+            notification = _meeting_request_notification(
+                meeting_title, meeting_description, meeting_date, meeting_start_time, meeting_end_time, team_name
+            )
+        _invite_users(cur, team_id, meeting_id, user_ids_by_email.values(), invitation_type, notification)
         
         conn.commit()
         
         return jsonify({
             'success': True,
             'message': 'Meeting added successfully',
-            'meetingId': meeting_id
+            'meetingId': meeting_id,
+            'unknownEmails': unknown_emails
         }), 201
         
     except Exception as e:
@@ -1252,6 +2567,7 @@ def update_meeting(meeting_id):
     invitation_type = data.get('invitationType', 'mandatory')
     new_member_emails = data.get('newMemberEmails', [])
     removed_member_ids = data.get('removedMemberIds', [])
+    check_conflicts = bool(data.get('checkConflicts'))
     
     if not title or not date:
         return jsonify({'success': False, 'message': 'Title and date are required'}), 400
@@ -1266,7 +2582,7 @@ def update_meeting(meeting_id):
         
         cur.execute(
             """
-            SELECT t.TeamId, t.TeamName 
+            SELECT t.TeamId, t.TeamName, t.CreatedByUserId
             FROM TeamMeeting tm JOIN Team t ON tm.TeamId = t.TeamId 
             WHERE tm.TeamMeetingId = %s
             """, 
@@ -1275,7 +2591,22 @@ def update_meeting(meeting_id):
         team_result = cur.fetchone()
         if not team_result:
             return jsonify({'success': False, 'message': 'Meeting not found'}), 404
-        team_id, team_name = team_result
+        team_id, team_name, team_creator_id = team_result
+        removed_ids = list(dict.fromkeys(int(user_id) for user_id in removed_member_ids))
+        user_ids_by_email, unknown_emails = _resolve_invitee_emails(cur, new_member_emails)
+
+        if check_conflicts:
+            cur.execute("SELECT UserId FROM MeetingInvitations WHERE MeetingId = %s", (meeting_id,))
+            attendees = {row[0] for row in cur.fetchall()}
+            attendees -= set(removed_ids)
+            attendees |= set(user_ids_by_email.values())
+            attendees.add(team_creator_id)
+            conflicts = _find_schedule_conflicts(
+                cur, attendees, [_conflict_window(date, date, parsed_start_time, parsed_end_time)],
+                exclude_meeting=meeting_id
+            )
+            if conflicts:
+                return _conflicts_response(conflicts)
 
         cur.execute(
             """
@@ -1287,40 +2618,22 @@ def update_meeting(meeting_id):
             (title, description, date, parsed_start_time, parsed_end_time, invitation_type, meeting_id)
         )
 
-        if removed_member_ids:
-            for user_id in removed_member_ids:
-                notification_message = f'You have been removed from the meeting "{title}" in team "{team_name}".'
-                cur.execute("INSERT INTO Notifications (UserId, Type, Title, Message) VALUES (%s, 'meeting_removed', %s, %s)",
-                            (user_id, f'Removed from Meeting: {title}', notification_message))
-                
-                cur.execute("DELETE FROM MeetingInvitations WHERE MeetingId = %s AND UserId = %s", (meeting_id, user_id))
-                cur.execute("DELETE FROM Notifications WHERE RelatedId = %s AND UserId = %s AND Type = 'meeting_invitation'", (meeting_id, user_id))
-        
-        if new_member_emails:
-            for email in new_member_emails:
-                cur.execute("SELECT UserId FROM Users WHERE UserEmail = %s", (email,))
-                user_result = cur.fetchone()
-                if user_result:
-                    user_id = user_result[0]
-                    
-                    cur.execute("SELECT 1 FROM TeamMembers WHERE TeamId = %s AND UserId = %s", (team_id, user_id))
-                    is_member = cur.fetchone()
-                    
-                    if not is_member:
-                        cur.execute("INSERT INTO TeamMembers (TeamId, UserId) VALUES (%s, %s)", (team_id, user_id))
-
-                    cur.execute("INSERT INTO MeetingInvitations (MeetingId, UserId, InvitationType, Status) VALUES (%s, %s, %s, %s)",
-                                (meeting_id, user_id, invitation_type, 'accepted' if invitation_type == 'mandatory' else 'pending'))
-                    
-                    if invitation_type == 'mandatory':
-                        notification_message = f'You have been invited to join the mandatory meeting "{title}" in team "{team_name}".'
-                    else: # 'request'
-                        notification_message = f'You have been invited to join the meeting "{title}" in team "{team_name}". Please respond.'
-                    cur.execute("INSERT INTO Notifications (UserId, Type, Title, Message, RelatedId) VALUES (%s, 'meeting_invitation', %s, %s, %s)",
-                                (user_id, f'New Meeting Invitation: {title}', notification_message, meeting_id))
+        if removed_ids:
+            notification_message = f'You have been removed from the meeting "{title}" in team "{team_name}".'
+            _queue_notifications(cur, removed_ids, 'meeting_removed', f'Removed from Meeting: {title}', notification_message)
+            cur.execute("DELETE FROM MeetingInvitations WHERE MeetingId = %s AND UserId = ANY(%s)", (meeting_id, removed_ids))
+            cur.execute("DELETE FROM Notifications WHERE RelatedId = %s AND UserId = ANY(%s) AND Type = 'meeting_invitation'", (meeting_id, removed_ids))
+        
+        if user_ids_by_email:
+            if invitation_type == 'mandatory':
+                notification_message = f'You have been invited to join the mandatory meeting "{title}" in team "{team_name}".'
+            else: # 'request'
+                notification_message = f'You have been invited to join the meeting "{title}" in team "{team_name}". Please respond.'
+            _invite_users(cur, team_id, meeting_id, user_ids_by_email.values(), invitation_type,
+                          (f'New Meeting Invitation: {title}', notification_message))
 
         conn.commit()
-        return jsonify({'success': True, 'message': 'Meeting updated successfully'}), 200
+        return jsonify({'success': True, 'message': 'Meeting updated successfully', 'unknownEmails': unknown_emails}), 200
         
     except Exception as e:
         if conn: conn.rollback()
@@ -1344,18 +2657,20 @@ def delete_team(team_id):
             return jsonify({'success': False, 'message': 'Team not found'}), 404
         team_name, creator_id = team_result
 
-        cur.execute("SELECT UserId FROM TeamMembers WHERE TeamId = %s", (team_id,))
-        member_ids = [row[0] for row in cur.fetchall()]
-
         notification_message = f'The team "{team_name}" has been deleted by the creator.'
-        for user_id in member_ids:
-            if user_id != creator_id:
-                cur.execute("INSERT INTO Notifications (UserId, Type, Title, Message) VALUES (%s, 'team_deleted', %s, %s)",
-                            (user_id, f'Team Deleted: {team_name}', notification_message))
-
-        cur.execute("DELETE FROM MeetingInvitations WHERE MeetingId IN (SELECT TeamMeetingId FROM TeamMeeting WHERE TeamId = %s)", (team_id,))
-        cur.execute("DELETE FROM TeamMeeting WHERE TeamId = %s", (team_id,))
-        cur.execute("DELETE FROM TeamMembers WHERE TeamId = %s", (team_id,))
+        cur.execute("SELECT UserId FROM TeamMembers WHERE TeamId = %s AND UserId IS DISTINCT FROM %s", (team_id, creator_id))
+        _queue_notifications(cur, [row[0] for row in cur.fetchall()], 'team_deleted',
+                             f'Team Deleted: {team_name}', notification_message)
+
+        cur.execute(
+            """
+            DELETE FROM Notifications
+            WHERE Type = 'meeting_invitation'
+              AND RelatedId IN (SELECT TeamMeetingId FROM TeamMeeting WHERE TeamId = %s)
+            """,
+            (team_id,)
+        )
+        # Meetings, their invitations and the memberships cascade (db/migrations/0010_foreign_key_cascades.sql).
         cur.execute("DELETE FROM Team WHERE TeamId = %s", (team_id,))
 
         conn.commit()
@@ -1379,32 +2694,24 @@ def delete_meeting(meeting_id):
 
         cur.execute(
             """
-            SELECT tm.MeetingTitle, t.TeamName, mi.UserId
+            SELECT tm.MeetingTitle, t.TeamName
             FROM TeamMeeting tm
-            JOIN Team t ON tm.TeamId = t.TeamId
-            JOIN MeetingInvitations mi ON tm.TeamMeetingId = mi.MeetingId
+            LEFT JOIN Team t ON tm.TeamId = t.TeamId
             WHERE tm.TeamMeetingId = %s
             """, (meeting_id,)
         )
-        results = cur.fetchall()
-        if not results:
-            cur.execute("DELETE FROM TeamMeeting WHERE TeamMeetingId = %s", (meeting_id,))
-            if cur.rowcount == 0:
-                return jsonify({'success': False, 'message': 'Meeting not found'}), 404
-            conn.commit()
-            return jsonify({'success': True, 'message': 'Meeting deleted successfully'}), 200
-
-        meeting_title = results[0][0]
-        team_name = results[0][1]
-        member_ids = [row[2] for row in results]
+        meeting_result = cur.fetchone()
+        if not meeting_result:
+            return jsonify({'success': False, 'message': 'Meeting not found'}), 404
+        meeting_title, team_name = meeting_result
 
         notification_message = f'The meeting "{meeting_title}" in team "{team_name}" has been canceled.'
-        for user_id in member_ids:
-            cur.execute("INSERT INTO Notifications (UserId, Type, Title, Message) VALUES (%s, 'meeting_canceled', %s, %s)",
-                        (user_id, f'Meeting Canceled: {meeting_title}', notification_message))
+        cur.execute("SELECT UserId FROM MeetingInvitations WHERE MeetingId = %s", (meeting_id,))
+        _queue_notifications(cur, [row[0] for row in cur.fetchall()], 'meeting_canceled',
+                             f'Meeting Canceled: {meeting_title}', notification_message)
 
-        cur.execute("DELETE FROM MeetingInvitations WHERE MeetingId = %s", (meeting_id,))
         cur.execute("DELETE FROM Notifications WHERE RelatedId = %s AND Type = 'meeting_invitation'", (meeting_id,))
+        # Invitations cascade.
         cur.execute("DELETE FROM TeamMeeting WHERE TeamMeetingId = %s", (meeting_id,))
         
         conn.commit()
@@ -1418,11 +2725,44 @@ def delete_meeting(meeting_id):
     finally:
         if conn: conn.close()
 
+def _notification_row_to_dict(row):
+    return {
+        'notificationid': row[0],
+        'type': row[1],
+        'title': row[2],
+        'message': row[3],
+        'relatedid': row[4],
+        'isread': row[5],
+        'createdat': row[6].isoformat() if row[6] else None,
+        'invitationstatus': row[7],
+        'invitationtype': row[8]
+    }
+
+def _get_unread_notification_count(cur, internal_user_id):
+    """Read the trigger-maintained unread counter for a user"""
+    cur.execute("SELECT UnreadCount FROM NotificationCounters WHERE UserId = %s", (internal_user_id,))
+    result = cur.fetchone()
+    return result[0] if result else 0
+
 @app.route('/api/notifications', methods=['GET'])
 def get_notifications():
+    """
+    List a user's notifications, newest first.
+    With `limit` the feed is paged by keyset on (CreatedAt, NotificationId);
+    pass the returned `nextCursor` as `cursor` to fetch the next page.
+    """
     user_id_param = request.args.get('userId')
     if not user_id_param:
         return jsonify({'success': False, 'message': 'User ID is required'}), 400
+
+    try:
+        limit = parse_page_limit(request.args.get('limit'))
+        before = None
+        if request.args.get('cursor'):
+            cursor_created_at, cursor_id = decode_cursor(request.args['cursor'])
+            before = (datetime.fromisoformat(cursor_created_at), int(cursor_id))
+    except (ValueError, TypeError):
+        return jsonify({'success': False, 'message': 'Invalid limit or cursor'}), 400
     
     conn = None
     try:
@@ -1432,44 +2772,47 @@ def get_notifications():
         internal_user_id = _get_internal_user_id(cur, user_id_param)
         if internal_user_id is None:
             return jsonify({'success': False, 'message': 'User not found'}), 404
-        
-        cur.execute(
-            """
+
+        etag = _data_etag('notifications', internal_user_id, _get_user_data_version(cur, internal_user_id))
+        if request.if_none_match.contains(etag):
+            return _not_modified(etag)
+
+        conditions = ["n.UserId = %s"]
+        params = [internal_user_id, internal_user_id]
+        if before:
+            conditions.append("(n.CreatedAt, n.NotificationId) < (%s, %s)")
+            params.extend(before)
+
+        query = f"""
             SELECT n.NotificationId, n.Type, n.Title, n.Message, n.RelatedId, n.IsRead, n.CreatedAt,
                    mi.Status as InvitationStatus,
                    tm.InvitationType
             FROM Notifications n
             LEFT JOIN MeetingInvitations mi ON n.RelatedId = mi.MeetingId AND n.Type = 'meeting_invitation' AND mi.UserId = %s
             LEFT JOIN TeamMeeting tm ON mi.MeetingId = tm.TeamMeetingId
-            WHERE n.UserId = %s
-            ORDER BY n.CreatedAt DESC
-            """,
-            (internal_user_id, internal_user_id)
-        )
+            WHERE {' AND '.join(conditions)}
+            ORDER BY n.CreatedAt DESC, n.NotificationId DESC
+            """
+        if limit:
+            query += " LIMIT %s"
+            params.append(limit + 1)
+
+        cur.execute(query, params)
+        rows = cur.fetchall()
+
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1][6], rows[-1][0]])
         
-        notifications = []
-        unread_count = 0
-        for row in cur.fetchall():
-            notification = {
-                'notificationid': row[0],
-                'type': row[1],
-                'title': row[2],
-                'message': row[3],
-                'relatedid': row[4],
-                'isread': row[5],
-                'createdat': row[6].isoformat() if row[6] else None,
-                'invitationstatus': row[7],
-                'invitationtype': row[8]
-            }
-            notifications.append(notification)
-            if not row[5]:
-                unread_count += 1
+        notifications = [_notification_row_to_dict(row) for row in rows]
         
-        return jsonify({
+        return _with_etag(jsonify({
             'success': True,
             'notifications': notifications,
-            'unreadCount': unread_count
-        }), 200
+            'unreadCount': _get_unread_notification_count(cur, internal_user_id),
+            'nextCursor': next_cursor
+        }), etag), 200
         
     except Exception as e:
         print(f"Error: {str(e)}")
@@ -1478,50 +2821,334 @@ def get_notifications():
     finally:
         if conn: conn.close()
 
-@app.route('/api/notifications/mark-all-read', methods=['PUT'])
-def mark_all_notifications_read():
-    """Mark all notifications as read for a user"""
+@app.route('/api/notifications/unread-count', methods=['GET'])
+def get_unread_notification_count():
+    """Lightweight unread badge count backed by NotificationCounters"""
+    user_id_param = request.args.get('userId')
+    if not user_id_param:
+        return jsonify({'success': False, 'message': 'User ID is required'}), 400
+
+    conn = None
     try:
-        data = request.get_json()
-        user_id = data.get('userId')
-        
-        if not user_id:
-            return jsonify({'success': False, 'message': 'User ID is required'}), 400
-        
         conn = get_db_connection()
         cur = conn.cursor()
-        
-        cur.execute(
-            """
-            UPDATE Notifications 
-            SET IsRead = TRUE 
-            WHERE UserId = %s AND IsRead = FALSE
-            """, 
-            (user_id,)
-        )
-        
-        conn.commit()
-        cur.close()
-        conn.close()
-        
+
+        internal_user_id = _get_internal_user_id(cur, user_id_param)
+        if internal_user_id is None:
+            return jsonify({'success': False, 'message': 'User not found'}), 404
+
         return jsonify({
             'success': True,
-            'message': 'All notifications marked as read'
+            'unreadCount': _get_unread_notification_count(cur, internal_user_id)
         }), 200
-        
+
     except Exception as e:
-        print(f"Error marking all notifications as read: {e}")
-        return jsonify({'success': False, 'message': 'Failed to mark notifications as read'}), 500
+        print(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to fetch unread count', 'error': str(e)}), 500
 
-@app.route('/api/notifications/<int:notification_id>/read', methods=['PUT'])
-def mark_notification_read(notification_id):
-    """Mark a specific notification as read"""
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        cur.execute(
-            """
+    finally:
+        if conn: conn.close()
+
+NOTIFICATION_CHANNEL = 'planit_notifications'
+NOTIFICATION_STREAM_HEARTBEAT = float(os.getenv("NOTIFICATION_STREAM_HEARTBEAT", "15"))
+NOTIFICATION_STREAM_MAX_SECONDS = float(os.getenv("NOTIFICATION_STREAM_MAX_SECONDS", "300"))
+NOTIFICATION_STREAM_RETRY_MS = 3000
+NOTIFICATION_STREAM_BATCH = 100
+# Open SSE responses (notification and AI streams) per process. Each pins a request thread for its
+# whole lifetime, so keep it well below Gunicorn's --threads.
+STREAM_MAX_CONCURRENT = int(os.getenv("STREAM_MAX_CONCURRENT", "8"))
+
+class StreamLimiter:
+    """
+    Per-process cap on open streaming responses. acquire() is non-blocking: a caller
+    over the cap is refused (503) rather than queued behind streams that may stay
+    open for minutes. The slot is released when the WSGI server closes the response.
+    """
+    def __init__(self, limit):
+        self.limit = limit
+        self.open = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.open >= self.limit:
+                self.rejected += 1
+                return False
+            self.open += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.open -= 1
+
+    def response(self, generator, mimetype):
+        """Wraps an already acquired slot's generator in a Response that gives the slot back on close"""
+        response = Response(generator, mimetype=mimetype,
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        response.call_on_close(self.release)
+        return response
+
+    def stats(self):
+        with self._lock:
+            return {'open': self.open, 'limit': self.limit, 'rejected': self.rejected}
+
+stream_limiter = StreamLimiter(STREAM_MAX_CONCURRENT)
+
+def _streams_busy():
+    response = jsonify({'success': False, 'message': 'Too many open streams, try again later'})
+    response.headers['Retry-After'] = str(int(NOTIFICATION_STREAM_HEARTBEAT))
+    return response, 503
+
+class NotificationBroker:
+    """
+    Per-process LISTEN loop on the planit_notifications channel.
+
+    A single background thread holds one dedicated connection, and each open
+    notification stream registers a threading.Event for its user. When Postgres
+    publishes a user id (see db/migrations/0003_notification_publish.sql), only
+    that user's streams are woken. While the listener is down, `listening` is
+    False and streams fall back to checking on every heartbeat.
+    """
+    def __init__(self, dsn):
+        self.dsn = dsn
+        self.listening = False
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, user_id):
+        event = threading.Event()
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(event)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='notification-listener', daemon=True)
+                self._thread.start()
+        return event
+
+    def unsubscribe(self, user_id, event):
+        with self._lock:
+            events = self._subscribers.get(user_id)
+            if events:
+                events.discard(event)
+                if not events:
+                    del self._subscribers[user_id]
+
+    def _wake(self, user_id=None):
+        with self._lock:
+            if user_id is None:
+                targets = [event for events in self._subscribers.values() for event in events]
+            else:
+                targets = list(self._subscribers.get(user_id, ()))
+        for event in targets:
+            event.set()
+
+    def _run(self):
+        backoff = 1
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cur = conn.cursor()
+                cur.execute(f"LISTEN {NOTIFICATION_CHANNEL}")
+                self.listening = True
+                backoff = 1
+                self._wake()
+                while True:
+                    if select.select([conn], [], [], NOTIFICATION_STREAM_HEARTBEAT) == ([], [], []):
+                        cur.execute("SELECT 1")
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            self._wake(int(notify.payload))
+                        except ValueError:
+                            self._wake()
+            except Exception as e:
+                print(f"Notification listener error: {e}")
+            finally:
+                self.listening = False
+                if conn:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+_notification_broker = None
+_notification_broker_pid = None
+
+def get_notification_broker():
+    global _notification_broker, _notification_broker_pid
+    if _notification_broker is None or _notification_broker_pid != os.getpid():
+        with _db_pool_lock:
+            if _notification_broker is None or _notification_broker_pid != os.getpid():
+                _notification_broker = NotificationBroker(os.getenv("DATABASE_URL"))
+                _notification_broker_pid = os.getpid()
+    return _notification_broker
+
+def _sse_event(event, data, event_id=None):
+    message = ''
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    return message + f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _notification_stream(internal_user_id, last_event_id):
+    """
+    Generator behind GET /api/notifications/stream.
+
+    Emits `ready` (with the resume id and unread count) once, then a
+    `notification` event per new row, each carrying its NotificationId as the
+    SSE id, and `unread` whenever the badge count changes. Heartbeat comments
+    keep proxies from closing the idle connection; after
+    NOTIFICATION_STREAM_MAX_SECONDS the stream ends and EventSource reconnects
+    with Last-Event-ID so no notification is skipped.
+    """
+    broker = get_notification_broker()
+    wake = broker.subscribe(internal_user_id)
+    deadline = time.monotonic() + NOTIFICATION_STREAM_MAX_SECONDS
+    last_unread = None
+    try:
+        yield f"retry: {NOTIFICATION_STREAM_RETRY_MS}\n\n"
+        while True:
+            wake.clear()
+            rows = []
+            with db_connection() as conn:
+                cur = conn.cursor()
+                if last_event_id is None:
+                    cur.execute("SELECT COALESCE(MAX(NotificationId), 0) FROM Notifications WHERE UserId = %s", (internal_user_id,))
+                    resume_id = cur.fetchone()[0]
+                else:
+                    cur.execute(
+                        """
+                        SELECT n.NotificationId, n.Type, n.Title, n.Message, n.RelatedId, n.IsRead, n.CreatedAt,
+                               mi.Status as InvitationStatus,
+                               tm.InvitationType
+                        FROM Notifications n
+                        LEFT JOIN MeetingInvitations mi ON n.RelatedId = mi.MeetingId AND n.Type = 'meeting_invitation' AND mi.UserId = %s
+                        LEFT JOIN TeamMeeting tm ON mi.MeetingId = tm.TeamMeetingId
+                        WHERE n.UserId = %s AND n.NotificationId > %s
+                        ORDER BY n.NotificationId
+                        LIMIT %s
+                        """,
+                        (internal_user_id, internal_user_id, last_event_id, NOTIFICATION_STREAM_BATCH)
+                    )
+                    rows = cur.fetchall()
+                unread = _get_unread_notification_count(cur, internal_user_id)
+
+            for row in rows:
+                last_event_id = row[0]
+                yield _sse_event('notification', _notification_row_to_dict(row), event_id=row[0])
+
+            if last_unread is None:
+                if last_event_id is None:
+                    last_event_id = resume_id
+                yield _sse_event('ready', {'unreadCount': unread}, event_id=last_event_id)
+            elif unread != last_unread:
+                yield _sse_event('unread', {'unreadCount': unread})
+            last_unread = unread
+
+            if len(rows) == NOTIFICATION_STREAM_BATCH:
+                continue
+
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                if wake.wait(min(NOTIFICATION_STREAM_HEARTBEAT, remaining)):
+                    break
+                yield ": heartbeat\n\n"
+                if not broker.listening:
+                    break
+    finally:
+        broker.unsubscribe(internal_user_id, wake)
+
+@app.route('/api/notifications/stream', methods=['GET'])
+def stream_notifications():
+    """Server-Sent Events stream of a user's new notifications and unread count"""
+    user_id_param = request.args.get('userId')
+    if not user_id_param:
+        return jsonify({'success': False, 'message': 'User ID is required'}), 400
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid Last-Event-ID'}), 400
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+
+        internal_user_id = _get_internal_user_id(cur, user_id_param)
+        if internal_user_id is None:
+            return jsonify({'success': False, 'message': 'User not found'}), 404
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to open notification stream', 'error': str(e)}), 500
+
+    finally:
+        if conn: conn.close()
+
+    # Over the cap the client keeps polling /api/notifications/unread-count instead.
+    if not stream_limiter.acquire():
+        return _streams_busy()
+    return stream_limiter.response(_notification_stream(internal_user_id, last_event_id), 'text/event-stream')
+
+@app.route('/api/notifications/mark-all-read', methods=['PUT'])
+def mark_all_notifications_read():
+    """Mark all notifications as read for a user"""
+    conn = None
+    try:
+        data = request.get_json()
+        user_id = data.get('userId')
+        
+        if not user_id:
+            return jsonify({'success': False, 'message': 'User ID is required'}), 400
+        
+        conn = get_db_connection()
+        cur = conn.cursor()
+        
+        cur.execute(
+            """
+            UPDATE Notifications 
+            SET IsRead = TRUE 
+            WHERE UserId = %s AND IsRead = FALSE
+            """, 
+            (user_id,)
+        )
+        
+        conn.commit()
+        cur.close()
+        
+        return jsonify({
+            'success': True,
+            'message': 'All notifications marked as read'
+        }), 200
+        
+    except Exception as e:
+        if conn: conn.rollback()
+        print(f"Error marking all notifications as read: {e}")
+        return jsonify({'success': False, 'message': 'Failed to mark notifications as read'}), 500
+    
+    finally:
+        if conn: conn.close()
+
+@app.route('/api/notifications/<int:notification_id>/read', methods=['PUT'])
+def mark_notification_read(notification_id):
+    """Mark a specific notification as read"""
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        
+        cur.execute(
+            """
             UPDATE Notifications 
             SET IsRead = TRUE 
             WHERE NotificationId = %s
@@ -1531,7 +3158,6 @@ def mark_notification_read(notification_id):
         
         conn.commit()
         cur.close()
-        conn.close()
         
         return jsonify({
             'success': True,
@@ -1539,12 +3165,17 @@ def mark_notification_read(notification_id):
         }), 200
         
     except Exception as e:
+        if conn: conn.rollback()
         print(f"Error marking notification as read: {e}")
         return jsonify({'success': False, 'message': 'Failed to mark notification as read'}), 500
+    
+    finally:
+        if conn: conn.close()
 
 @app.route('/api/notifications/<int:notification_id>', methods=['DELETE'])
 def delete_notification(notification_id):
     """Delete a specific notification"""
+    conn = None
     try:
         conn = get_db_connection()
         cur = conn.cursor()
@@ -1562,7 +3193,6 @@ def delete_notification(notification_id):
         
         conn.commit()
         cur.close()
-        conn.close()
         
         return jsonify({
             'success': True,
@@ -1570,8 +3200,12 @@ def delete_notification(notification_id):
         }), 200
         
     except Exception as e:
+        if conn: conn.rollback()
         print(f"Error deleting notification: {e}")
         return jsonify({'success': False, 'message': 'Failed to delete notification'}), 500
+    
+    finally:
+        if conn: conn.close()
 
 @app.route('/api/meeting-invitations/<int:meeting_id>/respond', methods=['PUT'])
 def respond_to_invitation(meeting_id):
@@ -1645,7 +3279,7 @@ def get_user(user_id):
             SELECT UserId, UserName, UserEmail, UserDOB, UserBio, 
                    UserProfilePicture, GoogleId
             FROM Users
-            WHERE UserId = %s
+            WHERE UserId = %s AND DeletedAt IS NULL
             """,
             (internal_user_id,)
         )
@@ -1714,7 +3348,7 @@ def update_user(user_id):
                 """
                 UPDATE Users 
                 SET UserName = %s, UserBio = %s, UserDOB = %s, UserProfilePicture = %s
-                WHERE UserId = %s
+                WHERE UserId = %s AND DeletedAt IS NULL
                 """,
                 (username, bio, parsed_dob, picture_value, user_id)
             )
@@ -1723,7 +3357,7 @@ def update_user(user_id):
                 """
                 UPDATE Users 
                 SET UserName = %s, UserBio = %s, UserDOB = %s
-                WHERE UserId = %s
+                WHERE UserId = %s AND DeletedAt IS NULL
                 """,
                 (username, bio, parsed_dob, user_id)
             )
@@ -1790,7 +3424,7 @@ def change_password(user_id):
         conn = get_db_connection()
         cur = conn.cursor()
         
-        cur.execute("SELECT UserPassword, GoogleId FROM Users WHERE UserId = %s", (user_id,))
+        cur.execute("SELECT UserPassword, GoogleId FROM Users WHERE UserId = %s AND DeletedAt IS NULL", (user_id,))
         user = cur.fetchone()
         
         if not user:
@@ -1799,10 +3433,11 @@ def change_password(user_id):
         if user[1]:  # GoogleId exists
             return jsonify({'success': False, 'message': 'Cannot change password for Google users'}), 400
         
-        if not user[0] or not check_password_hash(user[0], current_password):
+        hasher = get_password_hasher()
+        if not user[0] or not hasher.verify(user[0], current_password):
             return jsonify({'success': False, 'message': 'Current password is incorrect'}), 401
         
-        hashed_new_password = generate_password_hash(new_password)
+        hashed_new_password = hasher.hash(new_password)
         
         cur.execute(
             "UPDATE Users SET UserPassword = %s WHERE UserId = %s",
@@ -1816,6 +3451,9 @@ def change_password(user_id):
             'message': 'Password changed successfully'
         }), 200
         
+    except (PasswordHasherBusy, FutureTimeoutError):
+        return jsonify({'success': False, 'message': 'Server is busy, please try again'}), 503
+
     except Exception as e:
         if conn:
             conn.rollback()
@@ -1826,83 +3464,190 @@ def change_password(user_id):
         if conn:
             conn.close()
 
+ACCOUNT_PURGE_BATCH = int(os.getenv("ACCOUNT_PURGE_BATCH", "1000"))
+ACCOUNT_PURGE_PAUSE = float(os.getenv("ACCOUNT_PURGE_PAUSE", "0.05"))
+ACCOUNT_PURGE_LEASE = 60
+ACCOUNT_PURGE_RETRY_DELAY = 60
+
+# Owned rows first, then the teams the user created, then the user row itself.
+# Each stage is deleted ACCOUNT_PURGE_BATCH rows per transaction until nothing matches.
+_OWNED_MEETINGS = "SELECT tm.TeamMeetingId FROM TeamMeeting tm JOIN Team t ON tm.TeamId = t.TeamId WHERE t.CreatedByUserId = %(user_id)s"
+ACCOUNT_PURGE_STAGES = [
+    ('invitations', 'MeetingInvitations', "UserId = %(user_id)s"),
+    ('memberships', 'TeamMembers', "UserId = %(user_id)s"),
+    ('notifications', 'Notifications', "UserId = %(user_id)s"),
+    ('timelines', 'Timeline', "GoalId IN (SELECT GoalId FROM Goal WHERE UserId = %(user_id)s)"),
+    ('goals', 'Goal', "UserId = %(user_id)s"),
+    ('activities', 'Activity', "UserId = %(user_id)s"),
+    ('team_notifications', 'Notifications', f"Type = 'meeting_invitation' AND RelatedId IN ({_OWNED_MEETINGS})"),
+    ('team_invitations', 'MeetingInvitations', f"MeetingId IN ({_OWNED_MEETINGS})"),
+    ('team_meetings', 'TeamMeeting', "TeamId IN (SELECT TeamId FROM Team WHERE CreatedByUserId = %(user_id)s)"),
+    ('team_members', 'TeamMembers', "TeamId IN (SELECT TeamId FROM Team WHERE CreatedByUserId = %(user_id)s)"),
+    ('teams', 'Team', "CreatedByUserId = %(user_id)s"),
+    ('account', 'Users', "UserId = %(user_id)s"),
+]
+
+def _account_deletion_to_dict(row):
+    return {
+        'userid': row[0],
+        'requestedat': row[1].isoformat() if row[1] else None,
+        'startedat': row[2].isoformat() if row[2] else None,
+        'completedat': row[3].isoformat() if row[3] else None,
+        'stage': row[4],
+        'rowsdeleted': row[5],
+        'attempts': row[6],
+        'lasterror': row[7]
+    }
+
+def _claim_account_deletion(cur):
+    """Leases the oldest unfinished deletion nobody else holds; returns (user_id, stage) or None"""
+    cur.execute(
+        """
+        UPDATE AccountDeletions
+        SET LeaseUntil = now() + make_interval(secs => %s),
+            StartedAt = COALESCE(StartedAt, now()),
+            Attempts = Attempts + 1
+        WHERE UserId = (
+            SELECT UserId FROM AccountDeletions
+            WHERE CompletedAt IS NULL AND (LeaseUntil IS NULL OR LeaseUntil < now())
+            ORDER BY RequestedAt
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING UserId, Stage
+        """,
+        (ACCOUNT_PURGE_LEASE,)
+    )
+    return cur.fetchone()
+
+def purge_next_account(conn):
+    """
+    Purges one queued account deletion in bounded batches. Returns its user id, or None if there was none.
+
+    Every batch commits together with the deletion's progress and a renewed lease, so
+    locks on the shared team tables are held for one batch at a time and a purge that
+    dies part-way resumes from its recorded stage once the lease runs out.
+    """
+    cur = conn.cursor()
+    claimed = _claim_account_deletion(cur)
+    conn.commit()
+    if claimed is None:
+        return None
+    user_id, stage = claimed
+    stage_names = [name for name, _, _ in ACCOUNT_PURGE_STAGES]
+    first = stage_names.index(stage) if stage in stage_names else 0
+    try:
+        for name, table, condition in ACCOUNT_PURGE_STAGES[first:]:
+            while True:
+                cur.execute(
+                    f"DELETE FROM {table} WHERE ctid = ANY(ARRAY(SELECT ctid FROM {table} WHERE {condition} LIMIT %(limit)s))",
+                    {'user_id': user_id, 'limit': ACCOUNT_PURGE_BATCH}
+                )
+                deleted = cur.rowcount
+                cur.execute(
+                    """
+                    UPDATE AccountDeletions
+                    SET Stage = %s, RowsDeleted = RowsDeleted + %s, LeaseUntil = now() + make_interval(secs => %s)
+                    WHERE UserId = %s
+                    """,
+                    (name, deleted, ACCOUNT_PURGE_LEASE, user_id)
+                )
+                conn.commit()
+                if deleted < ACCOUNT_PURGE_BATCH:
+                    break
+                time.sleep(ACCOUNT_PURGE_PAUSE)
+        cur.execute(
+            "UPDATE AccountDeletions SET Stage = 'done', CompletedAt = now(), LeaseUntil = NULL, LastError = NULL WHERE UserId = %s",
+            (user_id,)
+        )
+        conn.commit()
+        print(f"Purged account {user_id}")
+    except Exception as e:
+        conn.rollback()
+        print(f"Account purge for {user_id} failed: {str(e)}")
+        cur.execute(
+            "UPDATE AccountDeletions SET LastError = %s, LeaseUntil = now() + make_interval(secs => %s) WHERE UserId = %s",
+            (str(e), ACCOUNT_PURGE_RETRY_DELAY, user_id)
+        )
+        conn.commit()
+    return user_id
+
 @app.route('/api/users/<int:user_id>', methods=['DELETE'])
 def delete_user(user_id):
-    """Delete user account and notify team creators."""
+    """
+    Delete a user account. The account is disabled and its email and Google id released
+    right away; the data is purged in the background by `python api/index.py worker`.
+    """
     conn = None
     try:
         conn = get_db_connection()
         cur = conn.cursor()
         
-        cur.execute("SELECT UserName FROM Users WHERE UserId = %s", (user_id,))
+        cur.execute("SELECT UserName FROM Users WHERE UserId = %s AND DeletedAt IS NULL FOR UPDATE", (user_id,))
         user_to_delete = cur.fetchone()
         
         if not user_to_delete:
             return jsonify({'success': False, 'message': 'User not found'}), 404
         deleted_user_name = user_to_delete[0]
 
+        notification_title = "Team Member Left"
+        notification_message = f"User '{deleted_user_name}' has deleted their account and has been removed from your team(s)."
         cur.execute(
             """
             SELECT DISTINCT t.CreatedByUserId
             FROM Team t
             JOIN TeamMembers tm ON t.TeamId = tm.TeamId
-            WHERE tm.UserId = %s
-            """, (user_id,)
-        )
-        creator_ids = [row[0] for row in cur.fetchall()]
-
-        notification_title = "Team Member Left"
-        notification_message = f"User '{deleted_user_name}' has deleted their account and has been removed from your team(s)."
-        
-        for creator_id in creator_ids:
-            if creator_id != user_id:
-                cur.execute(
-                    "INSERT INTO Notifications (UserId, Type, Title, Message) VALUES (%s, 'member_left_team', %s, %s)",
-                    (creator_id, notification_title, notification_message)
-                )
-        
-        cur.execute(
-            """
-            DELETE FROM MeetingInvitations 
-            WHERE UserId = %s
+            WHERE tm.UserId = %s AND t.CreatedByUserId <> %s
             """,
-            (user_id,)
+            (user_id, user_id)
         )
-        
-        cur.execute("DELETE FROM Notifications WHERE UserId = %s", (user_id,))
+        _queue_notifications(cur, [row[0] for row in cur.fetchall()], 'member_left_team',
+                             notification_title, notification_message)
         
         cur.execute(
             """
-            DELETE FROM Timeline 
-            WHERE GoalId IN (SELECT GoalId FROM Goal WHERE UserId = %s)
+            UPDATE Users
+            SET DeletedAt = now(), UserEmail = %s, GoogleId = NULL, UserPassword = NULL, CalendarFeedToken = NULL
+            WHERE UserId = %s
             """,
-            (user_id,)
+            (f"deleted+{user_id}@planit.invalid", user_id)
         )
-        
         cur.execute(
             """
-            DELETE FROM TeamMeeting 
-            WHERE TeamId IN (SELECT TeamId FROM Team WHERE CreatedByUserId = %s)
+            INSERT INTO AccountDeletions (UserId) VALUES (%s)
+            ON CONFLICT (UserId) DO UPDATE SET CompletedAt = NULL
+            RETURNING UserId, RequestedAt, StartedAt, CompletedAt, Stage, RowsDeleted, Attempts, LastError
             """,
             (user_id,)
         )
-        
-        cur.execute("DELETE FROM TeamMembers WHERE UserId = %s", (user_id,))
-        
-        cur.execute("DELETE FROM Team WHERE CreatedByUserId = %s", (user_id,))
-        
-        cur.execute("DELETE FROM Goal WHERE UserId = %s", (user_id,))
-        
-        cur.execute("DELETE FROM Activity WHERE UserId = %s", (user_id,))
-        
-        cur.execute("DELETE FROM Users WHERE UserId = %s", (user_id,))
+        deletion = _account_deletion_to_dict(cur.fetchone())
         
         conn.commit()
+        user_id_cache.invalidate_user(user_id)
+        if session.get('user_id') == user_id:
+            session.pop('user_id')
+
+        if not JOB_WORKER_ENABLED:
+            # Nobody else will purge it: work through the queue, oldest first, until this account is done.
+            while purge_next_account(conn) not in (None, user_id):
+                pass
+            cur.execute(
+                """
+                SELECT UserId, RequestedAt, StartedAt, CompletedAt, Stage, RowsDeleted, Attempts, LastError
+                FROM AccountDeletions
+                WHERE UserId = %s
+                """,
+                (user_id,)
+            )
+            deletion = _account_deletion_to_dict(cur.fetchone())
+            if deletion['completedat']:
+                return jsonify({'success': True, 'message': 'Account deleted', 'deletion': deletion}), 200
         
         return jsonify({
             'success': True,
-            'message': 'Account deleted successfully'
-        }), 200
+            'message': 'Account deletion started',
+            'deletion': deletion
+        }), 202
         
     except Exception as e:
         if conn:
@@ -1914,6 +3659,34 @@ def delete_user(user_id):
         if conn:
             conn.close()
 
+@app.route('/api/users/<int:user_id>/deletion', methods=['GET'])
+def get_account_deletion(user_id):
+    """Progress of a user's account deletion"""
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT UserId, RequestedAt, StartedAt, CompletedAt, Stage, RowsDeleted, Attempts, LastError
+            FROM AccountDeletions
+            WHERE UserId = %s
+            """,
+            (user_id,)
+        )
+        row = cur.fetchone()
+        if not row:
+            return jsonify({'success': False, 'message': 'No deletion found for this user'}), 404
+        return jsonify({'success': True, 'deletion': _account_deletion_to_dict(row)}), 200
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to fetch deletion status', 'error': str(e)}), 500
+
+    finally:
+        if conn:
+            conn.close()
+
 @app.route('/api/users/by-email/<email>', methods=['GET'])
 def get_user_by_email(email):
     """Get user details by email address"""
@@ -1959,41 +3732,1826 @@ def get_user_by_email(email):
         if conn:
             conn.close()
 
-@app.route('/api/ai/generate', methods=['POST'])
-def generate_ai_content():
-    # Check if user is logged in
-    if 'user_id' not in session:
-        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
 
-    data = request.get_json()
-    prompt = data.get('prompt')
-    
-    if not prompt:
-        return jsonify({'success': False, 'message': 'Prompt is required'}), 400
+# These expressions must match the GIN indexes in db/migrations/0006_search_indexes.sql.
+ACTIVITY_SEARCH_VECTOR = "to_tsvector('simple', coalesce(a.ActivityTitle, '') || ' ' || coalesce(a.ActivityDescription, ''))"
+GOAL_SEARCH_VECTOR = "to_tsvector('simple', coalesce(g.GoalTitle, '') || ' ' || coalesce(g.GoalDescription, ''))"
+TIMELINE_SEARCH_VECTOR = "to_tsvector('simple', coalesce(t.TimelineTitle, ''))"
+MEETING_SEARCH_VECTOR = "to_tsvector('simple', coalesce(tm.MeetingTitle, '') || ' ' || coalesce(tm.MeetingDescription, ''))"
 
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        return jsonify({'success': False, 'message': 'Server API key not configured'}), 500
+def _search_tsquery(query):
+    """Turns free text into a prefix tsquery ('plan:* & week:*'), or None when it has no words."""
+    words = re.findall(r'[^\W_]+', query.lower())
+    return ' & '.join(f"{word}:*" for word in words) if words else None
 
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={api_key}"
-    
-    payload = {
-        "contents": [{
-            "parts": [{"text": prompt}]
-        }],
-        "generationConfig": {
-            "temperature": 0.1,
-            "maxOutputTokens": 1000
-        }
+def _like_pattern(text, prefix_only=False):
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"{escaped}%" if prefix_only else f"%{escaped}%"
+
+def _search_match(title_columns, vectors, has_tsquery):
+    """
+    Builds the WHERE clause and rank expression for one entity: a trigram-indexed
+    substring match on the titles, or a full-text prefix match on titles and descriptions.
+    Exact and prefix title matches rank above fuzzy ones.
+    """
+    matches = [f"{column} ILIKE %(pattern)s" for column in title_columns]
+    ranks = [f"similarity(coalesce({column}, ''), %(q)s)" for column in title_columns]
+    if has_tsquery:
+        matches += [f"{vector} @@ to_tsquery('simple', %(tsquery)s)" for vector in vectors]
+        ranks += [f"ts_rank({vector}, to_tsquery('simple', %(tsquery)s))" for vector in vectors]
+    exact = ' OR '.join(f"lower({column}) = lower(%(q)s)" for column in title_columns)
+    prefix = ' OR '.join(f"{column} ILIKE %(prefix)s" for column in title_columns)
+    rank = f"GREATEST({', '.join(ranks)}) + CASE WHEN {exact} THEN 1.0 WHEN {prefix} THEN 0.5 ELSE 0 END"
+    return f"({' OR '.join(matches)})", rank
+
+@app.route('/api/search', methods=['GET'])
+def search():
+    """
+    Ranked search over the user's activities, goal timelines and visible meetings.
+    Query params: userId, q, limit (default 10, at most 50).
+    """
+    user_id_param = request.args.get('userId')
+    query = (request.args.get('q') or '').strip()
+    if not user_id_param:
+        return jsonify({'success': False, 'message': 'User ID is required'}), 400
+    try:
+        limit = min(int(request.args.get('limit', SEARCH_DEFAULT_LIMIT)), SEARCH_MAX_LIMIT)
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit must be a positive integer'}), 400
+    if not query:
+        return jsonify({'success': True, 'results': []}), 200
+
+    tsquery = _search_tsquery(query)
+    params = {
+        'q': query,
+        'tsquery': tsquery,
+        'pattern': _like_pattern(query),
+        'prefix': _like_pattern(query, prefix_only=True),
+        'limit': limit
     }
 
+    conn = None
     try:
-        response = requests.post(url, json=payload, headers={"Content-Type": "application/json"})
-        response.raise_for_status()
-        return jsonify(response.json()), 200
-    except Exception as e:
-        print(f"Gemini API Error: {str(e)}")
-        return jsonify({'success': False, 'message': 'Failed to communicate with AI service'}), 500
+        conn = get_db_connection()
+        cur = conn.cursor()
 
-if __name__ == '__main__':
-    app.run(debug=False)
+        internal_user_id = _get_internal_user_id(cur, user_id_param)
+        if internal_user_id is None:
+            return jsonify({'success': False, 'message': 'User not found'}), 404
+        params['user_id'] = internal_user_id
+
+        etag = _data_etag('search', internal_user_id, _get_user_data_version(cur, internal_user_id))
+        if request.if_none_match.contains(etag):
+            return _not_modified(etag)
+
+        results = []
+
+        match, rank = _search_match(['a.ActivityTitle'], [ACTIVITY_SEARCH_VECTOR], tsquery)
+        cur.execute(
+            f"""
+            SELECT a.ActivityId, a.ActivityTitle, a.ActivityDescription, a.ActivityCategory,
+                   a.ActivityUrgency, a.ActivityDate, a.ActivityStartTime, a.ActivityEndTime,
+                   {rank} AS rank
+            FROM Activity a
+            WHERE a.UserId = %(user_id)s AND {match}
+            ORDER BY rank DESC, a.ActivityDate DESC
+            LIMIT %(limit)s
+            """,
+            params
+        )
+        for row in cur.fetchall():
+            results.append({
+                'type': 'activity',
+                'id': row[0],
+                'title': row[1],
+                'rank': float(row[8]),
+                'item': {
+                    'activityid': row[0],
+                    'activitytitle': row[1],
+                    'activitydescription': row[2],
+                    'activitycategory': row[3],
+                    'activityurgency': row[4],
+                    'activitydate': row[5].isoformat() if row[5] else None,
+                    'activitystarttime': format_time_to_hhmm(row[6]),
+                    'activityendtime': format_time_to_hhmm(row[7])
+                }
+            })
+
+        match, rank = _search_match(
+            ['g.GoalTitle', 't.TimelineTitle'], [GOAL_SEARCH_VECTOR, TIMELINE_SEARCH_VECTOR], tsquery
+        )
+        cur.execute(
+            f"""
+            SELECT g.GoalId, g.GoalTitle, g.GoalDescription, g.GoalCategory, g.GoalProgress,
+                   t.TimelineId, t.TimelineTitle, t.TimelineStartDate, t.TimelineEndDate,
+                   t.TimelineStartTime, t.TimelineEndTime,
+                   {rank} AS rank
+            FROM Goal g
+            JOIN Timeline t ON t.GoalId = g.GoalId
+            WHERE g.UserId = %(user_id)s AND {match}
+            ORDER BY rank DESC, t.TimelineStartDate DESC
+            LIMIT %(limit)s
+            """,
+            params
+        )
+        for row in cur.fetchall():
+            results.append({
+                'type': 'goal',
+                'id': row[0],
+                'timelineid': row[5],
+                'title': f"{row[1]} - {row[6]}",
+                'rank': float(row[11]),
+                'item': {
+                    'goalid': row[0],
+                    'goaltitle': row[1],
+                    'goaldescription': row[2],
+                    'goalcategory': row[3],
+                    'goalprogress': row[4],
+                    'timelineid': row[5],
+                    'timelinetitle': row[6],
+                    'timelinestartdate': row[7].isoformat() if row[7] else None,
+                    'timelineenddate': row[8].isoformat() if row[8] else None,
+                    'timelinestarttime': format_time_to_hhmm(row[9]),
+                    'timelineendtime': format_time_to_hhmm(row[10])
+                }
+            })
+
+        # Same visibility as get_teams: meetings of the user's teams that they created or accepted.
+        match, rank = _search_match(['tm.MeetingTitle'], [MEETING_SEARCH_VECTOR], tsquery)
+        cur.execute(
+            f"""
+            SELECT tm.TeamMeetingId, tm.MeetingTitle, tm.MeetingDescription, tm.MeetingDate,
+                   tm.MeetingStartTime, tm.MeetingEndTime, tm.InvitationType,
+                   t.TeamId, t.TeamName,
+                   {rank} AS rank
+            FROM TeamMeeting tm
+            JOIN Team t ON tm.TeamId = t.TeamId
+            JOIN TeamMembers tmem ON tmem.TeamId = t.TeamId AND tmem.UserId = %(user_id)s
+            WHERE {match}
+              AND (t.CreatedByUserId = %(user_id)s
+                   OR EXISTS (
+                       SELECT 1 FROM MeetingInvitations mi
+                       WHERE mi.MeetingId = tm.TeamMeetingId AND mi.UserId = %(user_id)s AND mi.Status = 'accepted'
+                   ))
+            ORDER BY rank DESC, tm.MeetingDate DESC
+            LIMIT %(limit)s
+            """,
+            params
+        )
+        meeting_rows = cur.fetchall()
+        members_by_meeting = _load_meeting_members(cur, [row[0] for row in meeting_rows])
+        for row in meeting_rows:
+            results.append({
+                'type': 'meeting',
+                'id': row[0],
+                'title': row[1],
+                'rank': float(row[9]),
+                'item': {
+                    'teammeetingid': row[0],
+                    'meetingtitle': row[1],
+                    'meetingdescription': row[2],
+                    'meetingdate': row[3].isoformat() if row[3] else None,
+                    'meetingstarttime': format_time_to_hhmm(row[4]),
+                    'meetingendtime': format_time_to_hhmm(row[5]),
+                    'invitationtype': row[6],
+                    'teamid': row[7],
+                    'teamname': row[8],
+                    'members': members_by_meeting.get(row[0], [])
+                }
+            })
+
+        results.sort(key=lambda result: (-result['rank'], result['title'].lower()))
+        return _with_etag(jsonify({'success': True, 'results': results[:limit]}), etag), 200
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Search failed', 'error': str(e)}), 500
+
+    finally:
+        if conn:
+            conn.close()
+
+CALENDAR_FEED_CACHE_MAX_BYTES = int(os.getenv("CALENDAR_FEED_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CALENDAR_FEED_FETCH_SIZE = 2000
+CALENDAR_FEED_CHUNK_EVENTS = 200
+
+class CalendarFeedCache:
+    """
+    Per-process LRU of rendered ICS feeds keyed by user id and tagged with the user data
+    version they were rendered at, so any write the user can see invalidates the entry.
+    Bounded by total bytes; feeds larger than an eighth of the budget are not cached.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def put(self, user_id, version, body):
+        if len(body) > self.max_bytes // 8:
+            return
+        with self._lock:
+            previous = self._entries.pop(user_id, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            self._entries[user_id] = (version, body)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+calendar_feed_cache = CalendarFeedCache(CALENDAR_FEED_CACHE_MAX_BYTES)
+
+def _ics_escape(text):
+    return (text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+def _ics_line(line):
+    """Folds a content line at 75 octets without splitting UTF-8 sequences"""
+    if len(line) <= 75 and line.isascii():
+        return line + '\r\n'
+    parts, current, size = [], [], 0
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > 75:
+            parts.append(''.join(current))
+            current, size = [' '], 1
+        current.append(char)
+        size += char_size
+    parts.append(''.join(current))
+    return '\r\n'.join(parts) + '\r\n'
+
+def _ics_event(kind, item_id, title, description, category, date_from, date_to, start_time, end_time, stamp):
+    """
+    Renders one VEVENT. Times are floating (no time zone), matching how the app stores them.
+    A goal timeline occupies the same hours on each day it spans, so timed timelines repeat daily.
+    An end at or before the start runs to midnight, as elsewhere in the app.
+    """
+    lines = ['BEGIN:VEVENT', f'UID:{kind}-{item_id}@planit', f'DTSTAMP:{stamp}', f'SUMMARY:{_ics_escape(title or "")}']
+    if description:
+        lines.append(f'DESCRIPTION:{_ics_escape(description)}')
+    if category:
+        lines.append(f'CATEGORIES:{_ics_escape(category)}')
+
+    if start_time and end_time:
+        start = datetime.combine(date_from, start_time)
+        end = datetime.combine(date_from, end_time)
+        if end <= start:
+            end = datetime.combine(date_from + timedelta(days=1), datetime.min.time())
+        lines.append(f'DTSTART:{start:%Y%m%dT%H%M%S}')
+        lines.append(f'DTEND:{end:%Y%m%dT%H%M%S}')
+        if date_to > date_from:
+            lines.append(f'RRULE:FREQ=DAILY;UNTIL={date_to:%Y%m%d}T235959')
+    elif start_time and date_to == date_from:
+        lines.append(f'DTSTART:{datetime.combine(date_from, start_time):%Y%m%dT%H%M%S}')
+    else:
+        lines.append(f'DTSTART;VALUE=DATE:{date_from:%Y%m%d}')
+        lines.append(f'DTEND;VALUE=DATE:{date_to + timedelta(days=1):%Y%m%d}')
+
+    lines.append('END:VEVENT')
+    return ''.join(_ics_line(line) for line in lines)
+
+def _calendar_feed(internal_user_id, user_name, version, updated_at):
+    """
+    Streams a user's ICS feed from a server-side cursor, a few hundred events per chunk,
+    and caches the rendered body for this data version once the stream completes.
+    """
+    stamp = (updated_at or datetime.now(timezone.utc)).astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    chunks = []
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor(name='calendar_feed')
+        cur.itersize = CALENDAR_FEED_FETCH_SIZE
+        cur.execute(
+            """
+            SELECT 'activity', a.ActivityId, a.ActivityTitle, a.ActivityDescription, a.ActivityCategory,
+                   a.ActivityDate, a.ActivityDate, a.ActivityStartTime, a.ActivityEndTime
+            FROM Activity a
+            WHERE a.UserId = %s
+            UNION ALL
+            SELECT 'timeline', t.TimelineId, g.GoalTitle || ' - ' || t.TimelineTitle, g.GoalDescription,
+                   g.GoalCategory, t.TimelineStartDate, t.TimelineEndDate, t.TimelineStartTime, t.TimelineEndTime
+            FROM Timeline t
+            JOIN Goal g ON t.GoalId = g.GoalId
+            WHERE g.UserId = %s
+            UNION ALL
+            SELECT 'meeting', tm.TeamMeetingId, tm.MeetingTitle, tm.MeetingDescription, t.TeamName,
+                   tm.MeetingDate, tm.MeetingDate, tm.MeetingStartTime, tm.MeetingEndTime
+            FROM TeamMeeting tm
+            JOIN Team t ON tm.TeamId = t.TeamId
+            WHERE tm.TeamMeetingId IN (
+                SELECT mi.MeetingId FROM MeetingInvitations mi
+                WHERE mi.UserId = %s AND mi.Status = 'accepted'
+                UNION
+                SELECT own.TeamMeetingId FROM TeamMeeting own
+                JOIN Team owner_team ON own.TeamId = owner_team.TeamId
+                WHERE owner_team.CreatedByUserId = %s
+            )
+            """,
+            (internal_user_id, internal_user_id, internal_user_id, internal_user_id)
+        )
+
+        header = ''.join(_ics_line(line) for line in (
+            'BEGIN:VCALENDAR', 'VERSION:2.0', 'PRODID:-//PlanIt//Calendar Feed//EN', 'CALSCALE:GREGORIAN',
+            'METHOD:PUBLISH', f'X-WR-CALNAME:{_ics_escape(f"PlanIt - {user_name}")}'
+        )).encode('utf-8')
+        chunks.append(header)
+        yield header
+
+        pending = []
+        for row in cur:
+            if row[5] is None:
+                continue
+            pending.append(_ics_event(*row, stamp))
+            if len(pending) >= CALENDAR_FEED_CHUNK_EVENTS:
+                chunk = ''.join(pending).encode('utf-8')
+                chunks.append(chunk)
+                pending = []
+                yield chunk
+
+        footer = (''.join(pending) + _ics_line('END:VCALENDAR')).encode('utf-8')
+        chunks.append(footer)
+        yield footer
+
+        calendar_feed_cache.put(internal_user_id, version, b''.join(chunks))
+
+    except Exception as e:
+        # Headers are already sent; a truncated body makes the client keep its previous copy.
+        print(f"Error streaming calendar feed: {e}")
+
+    finally:
+        if conn: conn.close()
+
+@app.route('/api/users/<int:user_id>/calendar-token', methods=['POST'])
+def create_calendar_feed_token(user_id):
+    """Create (or rotate) the secret token of the user's calendar feed URL"""
+    if session.get('user_id') != user_id:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+
+    token = secrets.token_urlsafe(32)
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(
+            "UPDATE Users SET CalendarFeedToken = %s WHERE UserId = %s AND DeletedAt IS NULL",
+            (token, user_id)
+        )
+        if cur.rowcount == 0:
+            return jsonify({'success': False, 'message': 'User not found'}), 404
+        conn.commit()
+        return jsonify({'success': True, 'token': token, 'url': f'/api/calendar/{token}.ics'}), 200
+
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to create calendar feed token', 'error': str(e)}), 500
+
+    finally:
+        if conn:
+            conn.close()
+
+@app.route('/api/calendar/<token>.ics', methods=['GET'])
+def get_calendar_feed(token):
+    """ICS subscription feed of a user's activities, goal timelines and accepted meetings"""
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+
+        cur.execute(
+            """
+            SELECT u.UserId, u.UserName, v.Version, v.UpdatedAt
+            FROM Users u
+            LEFT JOIN UserDataVersions v ON v.UserId = u.UserId
+            WHERE u.CalendarFeedToken = %s AND u.DeletedAt IS NULL
+            """,
+            (token,)
+        )
+        row = cur.fetchone()
+        if not row:
+            return jsonify({'success': False, 'message': 'Calendar feed not found'}), 404
+        internal_user_id, user_name, version, updated_at = row
+        version = version or 0
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to load calendar feed', 'error': str(e)}), 500
+
+    finally:
+        if conn: conn.close()
+
+    etag = f"calendar-{internal_user_id}-{version}"
+    if updated_at is not None:
+        updated_at = updated_at.astimezone(timezone.utc).replace(microsecond=0)
+    if request.if_none_match.contains(etag) or (
+        not request.if_none_match and updated_at is not None
+        and request.if_modified_since is not None and updated_at <= request.if_modified_since
+    ):
+        response = _not_modified(etag)
+        response.last_modified = updated_at
+        return response
+
+    body = calendar_feed_cache.get(internal_user_id, version)
+    if body is None:
+        body = _calendar_feed(internal_user_id, user_name, version, updated_at)
+    response = _with_etag(Response(body, mimetype='text/calendar'), etag)
+    response.last_modified = updated_at
+    response.headers['Content-Disposition'] = 'inline; filename="planit.ics"'
+    return response, 200
+
+FREEBUSY_MAX_DAYS = 366
+FREEBUSY_MAX_USERS = 500
+
+def merge_intervals(intervals):
+    """Merge overlapping or touching (start, end) pairs into a sorted, disjoint list"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+def _timed_interval(day, start_time, end_time):
+    """
+    Combine a date with start/end times into a (start, end) datetime pair.
+    Items without both times carry no busy time; an end at or before the start runs to midnight.
+    """
+    if start_time is None or end_time is None:
+        return None
+    start = datetime.combine(day, start_time)
+    end = datetime.combine(day, end_time)
+    if end <= start:
+        end = datetime.combine(day + timedelta(days=1), datetime.min.time())
+    return start, end
+
+def _parse_date_range(date_from, date_to, max_days=FREEBUSY_MAX_DAYS):
+    """Parse an inclusive YYYY-MM-DD range. Raises ValueError when missing, malformed or too long."""
+    if not date_from or not date_to:
+        raise ValueError('Both from and to dates are required')
+    start = datetime.strptime(date_from, '%Y-%m-%d').date()
+    end = datetime.strptime(date_to, '%Y-%m-%d').date()
+    if end < start:
+        raise ValueError('End date must be on or after start date')
+    if (end - start).days + 1 > max_days:
+        raise ValueError(f'Date range cannot exceed {max_days} days')
+    return start, end
+
+def _resolve_users(cur, emails=(), user_ids=()):
+    """
+    Resolves emails, internal ids and Google ids to users with one query.
+    Returns (users, unknown_emails, unknown_ids) where users maps UserId -> (UserName, UserEmail).
+    """
+    int_ids, google_ids = [], []
+    for user_id in user_ids:
+        try:
+            int_ids.append(int(user_id))
+        except (ValueError, TypeError):
+            google_ids.append(str(user_id))
+
+    users = {}
+    found_emails, found_ids = set(), set()
+    if emails or int_ids or google_ids:
+        cur.execute(
+            """
+            SELECT UserId, UserName, UserEmail, GoogleId
+            FROM Users
+            WHERE (UserEmail = ANY(%s) OR UserId = ANY(%s) OR GoogleId = ANY(%s))
+              AND DeletedAt IS NULL
+            """,
+            (list(emails), int_ids, google_ids)
+        )
+        for row in cur.fetchall():
+            users[row[0]] = (row[1], row[2])
+            found_emails.add(row[2])
+            found_ids.add(str(row[0]))
+            if row[3]:
+                found_ids.add(row[3])
+
+    unknown_emails = [email for email in emails if email not in found_emails]
+    unknown_ids = [user_id for user_id in user_ids if str(user_id) not in found_ids]
+    return users, unknown_emails, unknown_ids
+
+def _load_schedule_items(cur, user_ids, date_from, date_to):
+    """
+    Loads the timed Activity rows, Goal Timeline days and TeamMeeting rows (accepted
+    invitations, or meetings of teams the user created) that fall in [date_from, date_to]
+    for many users, using three range-bounded queries.
+    Returns a dict of user id -> list of item dicts with 'start'/'end' datetimes.
+    """
+    items = {user_id: [] for user_id in user_ids}
+    if not user_ids:
+        return items
+    user_ids = list(user_ids)
+
+    cur.execute(
+        """
+        SELECT UserId, ActivityId, ActivityTitle, ActivityUrgency,
+               ActivityDate, ActivityStartTime, ActivityEndTime
+        FROM Activity
+        WHERE UserId = ANY(%s) AND ActivityDate BETWEEN %s AND %s
+        """,
+        (user_ids, date_from, date_to)
+    )
+    for row in cur.fetchall():
+        interval = _timed_interval(row[4], row[5], row[6])
+        if interval:
+            items[row[0]].append({
+                'type': 'activity', 'id': row[1], 'title': row[2], 'urgency': row[3],
+                'start': interval[0], 'end': interval[1]
+            })
+
+    cur.execute(
+        """
+        SELECT g.UserId, t.TimelineId, g.GoalTitle, t.TimelineTitle,
+               t.TimelineStartDate, t.TimelineEndDate, t.TimelineStartTime, t.TimelineEndTime
+        FROM Timeline t
+        JOIN Goal g ON t.GoalId = g.GoalId
+        WHERE g.UserId = ANY(%s) AND t.TimelineStartDate <= %s AND t.TimelineEndDate >= %s
+        """,
+        (user_ids, date_to, date_from)
+    )
+    for row in cur.fetchall():
+        # A timeline occupies the same hours on every day it spans.
+        day = max(row[4], date_from)
+        last_day = min(row[5], date_to)
+        while day <= last_day:
+            interval = _timed_interval(day, row[6], row[7])
+            if not interval:
+                break
+            items[row[0]].append({
+                'type': 'goal', 'id': row[1], 'title': f"{row[2]} - {row[3]}", 'urgency': None,
+                'start': interval[0], 'end': interval[1]
+            })
+            day += timedelta(days=1)
+
+    cur.execute(
+        """
+        SELECT mi.UserId, tm.TeamMeetingId, tm.MeetingTitle, tm.MeetingDate,
+               tm.MeetingStartTime, tm.MeetingEndTime
+        FROM MeetingInvitations mi
+        JOIN TeamMeeting tm ON mi.MeetingId = tm.TeamMeetingId
+        WHERE mi.UserId = ANY(%s) AND mi.Status = 'accepted' AND tm.MeetingDate BETWEEN %s AND %s
+        UNION
+        SELECT t.CreatedByUserId, tm.TeamMeetingId, tm.MeetingTitle, tm.MeetingDate,
+               tm.MeetingStartTime, tm.MeetingEndTime
+        FROM TeamMeeting tm
+        JOIN Team t ON tm.TeamId = t.TeamId
+        WHERE t.CreatedByUserId = ANY(%s) AND tm.MeetingDate BETWEEN %s AND %s
+        """,
+        (user_ids, date_from, date_to, user_ids, date_from, date_to)
+    )
+    for row in cur.fetchall():
+        interval = _timed_interval(row[3], row[4], row[5])
+        if interval:
+            items[row[0]].append({
+                'type': 'meeting', 'id': row[1], 'title': row[2], 'urgency': None,
+                'start': interval[0], 'end': interval[1]
+            })
+
+    return items
+
+def _format_datetime(value):
+    return value.strftime('%Y-%m-%dT%H:%M')
+
+@app.route('/api/freebusy', methods=['POST'])
+def get_freebusy():
+    """
+    Merged busy intervals for many users over a date range in one round trip.
+    Body: {"emails": [...], "userIds": [...], "from": "YYYY-MM-DD", "to": "YYYY-MM-DD",
+    "includeItems": false}. Items without start and end times are not counted as busy.
+    """
+    data = request.get_json() or {}
+    emails = [email.strip() for email in data.get('emails', []) if email and email.strip()]
+    user_ids = [user_id for user_id in data.get('userIds', []) if user_id not in (None, '')]
+    include_items = bool(data.get('includeItems', False))
+
+    if not emails and not user_ids:
+        return jsonify({'success': False, 'message': 'At least one email or user ID is required'}), 400
+    if len(emails) + len(user_ids) > FREEBUSY_MAX_USERS:
+        return jsonify({'success': False, 'message': f'At most {FREEBUSY_MAX_USERS} users can be queried at once'}), 400
+
+    try:
+        date_from, date_to = _parse_date_range(data.get('from'), data.get('to'))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+
+        users, unknown_emails, unknown_ids = _resolve_users(cur, emails, user_ids)
+        schedule_items = _load_schedule_items(cur, users.keys(), date_from, date_to)
+
+        results = []
+        for user_id, (username, useremail) in users.items():
+            user_items = schedule_items[user_id]
+            user_data = {
+                'userid': user_id,
+                'username': username,
+                'useremail': useremail,
+                'busy': [
+                    {'start': _format_datetime(start), 'end': _format_datetime(end)}
+                    for start, end in merge_intervals((item['start'], item['end']) for item in user_items)
+                ]
+            }
+            if include_items:
+                user_data['items'] = [
+                    dict(item, start=_format_datetime(item['start']), end=_format_datetime(item['end']))
+                    for item in sorted(user_items, key=lambda item: item['start'])
+                ]
+            results.append(user_data)
+
+        return jsonify({
+            'success': True,
+            'from': date_from.isoformat(),
+            'to': date_to.isoformat(),
+            'users': results,
+            'unknownEmails': unknown_emails,
+            'unknownUserIds': unknown_ids
+        }), 200
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to fetch free/busy information', 'error': str(e)}), 500
+
+    finally:
+        if conn: conn.close()
+
+SLOT_STEP_MINUTES = 30
+SLOT_MAX_PER_DAY = 3
+SLOT_MAX_SUGGESTIONS = 50
+LUNCH_START = datetime.strptime('12:00', '%H:%M').time()
+LUNCH_END = datetime.strptime('13:00', '%H:%M').time()
+TIME_PREFERENCE_WINDOWS = {
+    'morning': (datetime.strptime('00:00', '%H:%M').time(), datetime.strptime('12:00', '%H:%M').time()),
+    'afternoon': (datetime.strptime('12:00', '%H:%M').time(), datetime.strptime('17:00', '%H:%M').time()),
+    'evening': (datetime.strptime('17:00', '%H:%M').time(), datetime.max.time())
+}
+
+def _preference_window(preference):
+    """Map free-text preferences such as "afternoon please" to a (start, end) time window"""
+    text = (preference or '').lower()
+    for keyword, window in TIME_PREFERENCE_WINDOWS.items():
+        if keyword in text:
+            return window
+    return None
+
+def _working_windows(date_from, date_to, work_start, work_end):
+    day = date_from
+    while day <= date_to:
+        window_start = datetime.combine(day, work_start)
+        window_end = datetime.combine(day, work_end)
+        if window_end > window_start:
+            yield window_start, window_end
+        day += timedelta(days=1)
+
+def _aligned_starts(start, end, duration, step):
+    """Slot starts on step boundaries (counted from midnight) such that the slot fits in [start, end]"""
+    midnight = datetime.combine(start.date(), datetime.min.time())
+    offset = (start - midnight) % step
+    slot_start = start if not offset else start + (step - offset)
+    while slot_start + duration <= end:
+        yield slot_start
+        slot_start += step
+
+def _score_slot(slot_start, slot_end, busy_members, member_names, preference_window):
+    score = 100
+    reasons, advantages = [], []
+    if busy_members:
+        score -= 20 * len(busy_members)
+        reasons.append(f"{len(busy_members)} of {len(member_names)} members have a conflict")
+    else:
+        advantages.append('All members available')
+    if slot_start.time() < LUNCH_END and (slot_end.time() > LUNCH_START or slot_end.date() > slot_start.date()):
+        score -= 10
+        reasons.append('overlaps the typical lunch hour')
+    if preference_window:
+        if preference_window[0] <= slot_start.time() < preference_window[1]:
+            advantages.append('Matches creator preference')
+        else:
+            score -= 10
+            reasons.append("does not match the creator's preference")
+    if not reasons:
+        reasoning = 'Everyone is free and the time avoids lunch.'
+    elif busy_members:
+        reasoning = 'Fewest conflicts available: ' + ', '.join(reasons) + '.'
+    else:
+        reasoning = 'Everyone is free, but it ' + ' and '.join(reasons) + '.'
+    busy_set = set(busy_members)
+    return {
+        'date': slot_start.date().isoformat(),
+        'startTime': slot_start.strftime('%H:%M'),
+        'endTime': slot_end.strftime('%H:%M'),
+        'score': max(score, 0),
+        'reasoning': reasoning,
+        'conflicts': [f"{name} is busy" for name in busy_members],
+        'advantages': advantages,
+        'memberAvailability': {name: 'busy' if name in busy_set else 'available' for name in member_names}
+    }
+
+def find_meeting_slots(member_busy, date_from, date_to, duration_minutes, work_start, work_end,
+                       preference=None, limit=10, step_minutes=SLOT_STEP_MINUTES):
+    """
+    Deterministic meeting slot finder.
+
+    `member_busy` maps a member name to that member's busy (start, end) datetimes.
+    All members' busy time is merged with one sort-and-sweep, the free gaps inside
+    each day's working hours are cut into step-aligned candidates, and candidates
+    are scored with the rules the AI scheduler used (lunch and preference
+    penalties). At most SLOT_MAX_PER_DAY conflict-free slots are taken from one day
+    before later days are considered. If fewer than `limit` conflict-free slots
+    exist, the slots with the fewest busy members fill the remainder.
+    """
+    duration = timedelta(minutes=duration_minutes)
+    step = timedelta(minutes=step_minutes)
+    member_names = list(member_busy.keys())
+    preference_window = _preference_window(preference)
+
+    all_busy = merge_intervals(interval for intervals in member_busy.values() for interval in intervals)
+    busy_starts = [start for start, _ in all_busy]
+    busy_ends = [end for _, end in all_busy]
+
+    free_slots = set()
+    candidates = []
+    for window_start, window_end in _working_windows(date_from, date_to, work_start, work_end):
+        cursor = window_start
+        index = bisect.bisect_right(busy_ends, window_start)
+        while index < len(all_busy) and busy_starts[index] < window_end:
+            if busy_starts[index] > cursor:
+                for slot_start in _aligned_starts(cursor, busy_starts[index], duration, step):
+                    free_slots.add(slot_start)
+            cursor = max(cursor, busy_ends[index])
+            index += 1
+        if cursor < window_end:
+            for slot_start in _aligned_starts(cursor, window_end, duration, step):
+                free_slots.add(slot_start)
+
+    for slot_start in sorted(free_slots):
+        candidates.append(_score_slot(slot_start, slot_start + duration, [], member_names, preference_window))
+    candidates.sort(key=lambda s: (-s['score'], s['date'], s['startTime']))
+
+    suggestions, overflow, per_day = [], [], {}
+    for suggestion in candidates:
+        if per_day.get(suggestion['date'], 0) < SLOT_MAX_PER_DAY:
+            per_day[suggestion['date']] = per_day.get(suggestion['date'], 0) + 1
+            suggestions.append(suggestion)
+        else:
+            overflow.append(suggestion)
+        if len(suggestions) >= limit:
+            return suggestions
+    suggestions.extend(overflow[:limit - len(suggestions)])
+    if len(suggestions) >= limit:
+        return suggestions
+
+    # Last resort: every step-aligned slot that has a conflict, ranked by how many members are busy.
+    slot_starts = [
+        slot_start
+        for window_start, window_end in _working_windows(date_from, date_to, work_start, work_end)
+        for slot_start in _aligned_starts(window_start, window_end, duration, step)
+        if slot_start not in free_slots
+    ]
+    busy_by_slot = [[] for _ in slot_starts]
+    for name, intervals in member_busy.items():
+        hit = set()
+        for start, end in intervals:
+            first = bisect.bisect_right(slot_starts, start - duration)
+            last = bisect.bisect_left(slot_starts, end)
+            hit.update(range(first, last))
+        for index in hit:
+            busy_by_slot[index].append(name)
+
+    conflicted = [
+        _score_slot(slot_start, slot_start + duration, busy_by_slot[index], member_names, preference_window)
+        for index, slot_start in enumerate(slot_starts)
+    ]
+    conflicted.sort(key=lambda s: (-s['score'], s['date'], s['startTime']))
+    suggestions.extend(conflicted[:limit - len(suggestions)])
+    return suggestions
+
+def _rank_slots_with_ai(suggestions, preference):
+    """
+    Ask Gemini to reorder deterministic suggestions by how well they fit a free-text
+    preference. Returns the suggestions unchanged if the call or its output fails.
+    """
+    prompt = f"""
+        You are ranking candidate meeting times. The creator's preference is: "{preference}".
+        Candidates (index: date start-end):
+        {chr(10).join(f"{i}: {s['date']} {s['startTime']}-{s['endTime']}" for i, s in enumerate(suggestions))}
+
+        Return only a JSON array of candidate indexes, best first, e.g. [2, 0, 1].
+    """
+    try:
+        data = _call_gemini(prompt)
+        text = data['candidates'][0]['content']['parts'][0]['text']
+        order = json.loads(text[text.index('['):text.rindex(']') + 1])
+        ranked = [suggestions[i] for i in dict.fromkeys(order) if isinstance(i, int) and 0 <= i < len(suggestions)]
+        ranked.extend(s for s in suggestions if s not in ranked)
+        return ranked
+    except Exception as e:
+        print(f"AI slot ranking skipped: {str(e)}")
+        return suggestions
+
+@app.route('/api/meetings/suggest', methods=['POST'])
+def suggest_meeting_times():
+    """
+    Suggest conflict-free meeting times for a set of members.
+    Body: {"emails": [...], "userIds": [...], "from", "to", "duration" (minutes),
+    "teamId" or "workingHourStart"/"workingHourEnd", "timePreference", "limit", "rankWithAI"}.
+    """
+    data = request.get_json() or {}
+    emails = [email.strip() for email in data.get('emails', []) if email and email.strip()]
+    user_ids = [user_id for user_id in data.get('userIds', []) if user_id not in (None, '')]
+    team_id = data.get('teamId')
+    preference = data.get('timePreference') or ''
+
+    if not emails and not user_ids:
+        return jsonify({'success': False, 'message': 'At least one email or user ID is required'}), 400
+    if len(emails) + len(user_ids) > FREEBUSY_MAX_USERS:
+        return jsonify({'success': False, 'message': f'At most {FREEBUSY_MAX_USERS} users can be scheduled at once'}), 400
+
+    try:
+        date_from, date_to = _parse_date_range(data.get('from'), data.get('to'))
+        duration = int(data.get('duration', 60))
+        limit = min(int(data.get('limit', 10)), SLOT_MAX_SUGGESTIONS)
+        if duration < 1 or limit < 1:
+            raise ValueError('Duration and limit must be positive')
+    except (ValueError, TypeError) as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+
+        work_start = parse_time_from_hhmm(data.get('workingHourStart'))
+        work_end = parse_time_from_hhmm(data.get('workingHourEnd'))
+        if team_id and (work_start is None or work_end is None):
+            cur.execute("SELECT TeamStartWorkingHour, TeamEndWorkingHour FROM Team WHERE TeamId = %s", (team_id,))
+            team_row = cur.fetchone()
+            if not team_row:
+                return jsonify({'success': False, 'message': 'Team not found'}), 404
+            work_start = work_start or team_row[0]
+            work_end = work_end or team_row[1]
+        work_start = work_start or parse_time_from_hhmm('09:00')
+        work_end = work_end or parse_time_from_hhmm('17:00')
+
+        users, unknown_emails, unknown_ids = _resolve_users(cur, emails, user_ids)
+        schedule_items = _load_schedule_items(cur, users.keys(), date_from, date_to)
+
+        usernames = [username for username, _ in users.values()]
+        member_busy = {}
+        for user_id, (username, useremail) in users.items():
+            name = username if usernames.count(username) == 1 else f"{username} ({useremail})"
+            member_busy[name] = merge_intervals((item['start'], item['end']) for item in schedule_items[user_id])
+
+        suggestions = find_meeting_slots(member_busy, date_from, date_to, duration, work_start, work_end, preference, limit)
+        if data.get('rankWithAI') and preference.strip() and 'user_id' in session and len(suggestions) > 1:
+            suggestions = _rank_slots_with_ai(suggestions, preference)
+
+        return jsonify({
+            'success': True,
+            'suggestions': suggestions,
+            'unknownEmails': unknown_emails,
+            'unknownUserIds': unknown_ids
+        }), 200
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to suggest meeting times', 'error': str(e)}), 500
+
+    finally:
+        if conn: conn.close()
+
+@app.route('/api/health/db', methods=['GET'])
+def db_pool_health():
+    """Report connection pool statistics for this worker"""
+    return jsonify({'success': True, 'pid': os.getpid(), 'pool': get_db_pool().stats()}), 200
+
+@app.route('/api/health/jobs', methods=['GET'])
+def job_queue_health():
+    """Report unfinished and dead jobs per queue"""
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT Queue, Status, count(*), EXTRACT(EPOCH FROM now() - min(RunAt))
+            FROM Jobs
+            WHERE Status IN ('queued', 'running', 'dead')
+            GROUP BY Queue, Status
+            """
+        )
+        queues = {queue: {'queued': 0, 'running': 0, 'dead': 0, 'oldestQueuedSeconds': None} for queue in JOB_QUEUES}
+        for queue, status, count, oldest in cur.fetchall():
+            stats = queues.setdefault(queue, {'queued': 0, 'running': 0, 'dead': 0, 'oldestQueuedSeconds': None})
+            stats[status] = count
+            if status == 'queued':
+                stats['oldestQueuedSeconds'] = max(0.0, round(float(oldest), 3))
+        return jsonify({'success': True, 'queues': queues}), 200
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to fetch job queue status', 'error': str(e)}), 500
+
+    finally:
+        if conn:
+            conn.close()
+
+@app.route('/api/health/cache', methods=['GET'])
+def cache_health():
+    """Report in-process cache statistics for this worker"""
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'userIds': user_id_cache.stats(),
+        'ai': ai_response_cache.stats(),
+        'gemini': get_gemini_client().stats(),
+        'passwordHashing': get_password_hasher().stats(),
+        'streams': stream_limiter.stats()
+    }), 200
+
+GEMINI_MODEL = "gemini-1.5-flash"
+GEMINI_GENERATION_CONFIG = {
+    "temperature": 0.1,
+    "maxOutputTokens": 1000
+}
+
+AI_CACHE_MAX_BYTES = int(os.getenv("AI_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+AI_CACHE_TTL = float(os.getenv("AI_CACHE_TTL", "86400"))
+AI_CACHE_DIR = os.getenv("AI_CACHE_DIR")
+AI_CACHE_DISK_MAX_BYTES = int(os.getenv("AI_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+AI_CACHE_DISK_PRUNE_EVERY = 100
+
+class AIResponseCache:
+    """
+    LRU of Gemini responses keyed by a hash of the normalized prompt, model and
+    generation config, bounded by total bytes and expiring after `ttl` seconds.
+
+    With a `directory`, entries are also written there as one JSON file per key so
+    they survive worker restarts and are shared by the workers on one machine; the
+    directory is pruned to `disk_max_bytes`, oldest first. Hits record the latency
+    the original call took, reported as `savedSeconds`.
+    """
+    def __init__(self, max_bytes, ttl, directory=None, disk_max_bytes=0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(prompt, model, config):
+        normalized = ' '.join(prompt.split())
+        material = json.dumps({'model': model, 'config': config, 'prompt': normalized}, sort_keys=True)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                self._evict(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += entry[2]
+                return json.loads(entry[1])
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self.saved_seconds += entry[2]
+            self._store(key, entry)
+        return json.loads(entry[1])
+
+    def put(self, key, response, latency):
+        entry = (time.time() + self.ttl, json.dumps(response), latency)
+        with self._lock:
+            self._store(key, entry)
+            self._puts += 1
+            prune = self._puts % AI_CACHE_DISK_PRUNE_EVERY == 0
+        self._write_disk(key, entry)
+        if prune:
+            self._prune_disk()
+
+    def _store(self, key, entry):
+        if len(entry[1]) > self.max_bytes // 8:
+            return
+        self._evict(key)
+        self._entries[key] = entry
+        self._bytes += len(entry[1])
+        while self._bytes > self.max_bytes:
+            _, (_, body, _) = self._entries.popitem(last=False)
+            self._bytes -= len(body)
+
+    def _evict(self, key):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous[1])
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read_disk(self, key, now):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored.get('expiresAt', 0) <= now:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            return None
+        return stored['expiresAt'], json.dumps(stored['response']), stored.get('latency', 0.0)
+
+    def _write_disk(self, key, entry):
+        if not self.directory:
+            return
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'expiresAt': entry[0], 'latency': entry[2], 'response': json.loads(entry[1])}))
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"AI cache write failed: {e}")
+
+    def _prune_disk(self):
+        """Drops expired files, then the least recently written ones until the directory fits"""
+        if not self.directory:
+            return
+        now = time.time()
+        files = []
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in sorted(files):
+            if total <= self.disk_max_bytes and mtime + self.ttl > now:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'maxBytes': self.max_bytes,
+                'ttl': self.ttl,
+                'disk': bool(self.directory),
+                'hits': self.hits,
+                'diskHits': self.disk_hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else None,
+                'savedSeconds': round(self.saved_seconds, 3)
+            }
+
+ai_response_cache = AIResponseCache(AI_CACHE_MAX_BYTES, AI_CACHE_TTL, AI_CACHE_DIR, AI_CACHE_DISK_MAX_BYTES)
+
+GEMINI_API_URL = os.getenv("GEMINI_API_URL", "https://generativelanguage.googleapis.com/v1beta").rstrip('/')
+GEMINI_CONNECT_TIMEOUT = float(os.getenv("GEMINI_CONNECT_TIMEOUT", "5"))
+GEMINI_READ_TIMEOUT = float(os.getenv("GEMINI_READ_TIMEOUT", "60"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+GEMINI_BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", "0.5"))
+GEMINI_BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX", "8"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+GEMINI_QUEUE_TIMEOUT = float(os.getenv("GEMINI_QUEUE_TIMEOUT", "30"))
+GEMINI_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class AIServiceBusy(Exception):
+    """Raised when no Gemini call slot frees up within GEMINI_QUEUE_TIMEOUT"""
+
+class GeminiClient:
+    """
+    Per-process keep-alive session for the Gemini API.
+
+    At most `max_concurrency` calls are in flight per worker; callers queue for a
+    slot in arrival order for up to `queue_timeout`. Connection errors, timeouts and 429/5xx responses
+    are retried up to `max_retries` times with full-jitter exponential backoff,
+    honouring a numeric Retry-After.
+    """
+    def __init__(self, base_url, max_concurrency, queue_timeout):
+        self.base_url = base_url
+        self.queue_timeout = queue_timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(max_concurrency, 1))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.max_concurrency = max(max_concurrency, 1)
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._queue = deque()
+        self.in_flight = 0
+        self.retries = 0
+
+    @contextmanager
+    def slot(self):
+        ticket = object()
+        with self._lock:
+            self._queue.append(ticket)
+            acquired = self._slot_freed.wait_for(
+                lambda: self._queue[0] is ticket and self.in_flight < self.max_concurrency,
+                timeout=self.queue_timeout
+            )
+            self._queue.remove(ticket)
+            if acquired:
+                self.in_flight += 1
+            # Whoever is now at the head of the queue may be able to go.
+            self._slot_freed.notify_all()
+        if not acquired:
+            raise AIServiceBusy('AI service is busy, try again shortly')
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self._slot_freed.notify_all()
+
+    def post(self, path, payload, stream=False):
+        """POSTs to `path` under the base URL, retrying transient failures. The caller must hold a slot."""
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise RuntimeError('Server API key not configured')
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                response = self.session.post(
+                    f"{self.base_url}/{path}",
+                    json=payload,
+                    headers={"Content-Type": "application/json", "x-goog-api-key": api_key},
+                    timeout=(GEMINI_CONNECT_TIMEOUT, GEMINI_READ_TIMEOUT),
+                    stream=stream
+                )
+                if response.status_code not in GEMINI_RETRY_STATUSES or attempt >= GEMINI_MAX_RETRIES:
+                    response.raise_for_status()
+                    return response
+                retry_after = response.headers.get('Retry-After')
+                response.close()
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= GEMINI_MAX_RETRIES:
+                    raise
+            delay = random.uniform(0, min(GEMINI_BACKOFF_MAX, GEMINI_BACKOFF_BASE * 2 ** attempt))
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, min(float(retry_after), GEMINI_BACKOFF_MAX))
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+            time.sleep(delay)
+
+    def stats(self):
+        with self._lock:
+            return {'inFlight': self.in_flight, 'waiting': len(self._queue), 'retries': self.retries}
+
+_gemini_client = None
+_gemini_client_pid = None
+
+def get_gemini_client():
+    global _gemini_client, _gemini_client_pid
+    if _gemini_client is None or _gemini_client_pid != os.getpid():
+        with _db_pool_lock:
+            if _gemini_client is None or _gemini_client_pid != os.getpid():
+                _gemini_client = GeminiClient(GEMINI_API_URL, GEMINI_MAX_CONCURRENCY, GEMINI_QUEUE_TIMEOUT)
+                _gemini_client_pid = os.getpid()
+    return _gemini_client
+
+def _call_gemini(prompt, use_cache=True):
+    """
+    Send a single-turn prompt to Gemini and return its parsed JSON response. Raises on failure.
+    Responses are served from and stored in ai_response_cache unless `use_cache` is False.
+    """
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise RuntimeError('Server API key not configured')
+
+    cache_key = AIResponseCache.key(prompt, GEMINI_MODEL, GEMINI_GENERATION_CONFIG)
+    if use_cache:
+        cached = ai_response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    payload = {
+        "contents": [{
+            "parts": [{"text": prompt}]
+        }],
+        "generationConfig": GEMINI_GENERATION_CONFIG
+    }
+
+    client = get_gemini_client()
+    with client.slot():
+        started = time.monotonic()
+        data = client.post(f"models/{GEMINI_MODEL}:generateContent", payload).json()
+    # Blocked or empty completions are not worth replaying.
+    if data.get('candidates'):
+        ai_response_cache.put(cache_key, data, time.monotonic() - started)
+    return data
+
+def _gemini_stream(prompt, use_cache=True):
+    """
+    Generator behind POST /api/ai/generate with "stream": true.
+
+    Proxies streamGenerateContent as Server-Sent Events: a `chunk` event with the
+    text of each upstream piece as it arrives, then `done` (or `error`). A cached
+    completion is replayed as a single chunk. When the client goes away the WSGI
+    server closes this generator on the next write, which closes the upstream
+    connection, so Gemini stops generating and the call slot is freed. Completed
+    streams are stored in ai_response_cache in the generateContent response shape.
+    """
+    cache_key = AIResponseCache.key(prompt, GEMINI_MODEL, GEMINI_GENERATION_CONFIG)
+    if use_cache:
+        cached = ai_response_cache.get(cache_key)
+        if cached is not None:
+            candidate = cached['candidates'][0]
+            yield _sse_event('chunk', {'text': ''.join(part.get('text', '') for part in candidate['content']['parts'])})
+            yield _sse_event('done', {'finishReason': candidate.get('finishReason'), 'cached': True})
+            return
+
+    payload = {
+        "contents": [{
+            "parts": [{"text": prompt}]
+        }],
+        "generationConfig": GEMINI_GENERATION_CONFIG
+    }
+
+    client = get_gemini_client()
+    upstream = None
+    try:
+        with client.slot():
+            started = time.monotonic()
+            upstream = client.post(f"models/{GEMINI_MODEL}:streamGenerateContent?alt=sse", payload, stream=True)
+            texts = []
+            finish_reason = None
+            for line in upstream.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                piece = json.loads(line[5:])
+                candidate = (piece.get('candidates') or [{}])[0]
+                text = ''.join(part.get('text', '') for part in candidate.get('content', {}).get('parts', []))
+                finish_reason = candidate.get('finishReason') or finish_reason
+                if text:
+                    texts.append(text)
+                    yield _sse_event('chunk', {'text': text})
+            if texts:
+                ai_response_cache.put(cache_key, {'candidates': [{
+                    'content': {'parts': [{'text': ''.join(texts)}], 'role': 'model'},
+                    'finishReason': finish_reason
+                }]}, time.monotonic() - started)
+        yield _sse_event('done', {'finishReason': finish_reason, 'cached': False})
+    except AIServiceBusy as e:
+        yield _sse_event('error', {'message': str(e)})
+    except Exception as e:
+        print(f"Gemini API Error: {str(e)}")
+        yield _sse_event('error', {'message': 'Failed to communicate with AI service'})
+    finally:
+        if upstream is not None:
+            upstream.close()
+
+@app.route('/api/ai/generate', methods=['POST'])
+def generate_ai_content():
+    # Check if user is logged in
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+
+    data = request.get_json()
+    prompt = data.get('prompt')
+    
+    if not prompt:
+        return jsonify({'success': False, 'message': 'Prompt is required'}), 400
+
+    if not os.getenv("GEMINI_API_KEY"):
+        return jsonify({'success': False, 'message': 'Server API key not configured'}), 500
+
+    # Without a worker an async request is answered synchronously below.
+    if data.get('async') and JOB_WORKER_ENABLED:
+        conn = None
+        try:
+            conn = get_db_connection()
+            cur = conn.cursor()
+            job_id = enqueue_job(cur, 'ai_generate', {
+                'userId': session['user_id'],
+                'prompt': prompt,
+                'cache': data.get('cache', True) is not False
+            })
+            conn.commit()
+            return jsonify({'success': True, 'message': 'AI request queued', 'jobId': job_id}), 202
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            print(f"Error: {str(e)}")
+            return jsonify({'success': False, 'message': 'Failed to queue AI request', 'error': str(e)}), 500
+        finally:
+            if conn:
+                conn.close()
+
+    if data.get('stream'):
+        if not stream_limiter.acquire():
+            return _streams_busy()
+        return stream_limiter.response(_gemini_stream(prompt, use_cache=data.get('cache', True) is not False),
+                                       'text/event-stream')
+
+    try:
+        return jsonify(_call_gemini(prompt, use_cache=data.get('cache', True) is not False)), 200
+    except AIServiceBusy as e:
+        return jsonify({'success': False, 'message': str(e)}), 503
+    except Exception as e:
+        print(f"Gemini API Error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to communicate with AI service'}), 500
+
+@job_handler('ai_generate', queue='ai')
+def _ai_generate_job(cur, payload):
+    """Runs a queued /api/ai/generate request; the Gemini response becomes the job result"""
+    return _call_gemini(payload['prompt'], use_cache=payload.get('cache', True))
+
+def _job_to_dict(row):
+    return {
+        'jobid': row[0],
+        'kind': row[1],
+        'status': row[2],
+        'attempts': row[3],
+        'result': row[4],
+        'lasterror': row[5],
+        'createdat': row[6].isoformat() if row[6] else None,
+        'finishedat': row[7].isoformat() if row[7] else None
+    }
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status and result of a job the current user queued"""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+
+    conn = None
+    try:
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT JobId, Kind, Status, Attempts, Result, LastError, CreatedAt, FinishedAt
+            FROM Jobs
+            WHERE JobId = %s AND Payload->>'userId' = %s
+            """,
+            (job_id, str(session['user_id']))
+        )
+        row = cur.fetchone()
+        if not row:
+            return jsonify({'success': False, 'message': 'Job not found'}), 404
+        return jsonify({'success': True, 'job': _job_to_dict(row)}), 200
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return jsonify({'success': False, 'message': 'Failed to fetch job', 'error': str(e)}), 500
+
+    finally:
+        if conn:
+            conn.close()
+
+EMAIL_EVENTS_MAX_EMAILS = 100
+EMAIL_EVENTS_MAX_BODY_CHARS = 20000
+EMAIL_EVENTS_WORKERS = int(os.getenv("EMAIL_EVENTS_WORKERS", str(GEMINI_MAX_CONCURRENCY)))
+EMAIL_EVENT_CATEGORIES = {'work', 'personal', 'meeting', 'appointment'}
+EMAIL_EVENT_URGENCIES = {'low', 'medium', 'high', 'urgent'}
+EMAIL_EVENT_TIME = re.compile(r'^([01]?[0-9]|2[0-3]):[0-5][0-9]$')
+HTML_TAG = re.compile(r'<(script|style)\b.*?</\1\s*>|<[^>]+>', re.IGNORECASE | re.DOTALL)
+
+EMAIL_EVENTS_PROMPT = """
+        Analyze the following email content and extract any meeting, appointment, or event information.
+        
+        IMPORTANT: Only extract events if there is CLEAR, SPECIFIC event information with dates and times.
+        Do NOT create events for general mentions or vague references.
+        
+        Return a JSON response with the following structure:
+        {{
+          "hasEvent": boolean,
+          "events": [
+            {{
+              "title": "string",
+              "description": "string", 
+              "date": "YYYY-MM-DD",
+              "startTime": "HH:MM" (24-hour format),
+              "endTime": "HH:MM" (24-hour format),
+              "category": "work|personal|meeting|appointment",
+              "urgency": "low|medium|high|urgent"
+            }}
+          ]
+        }}
+
+        Rules:
+        1. Only extract events with specific dates and times
+        2. If no clear event information exists, return hasEvent: false with empty events array
+        3. Do not create events for general discussions about scheduling
+        4. Dates must be specific (not "next week" or "soon")
+        5. Times must be specific (not "morning" or "afternoon")
+
+        Email content:
+        {content}
+"""
+
+def _email_text(body):
+    """Plain text of an email body: markup and scripts stripped, entities decoded, whitespace collapsed"""
+    text = html.unescape(HTML_TAG.sub(' ', body or ''))
+    return ' '.join(text.split())[:EMAIL_EVENTS_MAX_BODY_CHARS]
+
+def _valid_email_event(event):
+    """Normalizes one extracted event, or returns None if it does not match the event schema"""
+    if not isinstance(event, dict) or not isinstance(event.get('title'), str) or not event['title'].strip():
+        return None
+    try:
+        datetime.strptime(str(event.get('date')), '%Y-%m-%d')
+    except ValueError:
+        return None
+    start_time, end_time = str(event.get('startTime')), str(event.get('endTime'))
+    if not EMAIL_EVENT_TIME.match(start_time) or not EMAIL_EVENT_TIME.match(end_time):
+        return None
+    category = str(event.get('category') or '').lower()
+    urgency = str(event.get('urgency') or '').lower()
+    return {
+        'title': event['title'].strip(),
+        'description': event.get('description') if isinstance(event.get('description'), str) else '',
+        'date': event['date'],
+        'startTime': format_time_to_hhmm(start_time),
+        'endTime': format_time_to_hhmm(end_time),
+        'category': category if category in EMAIL_EVENT_CATEGORIES else 'work',
+        'urgency': urgency if urgency in EMAIL_EVENT_URGENCIES else 'medium'
+    }
+
+def _extract_email_events(email):
+    """Runs the extraction prompt for one email and returns its validated events"""
+    content = f"Subject: {email.get('subject') or ''}\n\nFrom: {email.get('from') or ''}\n\nContent:\n{_email_text(email.get('body'))}"
+    data = _call_gemini(EMAIL_EVENTS_PROMPT.format(content=content))
+    text = data['candidates'][0]['content']['parts'][0]['text']
+    match = re.search(r'\{[\s\S]*\}', text)
+    if not match:
+        return []
+    try:
+        parsed = json.loads(match.group(0))
+    except ValueError:
+        return []
+    if not isinstance(parsed, dict) or parsed.get('hasEvent') is not True or not isinstance(parsed.get('events'), list):
+        return []
+    return [event for event in map(_valid_email_event, parsed['events']) if event is not None]
+
+def _email_events_stream(emails):
+    """
+    Generator behind POST /api/ai/extract-events: one NDJSON line per email in
+    completion order, then a summary line. Closing the response cancels the
+    emails that have not started yet.
+    """
+    executor = ThreadPoolExecutor(max_workers=min(EMAIL_EVENTS_WORKERS, len(emails)),
+                                  thread_name_prefix='email-events')
+    found = failed = 0
+    try:
+        futures = {executor.submit(_extract_email_events, email): index for index, email in enumerate(emails)}
+        for future in as_completed(futures):
+            index = futures[future]
+            result = {'index': index, 'id': emails[index].get('id')}
+            try:
+                result['events'] = future.result()
+                result['hasEvent'] = bool(result['events'])
+                found += result['hasEvent']
+            except Exception as e:
+                failed += 1
+                result.update(hasEvent=False, events=[], error=str(e) if isinstance(e, AIServiceBusy) else 'AI request failed')
+                print(f"Email event extraction failed: {str(e)}")
+            yield json.dumps(result) + '\n'
+        yield json.dumps({'done': True, 'processed': len(emails), 'withEvents': found, 'failed': failed}) + '\n'
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+@app.route('/api/ai/extract-events', methods=['POST'])
+def extract_email_events():
+    """
+    Extract calendar events from a batch of emails.
+    Body: {"emails": [{"id", "subject", "from", "body"}, ...]}. Streams NDJSON results as each email finishes.
+    """
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+
+    data = request.get_json() or {}
+    emails = [email for email in data.get('emails', []) if isinstance(email, dict)]
+
+    if not emails:
+        return jsonify({'success': False, 'message': 'At least one email is required'}), 400
+    if len(emails) > EMAIL_EVENTS_MAX_EMAILS:
+        return jsonify({'success': False, 'message': f'At most {EMAIL_EVENTS_MAX_EMAILS} emails can be analyzed at once'}), 400
+
+    if not os.getenv("GEMINI_API_KEY"):
+        return jsonify({'success': False, 'message': 'Server API key not configured'}), 500
+
+    return Response(_email_events_stream(emails), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'db', 'migrations')
+MIGRATION_FILE = re.compile(r'^(\d{4})_[A-Za-z0-9_]+\.sql$')
+MIGRATION_LOCK_ID = 0x706c616e  # pg_advisory_lock key shared by every runner
+
+def _migration_files(directory=MIGRATIONS_DIR):
+    """(version, name, path, sha256) of every migration file, in version order"""
+    files = []
+    for name in sorted(os.listdir(directory)):
+        match = MIGRATION_FILE.match(name)
+        if not match:
+            continue
+        path = os.path.join(directory, name)
+        with open(path, 'rb') as f:
+            checksum = hashlib.sha256(f.read()).hexdigest()
+        files.append((match.group(1), name, path, checksum))
+    return files
+
+def run_migrations(dsn, status_only=False, directory=MIGRATIONS_DIR):
+    """
+    Apply the pending files in db/migrations in version order and record them in SchemaMigrations.
+
+    Files manage their own transactions (BEGIN ... COMMIT, or a single implicit one) and
+    must be safe to re-run: databases that predate the runner re-apply everything once,
+    and a crash between a file's COMMIT and its bookkeeping row re-runs that file.
+    Concurrent runners serialize on an advisory lock. Files that changed after being
+    applied are reported, not re-run. Returns the names applied (or pending, with status_only).
+    """
+    conn = psycopg2.connect(dsn)
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS SchemaMigrations (
+                Version TEXT PRIMARY KEY,
+                Name TEXT NOT NULL,
+                Checksum TEXT NOT NULL,
+                AppliedAt TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+            """
+        )
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        try:
+            cur.execute("SELECT Version, Checksum FROM SchemaMigrations")
+            applied = dict(cur.fetchall())
+            done = []
+            for version, name, path, checksum in _migration_files(directory):
+                if version in applied:
+                    if applied[version] != checksum:
+                        print(f"warning: {name} changed after it was applied")
+                    continue
+                if status_only:
+                    print(f"pending  {name}")
+                    done.append(name)
+                    continue
+                print(f"applying {name}")
+                started = time.monotonic()
+                with open(path, encoding='utf-8') as f:
+                    cur.execute(f.read())
+                cur.execute(
+                    "INSERT INTO SchemaMigrations (Version, Name, Checksum) VALUES (%s, %s, %s)",
+                    (version, name, checksum)
+                )
+                print(f"applied  {name} in {time.monotonic() - started:.2f}s")
+                done.append(name)
+            if not done:
+                print("database is up to date")
+            return done
+        finally:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+    finally:
+        conn.close()
+
+WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "5"))
+
+class JobWorker:
+    """
+    Runs queued jobs with JOB_QUEUES[queue] threads per queue, plus one maintenance thread
+    that purges deleted accounts and drops old succeeded jobs.
+
+    Idle threads are woken by LISTEN on planit_jobs (see db/migrations/0012_jobs.sql) and
+    otherwise poll every JOB_POLL_INTERVAL seconds. A claimed job is leased for JOB_LEASE
+    seconds; the handler's writes and the job's completion commit in one transaction, and
+    a failure puts the job back with exponential backoff until it runs out of attempts.
+    """
+    def __init__(self, dsn, queues=None):
+        self.dsn = dsn
+        self.queues = dict(JOB_QUEUES if queues is None else queues)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wakeups = {queue: threading.Event() for queue in self.queues}
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        targets = [('jobs-listener', self._listen, ()), ('jobs-maintenance', self._maintain, ())]
+        for queue, concurrency in self.queues.items():
+            targets += [(f'jobs-{queue}-{i}', self._work, (queue,)) for i in range(concurrency)]
+        for name, target, args in targets:
+            thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Lets running jobs finish and stops claiming new ones"""
+        self._stop.set()
+        for wakeup in self._wakeups.values():
+            wakeup.set()
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def claim(self, conn, queue):
+        """
+        Leases the next due job of `queue`, or one whose lease expired, unless the queue
+        already has its limit of running jobs. Returns (job id, kind, payload, attempts,
+        max attempts) or None.
+        """
+        cur = conn.cursor()
+        # Serializes claims per queue so the running-job count cannot be raced past the limit.
+        cur.execute("SELECT pg_advisory_xact_lock(%s, hashtext(%s))", (JOB_LOCK_ID, queue))
+        cur.execute(
+            """
+            UPDATE Jobs
+            SET Status = 'running', Attempts = Attempts + 1, LockedBy = %(worker)s,
+                LockedUntil = now() + make_interval(secs => %(lease)s), UpdatedAt = now()
+            WHERE JobId = (
+                SELECT JobId FROM Jobs
+                WHERE Queue = %(queue)s AND RunAt <= now()
+                  AND (Status = 'queued' OR (Status = 'running' AND LockedUntil < now()))
+                ORDER BY RunAt, JobId
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            AND (
+                SELECT count(*) FROM Jobs
+                WHERE Queue = %(queue)s AND Status = 'running' AND LockedUntil >= now()
+            ) < %(limit)s
+            RETURNING JobId, Kind, Payload, Attempts, MaxAttempts
+            """,
+            {'worker': self.worker_id, 'lease': JOB_LEASE, 'queue': queue, 'limit': self.queues[queue]}
+        )
+        job = cur.fetchone()
+        conn.commit()
+        return job
+
+    def run(self, conn, job):
+        job_id, kind, payload, attempts, max_attempts = job
+        cur = conn.cursor()
+        try:
+            if attempts > max_attempts:
+                raise RuntimeError('Lease expired on the last attempt')
+            if kind not in JOB_HANDLERS:
+                raise RuntimeError(f'No handler for job kind {kind!r}')
+            result = JOB_HANDLERS[kind][1](cur, payload)
+            cur.execute(
+                """
+                UPDATE Jobs
+                SET Status = 'succeeded', Result = %s, LastError = NULL, LockedBy = NULL,
+                    LockedUntil = NULL, UpdatedAt = now(), FinishedAt = now()
+                WHERE JobId = %s AND LockedBy = %s
+                """,
+                (None if result is None else json.dumps(result), job_id, self.worker_id)
+            )
+            if cur.rowcount == 0:
+                # The lease ran out and another worker owns the job now.
+                conn.rollback()
+                print(f"Job {job_id} ({kind}) lost its lease")
+                return
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            dead = attempts >= max_attempts
+            delay = min(JOB_BACKOFF_MAX, JOB_BACKOFF_BASE * 2 ** (attempts - 1)) * random.uniform(0.5, 1)
+            print(f"Job {job_id} ({kind}) failed on attempt {attempts}/{max_attempts}: {str(e)}")
+            cur.execute(
+                """
+                UPDATE Jobs
+                SET Status = %s, RunAt = now() + make_interval(secs => %s), LastError = %s,
+                    LockedBy = NULL, LockedUntil = NULL, UpdatedAt = now(),
+                    FinishedAt = CASE WHEN %s THEN now() END
+                WHERE JobId = %s AND LockedBy = %s
+                """,
+                ('dead' if dead else 'queued', delay, str(e), dead, job_id, self.worker_id)
+            )
+            conn.commit()
+
+    def _work(self, queue):
+        wakeup = self._wakeups[queue]
+        while not self._stop.is_set():
+            try:
+                with db_connection() as conn:
+                    job = self.claim(conn, queue)
+                    if job is not None:
+                        self.run(conn, job)
+                        continue
+            except Exception as e:
+                print(f"Job worker error on {queue}: {str(e)}")
+            wakeup.wait(JOB_POLL_INTERVAL)
+            wakeup.clear()
+
+    def _listen(self):
+        backoff = 1
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cur = conn.cursor()
+                cur.execute(f"LISTEN {JOB_CHANNEL}")
+                backoff = 1
+                # Jobs queued while we were disconnected.
+                for wakeup in self._wakeups.values():
+                    wakeup.set()
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], JOB_POLL_INTERVAL) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        wakeup = self._wakeups.get(conn.notifies.pop(0).payload)
+                        if wakeup is not None:
+                            wakeup.set()
+            except Exception as e:
+                print(f"Job listener error: {e}")
+            finally:
+                if conn:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def _maintain(self):
+        while not self._stop.is_set():
+            try:
+                with db_connection() as conn:
+                    while not self._stop.is_set() and purge_next_account(conn):
+                        pass
+                    cur = conn.cursor()
+                    cur.execute(
+                        "DELETE FROM Jobs WHERE Status = 'succeeded' AND FinishedAt < now() - make_interval(secs => %s)",
+                        (JOB_RETENTION,)
+                    )
+                    conn.commit()
+            except Exception as e:
+                print(f"Worker error: {str(e)}")
+            self._stop.wait(WORKER_POLL_INTERVAL)
+
+def run_worker():
+    """Entry point of `python api/index.py worker`; SIGTERM or Ctrl-C stops it after the running jobs finish"""
+    worker = JobWorker(os.getenv("DATABASE_URL"))
+    signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+    worker.start()
+    print(f"Worker {worker.worker_id} started: " + ", ".join(f"{queue} x{n}" for queue, n in worker.queues.items()))
+    try:
+        worker.join()
+    except KeyboardInterrupt:
+        worker.stop()
+        worker.join()
+
+if __name__ == '__main__':
+    if sys.argv[1:2] in (['migrate'], ['worker']) and not os.getenv("DATABASE_URL"):
+        sys.exit("DATABASE_URL is not set")
+    if sys.argv[1:2] == ['migrate']:
+        run_migrations(os.getenv("DATABASE_URL"), status_only='--status' in sys.argv[2:])
+    elif sys.argv[1:2] == ['worker']:
+        run_worker()
+    else:
+        app.run(debug=False)
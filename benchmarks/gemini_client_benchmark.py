@@ -0,0 +1,94 @@
+"""
+Benchmark for the pooled Gemini client (GeminiClient in api/index.py).
+
+Starts a local stub of the generateContent endpoint that answers after a fixed
+latency and fails a share of requests with 503, points GEMINI_API_URL at it and
+fires concurrent uncached _call_gemini calls. Reports throughput, p50/p99
+latency, retries and how many calls still failed after retrying.
+
+    python benchmarks/gemini_client_benchmark.py
+"""
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ.setdefault("GEMINI_BACKOFF_BASE", "0.05")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
+
+import index  # noqa: E402
+
+STUB_LATENCY = 0.05
+STUB_FAILURE_RATE = 0.1
+CALLS = 400
+CLIENT_THREADS = 32
+
+RESPONSE = json.dumps({'candidates': [{'content': {'parts': [{'text': '[]'}]}}]}).encode('utf-8')
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    connections = set()
+    lock = threading.Lock()
+
+    def do_POST(self):
+        with StubHandler.lock:
+            StubHandler.connections.add(self.client_address)
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(STUB_LATENCY)
+        if random.random() < STUB_FAILURE_RATE:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+def timed_call(i):
+    started = time.perf_counter()
+    try:
+        index._call_gemini(f"benchmark prompt {i}", use_cache=False)
+        ok = True
+    except Exception:
+        ok = False
+    return ok, (time.perf_counter() - started) * 1000
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = index.GeminiClient(f"http://127.0.0.1:{server.server_port}", index.GEMINI_MAX_CONCURRENCY,
+                                index.GEMINI_QUEUE_TIMEOUT)
+    index._gemini_client, index._gemini_client_pid = client, os.getpid()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(CLIENT_THREADS) as pool:
+        results = list(pool.map(timed_call, range(CALLS)))
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    latencies = sorted(ms for _, ms in results)
+    print(f"calls={CALLS} concurrency cap={index.GEMINI_MAX_CONCURRENCY} stub latency={STUB_LATENCY * 1000:.0f}ms "
+          f"failure rate={STUB_FAILURE_RATE:.0%}")
+    print(f"throughput={CALLS / elapsed:.1f}/s p50={statistics.median(latencies):.1f}ms "
+          f"p99={latencies[int(len(latencies) * 0.99) - 1]:.1f}ms")
+    print(f"retries={client.stats()['retries']} failed={sum(1 for ok, _ in results if not ok)} "
+          f"upstream connections={len(StubHandler.connections)}")
+
+
+if __name__ == '__main__':
+    main()
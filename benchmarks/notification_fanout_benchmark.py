@@ -0,0 +1,169 @@
+"""
+Benchmark for the notification fan-out in DELETE /api/meetings/<id> and
+DELETE /api/teams/<id>.
+
+Seeds a team of 10 to 500 members with one meeting everyone is invited to and
+deletes the meeting and then the team through the Flask test client. The
+requests only queue a notify_users job, so after each one the benchmark runs
+the queued notifications jobs inline, the way `python api/index.py worker`
+does, and checks that every member was notified. It reports the SQL
+statements and latency of each request and of its fan-out job separately.
+Both should stay flat as the team grows.
+
+Needs a scratch database with the PlanIt schema (it creates and removes its
+own users, never point it at production):
+
+    DATABASE_URL=postgresql://localhost/planit_bench python benchmarks/notification_fanout_benchmark.py
+"""
+import os
+import sys
+import time
+import uuid
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.extras import execute_values
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
+
+import index  # noqa: E402
+
+TEAM_SIZES = [10, 50, 100, 250, 500]
+
+
+class CountingCursor(psycopg2.extensions.cursor):
+    statements = 0
+
+    def execute(self, query, vars=None):
+        CountingCursor.statements += 1
+        return super().execute(query, vars)
+
+
+def counting_connection(get_connection):
+    def wrapper():
+        conn = get_connection()
+        conn._raw.cursor_factory = CountingCursor
+        return conn
+    return wrapper
+
+
+def seed_team(conn, size):
+    """Creates `size` users, a team they all belong to and a meeting they are all invited to."""
+    tag = uuid.uuid4().hex[:8]
+    cur = conn.cursor()
+    user_ids = [row[0] for row in execute_values(
+        cur,
+        "INSERT INTO Users (UserName, UserEmail) VALUES %s RETURNING UserId",
+        [(f"bench-{tag}-{i}", f"bench-{tag}-{i}@example.invalid") for i in range(size)],
+        page_size=size,
+        fetch=True
+    )]
+    cur.execute(
+        "INSERT INTO Team (TeamName, CreatedByUserId) VALUES (%s, %s) RETURNING TeamId",
+        (f"bench-{tag}", user_ids[0])
+    )
+    team_id = cur.fetchone()[0]
+    execute_values(cur, "INSERT INTO TeamMembers (TeamId, UserId) VALUES %s",
+                   [(team_id, user_id) for user_id in user_ids], page_size=size)
+    cur.execute(
+        """
+        INSERT INTO TeamMeeting (MeetingTitle, MeetingDate, TeamId, InvitationType)
+        VALUES ('Bench meeting', CURRENT_DATE, %s, 'mandatory')
+        RETURNING TeamMeetingId
+        """,
+        (team_id,)
+    )
+    meeting_id = cur.fetchone()[0]
+    execute_values(cur, "INSERT INTO MeetingInvitations (MeetingId, UserId, InvitationType, Status) VALUES %s",
+                   [(meeting_id, user_id, 'mandatory', 'accepted') for user_id in user_ids], page_size=size)
+    conn.commit()
+    return user_ids, team_id, meeting_id
+
+
+def remove_users(conn, user_ids):
+    cur = conn.cursor()
+    cur.execute("DELETE FROM Notifications WHERE UserId = ANY(%s)", (user_ids,))
+    cur.execute("DELETE FROM TeamMembers WHERE UserId = ANY(%s)", (user_ids,))
+    cur.execute("DELETE FROM Users WHERE UserId = ANY(%s)", (user_ids,))
+    cur.execute("DELETE FROM NotificationCounters WHERE UserId = ANY(%s)", (user_ids,))
+    cur.execute("DELETE FROM UserDataVersions WHERE UserId = ANY(%s)", (user_ids,))
+    conn.commit()
+
+
+def timed_delete(client, url):
+    CountingCursor.statements = 0
+    started = time.perf_counter()
+    response = client.delete(url)
+    elapsed = (time.perf_counter() - started) * 1000
+    if response.status_code != 200:
+        raise RuntimeError(f"DELETE {url} failed: {response.get_json()}")
+    return CountingCursor.statements, elapsed
+
+
+def drain_notifications(worker):
+    """Runs the queued notifications jobs like the worker does; returns (statements, ms, job ids, notified)"""
+    CountingCursor.statements = 0
+    started = time.perf_counter()
+    job_ids, notified = [], 0
+    conn = index.get_db_connection()
+    try:
+        while True:
+            job = worker.claim(conn, 'notifications')
+            if job is None:
+                break
+            worker.run(conn, job)
+            job_ids.append(job[0])
+        cur = conn.cursor()
+        cur.execute("SELECT Status, Result FROM Jobs WHERE JobId = ANY(%s)", (job_ids,))
+        for status, result in cur.fetchall():
+            if status != 'succeeded':
+                raise RuntimeError(f"notify_users job ended as {status}")
+            notified += result['notified']
+        conn.commit()
+    finally:
+        conn.close()
+    return CountingCursor.statements, (time.perf_counter() - started) * 1000, job_ids, notified
+
+
+def remove_jobs(conn, job_ids):
+    cur = conn.cursor()
+    cur.execute("DELETE FROM Jobs WHERE JobId = ANY(%s)", (job_ids,))
+    conn.commit()
+
+
+def main():
+    if not os.getenv("DATABASE_URL"):
+        sys.exit("DATABASE_URL must point at a scratch PlanIt database")
+
+    index.JOB_WORKER_ENABLED = True  # queue the fan-out so it can be measured apart from the request
+    index.get_db_connection = counting_connection(index.get_db_connection)
+    client = index.app.test_client()
+    worker = index.JobWorker(os.getenv("DATABASE_URL"), {'notifications': 1})
+    seed_conn = psycopg2.connect(os.getenv("DATABASE_URL"))
+
+    print(f"{'members':>8} {'request':>8} {'stmts':>6} {'ms':>8} {'fan-out stmts':>14} {'fan-out ms':>11} {'notified':>9}")
+    try:
+        for size in TEAM_SIZES:
+            user_ids, team_id, meeting_id = seed_team(seed_conn, size)
+            job_ids = []
+            try:
+                for name, url, expected in (
+                    ('meeting', f"/api/meetings/{meeting_id}", size),
+                    ('team', f"/api/teams/{team_id}", size - 1),  # the creator is not notified
+                ):
+                    statements, ms = timed_delete(client, url)
+                    job_statements, job_ms, drained, notified = drain_notifications(worker)
+                    job_ids += drained
+                    if notified != expected:
+                        raise RuntimeError(f"{name} delete notified {notified} of {expected} members")
+                    print(f"{size:>8} {name:>8} {statements:>6} {ms:>8.2f} {job_statements:>14} {job_ms:>11.2f} {notified:>9}")
+            finally:
+                remove_jobs(seed_conn, job_ids)
+                remove_users(seed_conn, user_ids)
+    finally:
+        seed_conn.close()
+        index.get_db_pool().closeall()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark for password verification on the request thread vs. the PasswordHasher
+process pool.
+
+Simulates one threaded Gunicorn worker: LOGIN_THREADS threads verify passwords as
+fast as they can while a probe thread measures how long a small unrelated
+request (a few milliseconds of Python work) takes meanwhile. Reports login
+throughput and p99, and the probe's p99, for inline hashing and for the pool.
+
+    python benchmarks/password_hashing_benchmark.py
+"""
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
+
+from index import PASSWORD_HASH_METHOD, PASSWORD_HASH_WORKERS, PasswordHasher  # noqa: E402
+
+LOGIN_THREADS = 16
+DURATION = 10
+PROBE_INTERVAL = 0.01
+PROBE_PAYLOAD = {'items': [{'id': i, 'title': f'item {i}', 'tags': ['a', 'b', 'c']} for i in range(200)]}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else float('nan')
+
+
+def run(hasher, stored_hash):
+    hasher.verify(stored_hash, 'correct horse')  # start the pool outside the measurement
+    stop = threading.Event()
+    login_latencies = []
+    probe_latencies = []
+    lock = threading.Lock()
+
+    def login():
+        while not stop.is_set():
+            started = time.perf_counter()
+            assert hasher.verify(stored_hash, 'correct horse')
+            with lock:
+                login_latencies.append(time.perf_counter() - started)
+
+    def probe():
+        while not stop.is_set():
+            started = time.perf_counter()
+            for _ in range(5):
+                json.loads(json.dumps(PROBE_PAYLOAD))
+            probe_latencies.append(time.perf_counter() - started)
+            time.sleep(PROBE_INTERVAL)
+
+    threads = [threading.Thread(target=login) for _ in range(LOGIN_THREADS)] + [threading.Thread(target=probe)]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return len(login_latencies) / DURATION, percentile(login_latencies, 0.99), \
+        statistics.median(probe_latencies) * 1000, percentile(probe_latencies, 0.99)
+
+
+def main():
+    stored_hash = PasswordHasher(PASSWORD_HASH_METHOD, 0, 1).hash('correct horse')
+    print(f"method={PASSWORD_HASH_METHOD} cpus={os.cpu_count()} login threads={LOGIN_THREADS}")
+    print(f"{'mode':>12} {'logins/s':>9} {'login p99 ms':>13} {'probe p50 ms':>13} {'probe p99 ms':>13}")
+    for mode, workers in (('inline', 0), (f'pool x{PASSWORD_HASH_WORKERS}', PASSWORD_HASH_WORKERS)):
+        hasher = PasswordHasher(PASSWORD_HASH_METHOD, workers, LOGIN_THREADS * 4)
+        throughput, login_p99, probe_p50, probe_p99 = run(hasher, stored_hash)
+        print(f"{mode:>12} {throughput:>9.1f} {login_p99:>13.1f} {probe_p50:>13.2f} {probe_p99:>13.2f}")
+        if hasher._executor is not None:
+            hasher._executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark for the deterministic meeting slot finder (find_meeting_slots).
+
+Generates random busy schedules for teams of 5 to 500 members over a two-week
+window and reports the median time to produce 10 suggestions.
+
+    python benchmarks/slot_finder_benchmark.py
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
+
+from index import find_meeting_slots, merge_intervals  # noqa: E402
+
+TEAM_SIZES = [5, 25, 50, 100, 250, 500]
+DAYS = 14
+ITEMS_PER_DAY = 3
+RUNS = 7
+
+
+def random_schedule(rng, start_date, days, items_per_day):
+    intervals = []
+    for offset in range(days):
+        day = datetime.combine(start_date + timedelta(days=offset), datetime.min.time())
+        for _ in range(rng.randint(0, items_per_day)):
+            start = day + timedelta(minutes=rng.randrange(7 * 60, 19 * 60, 15))
+            intervals.append((start, start + timedelta(minutes=rng.choice([30, 45, 60, 90, 120]))))
+    return merge_intervals(intervals)
+
+
+def main():
+    rng = random.Random(42)
+    start_date = date(2025, 1, 6)
+    end_date = start_date + timedelta(days=DAYS - 1)
+    work_start = datetime.strptime('09:00', '%H:%M').time()
+    work_end = datetime.strptime('17:00', '%H:%M').time()
+
+    print(f"{'members':>8} {'busy intervals':>15} {'median ms':>10} {'conflict-free':>14}")
+    for size in TEAM_SIZES:
+        member_busy = {f"member{i}": random_schedule(rng, start_date, DAYS, ITEMS_PER_DAY) for i in range(size)}
+        interval_count = sum(len(intervals) for intervals in member_busy.values())
+        timings = []
+        for _ in range(RUNS):
+            started = time.perf_counter()
+            suggestions = find_meeting_slots(member_busy, start_date, end_date, 60, work_start, work_end, 'morning', 10)
+            timings.append((time.perf_counter() - started) * 1000)
+        conflict_free = sum(1 for s in suggestions if not s['conflicts'])
+        print(f"{size:>8} {interval_count:>15} {statistics.median(timings):>10.2f} {conflict_free:>14}")
+
+
+if __name__ == '__main__':
+    main()
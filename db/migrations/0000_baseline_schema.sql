@@ -0,0 +1,95 @@
+-- Baseline PlanIt schema: the tables api/index.py has always assumed, as they
+-- are used by its queries. Every statement is IF NOT EXISTS, so on databases
+-- created before migrations were tracked this is a no-op and the later files
+-- bring them to the same shape. Foreign keys and secondary indexes live in the
+-- numbered migrations that follow.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS Users (
+    UserId SERIAL PRIMARY KEY,
+    UserName VARCHAR(100) NOT NULL,
+    UserEmail VARCHAR(255) NOT NULL,
+    UserPassword VARCHAR(255),
+    UserDOB DATE,
+    UserBio TEXT,
+    UserProfilePicture TEXT,
+    GoogleId VARCHAR(255)
+);
+
+CREATE TABLE IF NOT EXISTS Activity (
+    ActivityId SERIAL PRIMARY KEY,
+    UserId INTEGER NOT NULL,
+    ActivityTitle VARCHAR(255) NOT NULL,
+    ActivityDescription TEXT,
+    ActivityCategory VARCHAR(50),
+    ActivityUrgency VARCHAR(20),
+    ActivityDate DATE NOT NULL,
+    ActivityStartTime TIME,
+    ActivityEndTime TIME
+);
+
+CREATE TABLE IF NOT EXISTS Goal (
+    GoalId SERIAL PRIMARY KEY,
+    UserId INTEGER NOT NULL,
+    GoalTitle VARCHAR(255) NOT NULL,
+    GoalDescription TEXT,
+    GoalCategory VARCHAR(50),
+    GoalProgress VARCHAR(50)
+);
+
+CREATE TABLE IF NOT EXISTS Timeline (
+    TimelineId SERIAL PRIMARY KEY,
+    GoalId INTEGER NOT NULL,
+    TimelineTitle VARCHAR(255),
+    TimelineStartDate DATE NOT NULL,
+    TimelineEndDate DATE NOT NULL,
+    TimelineStartTime TIME,
+    TimelineEndTime TIME
+);
+
+CREATE TABLE IF NOT EXISTS Team (
+    TeamId SERIAL PRIMARY KEY,
+    TeamName VARCHAR(255) NOT NULL,
+    TeamDescription TEXT,
+    TeamStartWorkingHour TIME,
+    TeamEndWorkingHour TIME,
+    CreatedByUserId INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS TeamMembers (
+    TeamId INTEGER NOT NULL,
+    UserId INTEGER NOT NULL,
+    PRIMARY KEY (TeamId, UserId)
+);
+
+CREATE TABLE IF NOT EXISTS TeamMeeting (
+    TeamMeetingId SERIAL PRIMARY KEY,
+    TeamId INTEGER NOT NULL,
+    MeetingTitle VARCHAR(255) NOT NULL,
+    MeetingDescription TEXT,
+    MeetingDate DATE NOT NULL,
+    MeetingStartTime TIME,
+    MeetingEndTime TIME,
+    InvitationType VARCHAR(20) NOT NULL DEFAULT 'mandatory'
+);
+
+CREATE TABLE IF NOT EXISTS MeetingInvitations (
+    MeetingId INTEGER NOT NULL,
+    UserId INTEGER NOT NULL,
+    InvitationType VARCHAR(20) NOT NULL DEFAULT 'mandatory',
+    Status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    RespondedAt TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS Notifications (
+    NotificationId SERIAL PRIMARY KEY,
+    UserId INTEGER NOT NULL,
+    Type VARCHAR(50) NOT NULL,
+    Title VARCHAR(255) NOT NULL,
+    Message TEXT,
+    RelatedId INTEGER,
+    IsRead BOOLEAN NOT NULL DEFAULT FALSE,
+    CreatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMIT;
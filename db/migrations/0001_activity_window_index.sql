@@ -0,0 +1,5 @@
+-- Supports GET /api/activities date windows and keyset pagination on
+-- (ActivityDate, ActivityStartTime, ActivityId). Activities without a start
+-- time sort last within their day, so the index uses the same expression.
+CREATE INDEX IF NOT EXISTS idx_activity_user_window
+    ON Activity (UserId, ActivityDate, (COALESCE(ActivityStartTime, TIME '24:00')), ActivityId);
@@ -0,0 +1,83 @@
+-- Per-user unread notification counter behind GET /api/notifications/unread-count.
+-- Statement-level triggers on Notifications keep it in sync for every writer
+-- (inserts, mark read / mark all read, invitation responses and deletes), so
+-- bulk statements adjust each user's counter once rather than once per row.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS NotificationCounters (
+    UserId INTEGER PRIMARY KEY,
+    UnreadCount INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION notification_counters_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO NotificationCounters AS c (UserId, UnreadCount)
+        SELECT UserId, COUNT(*) FROM new_rows
+        WHERE NOT COALESCE(IsRead, FALSE)
+        GROUP BY UserId
+        ON CONFLICT (UserId) DO UPDATE SET UnreadCount = c.UnreadCount + EXCLUDED.UnreadCount;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE NotificationCounters c
+        SET UnreadCount = GREATEST(c.UnreadCount - d.Removed, 0)
+        FROM (
+            SELECT UserId, COUNT(*) AS Removed FROM old_rows
+            WHERE NOT COALESCE(IsRead, FALSE)
+            GROUP BY UserId
+        ) d
+        WHERE c.UserId = d.UserId;
+    ELSE
+        WITH deltas AS (
+            SELECT UserId, SUM(Delta) AS Delta FROM (
+                SELECT UserId, 1 AS Delta FROM new_rows WHERE NOT COALESCE(IsRead, FALSE)
+                UNION ALL
+                SELECT UserId, -1 AS Delta FROM old_rows WHERE NOT COALESCE(IsRead, FALSE)
+            ) changes
+            GROUP BY UserId
+            HAVING SUM(Delta) <> 0
+        ), updated AS (
+            UPDATE NotificationCounters c
+            SET UnreadCount = GREATEST(c.UnreadCount + deltas.Delta, 0)
+            FROM deltas
+            WHERE c.UserId = deltas.UserId
+            RETURNING c.UserId
+        )
+        INSERT INTO NotificationCounters (UserId, UnreadCount)
+        SELECT UserId, Delta FROM deltas
+        WHERE Delta > 0 AND UserId NOT IN (SELECT UserId FROM updated);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notification_counters_insert ON Notifications;
+CREATE TRIGGER trg_notification_counters_insert
+    AFTER INSERT ON Notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_apply();
+
+DROP TRIGGER IF EXISTS trg_notification_counters_update ON Notifications;
+CREATE TRIGGER trg_notification_counters_update
+    AFTER UPDATE ON Notifications
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_apply();
+
+DROP TRIGGER IF EXISTS trg_notification_counters_delete ON Notifications;
+CREATE TRIGGER trg_notification_counters_delete
+    AFTER DELETE ON Notifications
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notification_counters_apply();
+
+-- Backfill under a lock so no notification is counted twice or missed.
+LOCK TABLE Notifications IN SHARE ROW EXCLUSIVE MODE;
+INSERT INTO NotificationCounters (UserId, UnreadCount)
+SELECT UserId, COUNT(*) FILTER (WHERE NOT COALESCE(IsRead, FALSE))
+FROM Notifications
+GROUP BY UserId
+ON CONFLICT (UserId) DO UPDATE SET UnreadCount = EXCLUDED.UnreadCount;
+
+-- Keyset pagination of the notification feed.
+CREATE INDEX IF NOT EXISTS idx_notifications_user_created
+    ON Notifications (UserId, CreatedAt DESC, NotificationId DESC);
+
+COMMIT;
@@ -0,0 +1,36 @@
+-- Publishes the affected user ids on channel planit_notifications whenever
+-- Notifications rows are written, so GET /api/notifications/stream can wake
+-- only the streams that have something new. NOTIFY is delivered on commit and
+-- identical payloads within one transaction are collapsed by Postgres.
+BEGIN;
+
+CREATE OR REPLACE FUNCTION notifications_publish() RETURNS trigger AS $$
+DECLARE
+    affected RECORD;
+BEGIN
+    FOR affected IN SELECT DISTINCT UserId FROM changed_rows LOOP
+        PERFORM pg_notify('planit_notifications', affected.UserId::text);
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notifications_publish_insert ON Notifications;
+CREATE TRIGGER trg_notifications_publish_insert
+    AFTER INSERT ON Notifications
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notifications_publish();
+
+DROP TRIGGER IF EXISTS trg_notifications_publish_update ON Notifications;
+CREATE TRIGGER trg_notifications_publish_update
+    AFTER UPDATE ON Notifications
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notifications_publish();
+
+DROP TRIGGER IF EXISTS trg_notifications_publish_delete ON Notifications;
+CREATE TRIGGER trg_notifications_publish_delete
+    AFTER DELETE ON Notifications
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notifications_publish();
+
+COMMIT;
@@ -0,0 +1,160 @@
+-- Per-user data version behind the ETags of GET /api/activities, /api/goals,
+-- /api/teams and /api/notifications. Statement-level triggers bump the version
+-- of every user whose view of the data a write changes, so the value is shared
+-- by all workers and no route can forget to bump it.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS UserDataVersions (
+    UserId INTEGER PRIMARY KEY,
+    Version BIGINT NOT NULL DEFAULT 0
+);
+
+-- Rows are locked in UserId order so concurrent bumps cannot deadlock.
+CREATE OR REPLACE FUNCTION bump_user_data_versions(user_ids INTEGER[]) RETURNS void AS $$
+    INSERT INTO UserDataVersions AS v (UserId, Version)
+    SELECT DISTINCT u, 1 FROM unnest(user_ids) AS u
+    WHERE u IS NOT NULL
+    ORDER BY u
+    ON CONFLICT (UserId) DO UPDATE SET Version = v.Version + 1;
+$$ LANGUAGE sql;
+
+-- Activity, Goal and Notifications rows belong to exactly one user.
+CREATE OR REPLACE FUNCTION user_rows_bump_versions() RETURNS trigger AS $$
+DECLARE
+    ids INTEGER[] := '{}';
+BEGIN
+    IF TG_OP <> 'DELETE' THEN
+        ids := ids || ARRAY(SELECT UserId FROM new_rows);
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        ids := ids || ARRAY(SELECT UserId FROM old_rows);
+    END IF;
+    PERFORM bump_user_data_versions(ids);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION timeline_bump_versions() RETURNS trigger AS $$
+DECLARE
+    goal_ids INTEGER[] := '{}';
+BEGIN
+    IF TG_OP <> 'DELETE' THEN
+        goal_ids := goal_ids || ARRAY(SELECT GoalId FROM new_rows);
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        goal_ids := goal_ids || ARRAY(SELECT GoalId FROM old_rows);
+    END IF;
+    PERFORM bump_user_data_versions(ARRAY(SELECT UserId FROM Goal WHERE GoalId = ANY(goal_ids)));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Team, TeamMeeting: every member of the team sees the change.
+CREATE OR REPLACE FUNCTION team_rows_bump_versions() RETURNS trigger AS $$
+DECLARE
+    team_ids INTEGER[] := '{}';
+BEGIN
+    IF TG_OP <> 'DELETE' THEN
+        team_ids := team_ids || ARRAY(SELECT TeamId FROM new_rows);
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        team_ids := team_ids || ARRAY(SELECT TeamId FROM old_rows);
+    END IF;
+    PERFORM bump_user_data_versions(ARRAY(SELECT UserId FROM TeamMembers WHERE TeamId = ANY(team_ids)));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- TeamMembers: the joining or leaving user's team list changes.
+CREATE OR REPLACE FUNCTION team_members_bump_versions() RETURNS trigger AS $$
+DECLARE
+    ids INTEGER[] := '{}';
+BEGIN
+    IF TG_OP <> 'DELETE' THEN
+        ids := ids || ARRAY(SELECT UserId FROM new_rows);
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        ids := ids || ARRAY(SELECT UserId FROM old_rows);
+    END IF;
+    PERFORM bump_user_data_versions(ids);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- MeetingInvitations: meeting visibility and member lists change for the whole team.
+CREATE OR REPLACE FUNCTION invitations_bump_versions() RETURNS trigger AS $$
+DECLARE
+    meeting_ids INTEGER[] := '{}';
+    ids INTEGER[] := '{}';
+BEGIN
+    IF TG_OP <> 'DELETE' THEN
+        meeting_ids := meeting_ids || ARRAY(SELECT MeetingId FROM new_rows);
+        ids := ids || ARRAY(SELECT UserId FROM new_rows);
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        meeting_ids := meeting_ids || ARRAY(SELECT MeetingId FROM old_rows);
+        ids := ids || ARRAY(SELECT UserId FROM old_rows);
+    END IF;
+    ids := ids || ARRAY(
+        SELECT tmem.UserId
+        FROM TeamMeeting tm
+        JOIN TeamMembers tmem ON tm.TeamId = tmem.TeamId
+        WHERE tm.TeamMeetingId = ANY(meeting_ids)
+    );
+    PERFORM bump_user_data_versions(ids);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Users: names and pictures appear in the member lists of every shared team.
+CREATE OR REPLACE FUNCTION users_bump_versions() RETURNS trigger AS $$
+BEGIN
+    PERFORM bump_user_data_versions(ARRAY(
+        SELECT UserId FROM new_rows
+        UNION
+        SELECT other.UserId
+        FROM TeamMembers mine
+        JOIN TeamMembers other ON mine.TeamId = other.TeamId
+        WHERE mine.UserId IN (SELECT UserId FROM new_rows)
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    spec RECORD;
+BEGIN
+    FOR spec IN SELECT * FROM (VALUES
+        ('activity', 'Activity', 'user_rows_bump_versions'),
+        ('goal', 'Goal', 'user_rows_bump_versions'),
+        ('notifications', 'Notifications', 'user_rows_bump_versions'),
+        ('timeline', 'Timeline', 'timeline_bump_versions'),
+        ('team', 'Team', 'team_rows_bump_versions'),
+        ('teammeeting', 'TeamMeeting', 'team_rows_bump_versions'),
+        ('teammembers', 'TeamMembers', 'team_members_bump_versions'),
+        ('meetinginvitations', 'MeetingInvitations', 'invitations_bump_versions')
+    ) AS t(prefix, tbl, fn) LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_versions_insert ON %I', spec.prefix, spec.tbl);
+        EXECUTE format('CREATE TRIGGER trg_%s_versions_insert AFTER INSERT ON %I '
+                       'REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION %I()',
+                       spec.prefix, spec.tbl, spec.fn);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_versions_update ON %I', spec.prefix, spec.tbl);
+        EXECUTE format('CREATE TRIGGER trg_%s_versions_update AFTER UPDATE ON %I '
+                       'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION %I()',
+                       spec.prefix, spec.tbl, spec.fn);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_versions_delete ON %I', spec.prefix, spec.tbl);
+        EXECUTE format('CREATE TRIGGER trg_%s_versions_delete AFTER DELETE ON %I '
+                       'REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION %I()',
+                       spec.prefix, spec.tbl, spec.fn);
+    END LOOP;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_users_versions_update ON Users;
+CREATE TRIGGER trg_users_versions_update
+    AFTER UPDATE ON Users
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION users_bump_versions();
+
+COMMIT;
@@ -0,0 +1,7 @@
+-- Access paths for the range-bounded schedule queries behind POST /api/freebusy:
+-- goals by owner, timelines by goal and start date, a user's invitations by
+-- status, and a team's meetings by date.
+CREATE INDEX IF NOT EXISTS idx_goal_user ON Goal (UserId);
+CREATE INDEX IF NOT EXISTS idx_timeline_goal_start ON Timeline (GoalId, TimelineStartDate);
+CREATE INDEX IF NOT EXISTS idx_meetinginvitations_user_status ON MeetingInvitations (UserId, Status, MeetingId);
+CREATE INDEX IF NOT EXISTS idx_teammeeting_team_date ON TeamMeeting (TeamId, MeetingDate);
@@ -0,0 +1,19 @@
+-- Indexes behind GET /api/search. Titles get trigram indexes for typeahead
+-- substring matching; titles and descriptions get 'simple' full-text indexes
+-- for word-prefix matching. The expressions must stay identical to the
+-- *_SEARCH_VECTOR constants in api/index.py or the planner will not use them.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_activity_title_trgm ON Activity USING GIN (ActivityTitle gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_goal_title_trgm ON Goal USING GIN (GoalTitle gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_timeline_title_trgm ON Timeline USING GIN (TimelineTitle gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_teammeeting_title_trgm ON TeamMeeting USING GIN (MeetingTitle gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_activity_search_fts ON Activity
+    USING GIN (to_tsvector('simple', coalesce(ActivityTitle, '') || ' ' || coalesce(ActivityDescription, '')));
+CREATE INDEX IF NOT EXISTS idx_goal_search_fts ON Goal
+    USING GIN (to_tsvector('simple', coalesce(GoalTitle, '') || ' ' || coalesce(GoalDescription, '')));
+CREATE INDEX IF NOT EXISTS idx_timeline_search_fts ON Timeline
+    USING GIN (to_tsvector('simple', coalesce(TimelineTitle, '')));
+CREATE INDEX IF NOT EXISTS idx_teammeeting_search_fts ON TeamMeeting
+    USING GIN (to_tsvector('simple', coalesce(MeetingTitle, '') || ' ' || coalesce(MeetingDescription, '')));
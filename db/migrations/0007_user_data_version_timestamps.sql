@@ -0,0 +1,16 @@
+-- Records when each user's data version last changed, so the ICS feed
+-- (GET /api/users/<id>/calendar.ics) can send Last-Modified and answer
+-- If-Modified-Since without rendering anything.
+BEGIN;
+
+ALTER TABLE UserDataVersions ADD COLUMN IF NOT EXISTS UpdatedAt TIMESTAMPTZ NOT NULL DEFAULT now();
+
+CREATE OR REPLACE FUNCTION bump_user_data_versions(user_ids INTEGER[]) RETURNS void AS $$
+    INSERT INTO UserDataVersions AS v (UserId, Version)
+    SELECT DISTINCT u, 1 FROM unnest(user_ids) AS u
+    WHERE u IS NOT NULL
+    ORDER BY u
+    ON CONFLICT (UserId) DO UPDATE SET Version = v.Version + 1, UpdatedAt = now();
+$$ LANGUAGE sql;
+
+COMMIT;
@@ -0,0 +1,30 @@
+-- Publishes the GoogleId of every deleted (or re-keyed) Users row on channel
+-- planit_users, so each worker's Google-id -> UserId cache (UserIdCache in
+-- api/index.py) drops the mapping as soon as the delete commits instead of
+-- waiting for its TTL.
+BEGIN;
+
+CREATE OR REPLACE FUNCTION users_publish_invalidation() RETURNS trigger AS $$
+DECLARE
+    affected RECORD;
+BEGIN
+    FOR affected IN SELECT DISTINCT GoogleId FROM old_rows WHERE GoogleId IS NOT NULL LOOP
+        PERFORM pg_notify('planit_users', affected.GoogleId);
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_users_publish_delete ON Users;
+CREATE TRIGGER trg_users_publish_delete
+    AFTER DELETE ON Users
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION users_publish_invalidation();
+
+DROP TRIGGER IF EXISTS trg_users_publish_update ON Users;
+CREATE TRIGGER trg_users_publish_update
+    AFTER UPDATE ON Users
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION users_publish_invalidation();
+
+COMMIT;
@@ -0,0 +1,27 @@
+-- Indexes and uniqueness for the remaining hot access paths. Already covered
+-- by earlier files and not repeated here:
+--   Activity (UserId, ActivityDate, start time)  idx_activity_user_window (0001)
+--   Timeline (GoalId, TimelineStartDate)          idx_timeline_goal_start (0005)
+--   Notifications (UserId, CreatedAt DESC)        idx_notifications_user_created (0002)
+-- Login and registration look users up by email and Google id, invitations are
+-- read and written per (meeting, user), and the ON DELETE CASCADE keys added in
+-- 0010 need an index on every referencing column.
+BEGIN;
+
+-- register already refuses duplicates; if older rows violate these the
+-- migration stops here and they have to be merged by hand.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON Users (UserEmail);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_google_id ON Users (GoogleId);
+
+-- Duplicate invitations carry no information; keep one of each.
+DELETE FROM MeetingInvitations a
+USING MeetingInvitations b
+WHERE a.MeetingId = b.MeetingId AND a.UserId = b.UserId AND a.ctid > b.ctid;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_meetinginvitations_meeting_user ON MeetingInvitations (MeetingId, UserId);
+
+-- TeamMembers (TeamId, UserId) is already unique through its primary key.
+CREATE INDEX IF NOT EXISTS idx_teammembers_user ON TeamMembers (UserId);
+
+CREATE INDEX IF NOT EXISTS idx_team_created_by ON Team (CreatedByUserId);
+
+COMMIT;
@@ -0,0 +1,61 @@
+-- Foreign keys with ON DELETE CASCADE, so deleting a user, goal, team or
+-- meeting is one DELETE and Postgres removes the dependent rows. Any existing
+-- single-column foreign key on these columns is replaced. Rows that already
+-- point at a missing parent are unreachable from the API and are removed
+-- first; parents are processed before their children so those removals
+-- cascade too.
+BEGIN;
+
+-- Cascaded deletes fire the version triggers after the user row is gone;
+-- skip users that no longer exist instead of re-creating their version row.
+CREATE OR REPLACE FUNCTION bump_user_data_versions(user_ids INTEGER[]) RETURNS void AS $$
+    INSERT INTO UserDataVersions AS v (UserId, Version)
+    SELECT DISTINCT u, 1 FROM unnest(user_ids) AS u
+    WHERE u IS NOT NULL AND EXISTS (SELECT 1 FROM Users WHERE UserId = u)
+    ORDER BY u
+    ON CONFLICT (UserId) DO UPDATE SET Version = v.Version + 1, UpdatedAt = now();
+$$ LANGUAGE sql;
+
+DO $$
+DECLARE
+    spec RECORD;
+    existing RECORD;
+BEGIN
+    FOR spec IN SELECT * FROM (VALUES
+        (1, 'activity', 'userid', 'users', 'userid', 'fk_activity_user'),
+        (2, 'goal', 'userid', 'users', 'userid', 'fk_goal_user'),
+        (3, 'timeline', 'goalid', 'goal', 'goalid', 'fk_timeline_goal'),
+        (4, 'team', 'createdbyuserid', 'users', 'userid', 'fk_team_creator'),
+        (5, 'teammembers', 'teamid', 'team', 'teamid', 'fk_teammembers_team'),
+        (6, 'teammembers', 'userid', 'users', 'userid', 'fk_teammembers_user'),
+        (7, 'teammeeting', 'teamid', 'team', 'teamid', 'fk_teammeeting_team'),
+        (8, 'meetinginvitations', 'meetingid', 'teammeeting', 'teammeetingid', 'fk_meetinginvitations_meeting'),
+        (9, 'meetinginvitations', 'userid', 'users', 'userid', 'fk_meetinginvitations_user'),
+        (10, 'notifications', 'userid', 'users', 'userid', 'fk_notifications_user'),
+        (11, 'notificationcounters', 'userid', 'users', 'userid', 'fk_notificationcounters_user'),
+        (12, 'userdataversions', 'userid', 'users', 'userid', 'fk_userdataversions_user')
+    ) AS s(ord, tbl, col, ref_tbl, ref_col, name) ORDER BY ord LOOP
+        FOR existing IN
+            SELECT c.conname
+            FROM pg_constraint c
+            JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+            WHERE c.contype = 'f' AND c.conrelid = spec.tbl::regclass
+              AND array_length(c.conkey, 1) = 1 AND a.attname = spec.col
+        LOOP
+            EXECUTE format('ALTER TABLE %I DROP CONSTRAINT %I', spec.tbl, existing.conname);
+        END LOOP;
+
+        EXECUTE format(
+            'DELETE FROM %I child WHERE child.%I IS NOT NULL '
+            'AND NOT EXISTS (SELECT 1 FROM %I parent WHERE parent.%I = child.%I)',
+            spec.tbl, spec.col, spec.ref_tbl, spec.ref_col, spec.col
+        );
+        EXECUTE format(
+            'ALTER TABLE %I ADD CONSTRAINT %I FOREIGN KEY (%I) REFERENCES %I (%I) ON DELETE CASCADE',
+            spec.tbl, spec.name, spec.col, spec.ref_tbl, spec.ref_col
+        );
+    END LOOP;
+END;
+$$;
+
+COMMIT;
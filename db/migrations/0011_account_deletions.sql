@@ -0,0 +1,26 @@
+-- Asynchronous account deletion. DELETE /api/users/<id> only marks the user
+-- (Users.DeletedAt, with the email and Google id released) and queues a row
+-- here; `python api/index.py worker` then purges the account in bounded
+-- batches. Stage and RowsDeleted are updated in the same transaction as each
+-- batch, and a worker holds a deletion only while its lease is current, so a
+-- crashed purge is picked up again where it stopped.
+BEGIN;
+
+ALTER TABLE Users ADD COLUMN IF NOT EXISTS DeletedAt TIMESTAMPTZ;
+
+CREATE TABLE IF NOT EXISTS AccountDeletions (
+    UserId INTEGER PRIMARY KEY,
+    RequestedAt TIMESTAMPTZ NOT NULL DEFAULT now(),
+    StartedAt TIMESTAMPTZ,
+    CompletedAt TIMESTAMPTZ,
+    Stage TEXT NOT NULL DEFAULT 'pending',
+    RowsDeleted BIGINT NOT NULL DEFAULT 0,
+    Attempts INTEGER NOT NULL DEFAULT 0,
+    LeaseUntil TIMESTAMPTZ,
+    LastError TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_accountdeletions_pending
+    ON AccountDeletions (RequestedAt) WHERE CompletedAt IS NULL;
+
+COMMIT;
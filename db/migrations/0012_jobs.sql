@@ -0,0 +1,55 @@
+-- Durable job queue for side effects that do not have to finish inside the
+-- request: notification fan-out and AI work. Routes insert jobs with the same
+-- transaction as the change that causes them (outbox), so a job exists exactly
+-- when that change committed. `python api/index.py worker` claims them with
+-- FOR UPDATE SKIP LOCKED.
+--
+-- Status moves queued -> running -> succeeded; a failed attempt goes back to
+-- queued with a later RunAt until MaxAttempts is reached, and then to dead.
+-- A running job whose LockedUntil has passed belonged to a worker that died
+-- and is claimed again.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS Jobs (
+    JobId BIGSERIAL PRIMARY KEY,
+    Queue TEXT NOT NULL,
+    Kind TEXT NOT NULL,
+    Payload JSONB NOT NULL DEFAULT '{}',
+    Status TEXT NOT NULL DEFAULT 'queued'
+        CHECK (Status IN ('queued', 'running', 'succeeded', 'dead')),
+    Attempts INTEGER NOT NULL DEFAULT 0,
+    MaxAttempts INTEGER NOT NULL DEFAULT 5,
+    RunAt TIMESTAMPTZ NOT NULL DEFAULT now(),
+    LockedBy TEXT,
+    LockedUntil TIMESTAMPTZ,
+    Result JSONB,
+    LastError TEXT,
+    CreatedAt TIMESTAMPTZ NOT NULL DEFAULT now(),
+    UpdatedAt TIMESTAMPTZ NOT NULL DEFAULT now(),
+    FinishedAt TIMESTAMPTZ
+);
+
+-- Claims scan only unfinished jobs of one queue, oldest first.
+CREATE INDEX IF NOT EXISTS idx_jobs_claim
+    ON Jobs (Queue, RunAt, JobId) WHERE Status IN ('queued', 'running');
+
+-- Wakes idle workers on channel planit_jobs with the queue name. Like every
+-- NOTIFY it is delivered on commit, so a woken worker can already see the job.
+CREATE OR REPLACE FUNCTION jobs_publish() RETURNS trigger AS $$
+DECLARE
+    affected RECORD;
+BEGIN
+    FOR affected IN SELECT DISTINCT Queue FROM changed_rows LOOP
+        PERFORM pg_notify('planit_jobs', affected.Queue);
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_jobs_publish_insert ON Jobs;
+CREATE TRIGGER trg_jobs_publish_insert
+    AFTER INSERT ON Jobs
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION jobs_publish();
+
+COMMIT;
@@ -0,0 +1,3 @@
+-- Earlier versions of 0009 also built idx_teammembers_team_user, a unique
+-- index identical to the TeamMembers primary key. It only slowed down writes.
+DROP INDEX IF EXISTS idx_teammembers_team_user;
@@ -0,0 +1,10 @@
+-- Calendar feeds are fetched without a session by external calendar clients,
+-- so they are addressed by a random per-user token instead of the sequential
+-- UserId. A user has no feed until they create a token, and creating a new
+-- token revokes the old URL.
+BEGIN;
+
+ALTER TABLE Users ADD COLUMN IF NOT EXISTS CalendarFeedToken TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_users_calendar_feed_token ON Users (CalendarFeedToken);
+
+COMMIT;
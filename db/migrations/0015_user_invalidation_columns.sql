@@ -0,0 +1,24 @@
+-- 0008 published on every UPDATE of Users, so logins (picture refresh,
+-- password rehash) and profile edits evicted the user from every worker's
+-- Google-id cache. Only a changed GoogleId or DeletedAt can make a cached
+-- mapping wrong. Postgres does not allow transition tables on column-specific
+-- triggers, so this one is per row.
+BEGIN;
+
+CREATE OR REPLACE FUNCTION users_publish_invalidation_row() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('planit_users', OLD.GoogleId);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_users_publish_update ON Users;
+CREATE TRIGGER trg_users_publish_update
+    AFTER UPDATE OF GoogleId, DeletedAt ON Users
+    FOR EACH ROW
+    WHEN (OLD.GoogleId IS NOT NULL AND (
+        OLD.GoogleId IS DISTINCT FROM NEW.GoogleId OR OLD.DeletedAt IS DISTINCT FROM NEW.DeletedAt
+    ))
+    EXECUTE FUNCTION users_publish_invalidation_row();
+
+COMMIT;
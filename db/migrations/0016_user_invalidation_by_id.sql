@@ -0,0 +1,33 @@
+-- _get_internal_user_id now caches internal UserIds as well as Google ids, so
+-- invalidations name the user instead of the Google id: the payload on
+-- planit_users becomes 'user:<UserId>', and each worker drops every cached
+-- key that resolves to that user. Updates publish whenever DeletedAt or
+-- GoogleId actually changes, whether or not the user has a Google id.
+BEGIN;
+
+CREATE OR REPLACE FUNCTION users_publish_invalidation() RETURNS trigger AS $$
+DECLARE
+    affected RECORD;
+BEGIN
+    FOR affected IN SELECT DISTINCT UserId FROM old_rows LOOP
+        PERFORM pg_notify('planit_users', 'user:' || affected.UserId);
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION users_publish_invalidation_row() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('planit_users', 'user:' || OLD.UserId);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_users_publish_update ON Users;
+CREATE TRIGGER trg_users_publish_update
+    AFTER UPDATE OF GoogleId, DeletedAt ON Users
+    FOR EACH ROW
+    WHEN (OLD.GoogleId IS DISTINCT FROM NEW.GoogleId OR OLD.DeletedAt IS DISTINCT FROM NEW.DeletedAt)
+    EXECUTE FUNCTION users_publish_invalidation_row();
+
+COMMIT;
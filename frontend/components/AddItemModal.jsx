@@ -8,9 +8,6 @@ const AddItemModal = ({ isOpen, onClose }) => {
   const [isLoading, setIsLoading] = useState(false)
   const [apiError, setApiError] = useState("")
   const [successMessage, setSuccessMessage] = useState("")
-  const [activities, setActivities] = useState([])
-  const [goals, setGoals] = useState([])
-  const [teams, setTeams] = useState([])
   const [aiSuggestions, setAiSuggestions] = useState([])
   const [isLoadingAI, setIsLoadingAI] = useState(false)
   const [selectedSuggestion, setSelectedSuggestion] = useState(null)
@@ -72,39 +69,6 @@ const AddItemModal = ({ isOpen, onClose }) => {
     return user.id || null
   }
 
-  // Fetch existing data when modal opens
-  useEffect(() => {
-    if (isOpen) {
-      fetchExistingData()
-    }
-  }, [isOpen])
-
-  const fetchExistingData = async () => {
-    try {
-      const userId = getUserId()
-
-      const activitiesResponse = await fetch(`/api/activities?userId=${userId}`)
-      if (activitiesResponse.ok) {
-        const activitiesData = await activitiesResponse.json()
-        setActivities(activitiesData.activities || [])
-      }
-
-      const goalsResponse = await fetch(`/api/goals?userId=${userId}`)
-      if (goalsResponse.ok) {
-        const goalsData = await goalsResponse.json()
-        setGoals(goalsData.goals || [])
-      }
-
-      const teamsResponse = await fetch(`/api/teams?userId=${userId}`)
-      if (teamsResponse.ok) {
-        const teamsData = await teamsResponse.json()
-        setTeams(teamsData.teams || [])
-      }
-    } catch (error) {
-      console.error("Error fetching existing data:", error)
-    }
-  }
-
   // Reset form when modal opens/closes
   useEffect(() => {
     if (isOpen) {
@@ -272,210 +236,48 @@ const AddItemModal = ({ isOpen, onClose }) => {
     }
   }
 
-  const checkActivityOverlaps = (newActivity) => {
-    if (!newActivity.activityStartTime || !newActivity.activityEndTime) {
-      return []
-    }
+  const formatConflict = (conflict) => `• ${conflict.title} (${conflict.time}) [${conflict.type}]`
 
-    const newStart = new Date(`${newActivity.activityDate}T${newActivity.activityStartTime}`)
-    const newEnd = new Date(`${newActivity.activityDate}T${newActivity.activityEndTime}`)
-
-    const overlaps = []
-
-    // Check against existing activities
-    activities.forEach((existingActivity) => {
-      if (existingActivity.activitydate !== newActivity.activityDate) return
-      if (!existingActivity.activitystarttime || !existingActivity.activityendtime) return
-
-      const existingStart = new Date(`${existingActivity.activitydate}T${existingActivity.activitystarttime}`)
-      const existingEnd = new Date(`${existingActivity.activitydate}T${existingActivity.activityendtime}`)
-
-      if (newStart < existingEnd && newEnd > existingStart) {
-        overlaps.push({
-          type: "activity",
-          title: existingActivity.activitytitle,
-          time: `${existingActivity.activitystarttime} - ${existingActivity.activityendtime}`,
-        })
-      }
-    })
+  // Saves with a server-side conflict check; if the server reports conflicts the user
+  // is asked to confirm and the request is resent without the check.
+  const saveWithConflictCheck = async (url, method, payload, describeConflicts) => {
+    const send = (checkConflicts) =>
+      fetch(url, {
+        method,
+        headers: {
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify({ ...payload, checkConflicts }),
+      })
 
-    // Check against goal timelines
-    goals.forEach((goal) => {
-      if (goal.timelines) {
-        goal.timelines.forEach((timeline) => {
-          const timelineStart = new Date(timeline.timelinestartdate)
-          const timelineEnd = new Date(timeline.timelineenddate)
-          const activityDate = new Date(newActivity.activityDate)
-
-          if (activityDate >= timelineStart && activityDate <= timelineEnd) {
-            if (timeline.timelinestarttime && timeline.timelineendtime) {
-              const timelineStartTime = new Date(`${newActivity.activityDate}T${timeline.timelinestarttime}`)
-              const timelineEndTime = new Date(`${newActivity.activityDate}T${timeline.timelineendtime}`)
-
-              if (newStart < timelineEndTime && newEnd > timelineStartTime) {
-                overlaps.push({
-                  type: "goal",
-                  title: `${goal.goaltitle} - ${timeline.timelinetitle}`,
-                  time: `${timeline.timelinestarttime} - ${timeline.timelineendtime}`,
-                })
-              }
-            } else {
-              overlaps.push({
-                type: "goal",
-                title: `${goal.goaltitle} - ${timeline.timelinetitle}`,
-                time: "All day",
-              })
-            }
-          }
-        })
-      }
-    })
+    let response = await send(true)
+    let data = await response.json()
 
-    // Check against team meetings
-    teams.forEach((team) => {
-      if (team.meetings) {
-        team.meetings.forEach((meeting) => {
-          if (meeting.meetingdate !== newActivity.activityDate) return
-          if (!meeting.meetingstarttime || !meeting.meetingendtime) return
-
-          const meetingStart = new Date(`${meeting.meetingdate}T${meeting.meetingstarttime}`)
-          const meetingEnd = new Date(`${meeting.meetingdate}T${meeting.meetingendtime}`)
-
-          if (newStart < meetingEnd && newEnd > meetingStart) {
-            overlaps.push({
-              type: "meeting",
-              title: meeting.meetingtitle,
-              time: `${meeting.meetingstarttime} - ${meeting.meetingendtime}`,
-            })
-          }
-        })
+    if (response.status === 409 && data.conflicts) {
+      if (!window.confirm(describeConflicts(data.conflicts))) {
+        return null
       }
-    })
-
-    return overlaps
-  }
-
-  const checkGoalTimelineOverlaps = (newTimeline) => {
-    const overlaps = []
-
-    if (!newTimeline.timelineStartDate || !newTimeline.timelineEndDate) {
-      return overlaps
+      response = await send(false)
+      data = await response.json()
     }
 
-    const newStart = new Date(newTimeline.timelineStartDate)
-    const newEnd = new Date(newTimeline.timelineEndDate)
-
-    // Check against existing activities
-    activities.forEach((activity) => {
-      const activityDate = new Date(activity.activitydate)
-
-      if (activityDate >= newStart && activityDate <= newEnd) {
-        if (
-          newTimeline.timelineStartTime &&
-          newTimeline.timelineEndTime &&
-          activity.activitystarttime &&
-          activity.activityendtime
-        ) {
-          const timelineStartTime = new Date(`${activity.activitydate}T${newTimeline.timelineStartTime}`)
-          const timelineEndTime = new Date(`${activity.activitydate}T${newTimeline.timelineEndTime}`)
-          const activityStart = new Date(`${activity.activitydate}T${activity.activitystarttime}`)
-          const activityEnd = new Date(`${activity.activitydate}T${activity.activityendtime}`)
-
-          if (timelineStartTime < activityEnd && timelineEndTime > activityStart) {
-            overlaps.push({
-              type: "activity",
-              title: activity.activitytitle,
-              time: `${activity.activitystarttime} - ${activity.activityendtime}`,
-              date: activity.activitydate,
-            })
-          }
-        } else {
-          overlaps.push({
-            type: "activity",
-            title: activity.activitytitle,
-            time: activity.activitystarttime
-              ? `${activity.activitystarttime} - ${activity.activityendtime}`
-              : "All day",
-            date: activity.activitydate,
-          })
-        }
-      }
-    })
-
-    // Check against other goal timelines
-    goals.forEach((goal) => {
-      if (goal.timelines) {
-        goal.timelines.forEach((existingTimeline) => {
-          const existingStart = new Date(existingTimeline.timelinestartdate)
-          const existingEnd = new Date(existingTimeline.timelineenddate)
-
-          if (newStart <= existingEnd && newEnd >= existingStart) {
-            if (
-              newTimeline.timelineStartTime &&
-              newTimeline.timelineEndTime &&
-              existingTimeline.timelinestarttime &&
-              existingTimeline.timelineendtime
-            ) {
-              const commonDay = new Date(Math.max(newStart.getTime(), existingStart.getTime()))
-              const newTimelineStartTime = new Date(`${commonDay.toDateString()} ${newTimeline.timelineStartTime}`)
-              const newTimelineEndTime = new Date(`${commonDay.toDateString()} ${newTimeline.timelineEndTime}`)
-              const existingTimelineStartTime = new Date(`${commonDay.toDateString()} ${existingTimeline.timelinestarttime}`)
-              const existingTimelineEndTime = new Date(`${commonDay.toDateString()} ${existingTimeline.timelineendtime}`)
-
-              if (newTimelineStartTime < existingTimelineEndTime && newTimelineEndTime > existingTimelineStartTime) {
-                overlaps.push({
-                  type: "goal",
-                  title: `${goal.goaltitle} - ${existingTimeline.timelinetitle}`,
-                  time: `${existingTimeline.timelinestarttime} - ${existingTimeline.timelineendtime}`,
-                  date: `${existingTimeline.timelinestartdate} to ${existingTimeline.timelineenddate}`,
-                })
-              }
-            }
-          }
-        })
-      }
-    })
+    return { response, data }
+  }
 
-    // Check against team meetings
-    teams.forEach((team) => {
-      if (team.meetings) {
-        team.meetings.forEach((meeting) => {
-          const meetingDate = new Date(meeting.meetingdate)
-
-          if (meetingDate >= newStart && meetingDate <= newEnd) {
-            if (
-              newTimeline.timelineStartTime &&
-              newTimeline.timelineEndTime &&
-              meeting.meetingstarttime &&
-              meeting.meetingendtime
-            ) {
-              const timelineStartTime = new Date(`${meeting.meetingdate}T${newTimeline.timelineStartTime}`)
-              const timelineEndTime = new Date(`${meeting.meetingdate}T${newTimeline.timelineEndTime}`)
-              const meetingStart = new Date(`${meeting.meetingdate}T${meeting.meetingstarttime}`)
-              const meetingEnd = new Date(`${meeting.meetingdate}T${meeting.meetingendtime}`)
-
-              if (timelineStartTime < meetingEnd && timelineEndTime > meetingStart) {
-                overlaps.push({
-                  type: "meeting",
-                  title: meeting.meetingtitle,
-                  time: `${meeting.meetingstarttime} - ${meeting.meetingendtime}`,
-                  date: meeting.meetingdate,
-                })
-              }
-            } else {
-              overlaps.push({
-                type: "meeting",
-                title: meeting.meetingtitle,
-                time: meeting.meetingstarttime ? `${meeting.meetingstarttime} - ${meeting.meetingendtime}` : "All day",
-                date: meeting.meetingdate,
-              })
-            }
-          }
+  const describeTimelineConflicts = (conflicts) => {
+    let overlapMessage = "The following goal timelines have intersections:\n\n"
+    const timelineIndexes = [...new Set(conflicts.map((conflict) => conflict.window))]
+    timelineIndexes.forEach((timelineIndex) => {
+      overlapMessage += `Timeline ${timelineIndex + 1} (${timelines[timelineIndex].timelineTitle}):\n`
+      conflicts
+        .filter((conflict) => conflict.window === timelineIndex)
+        .forEach((conflict) => {
+          overlapMessage += `  ${formatConflict(conflict)}\n`
         })
-      }
+      overlapMessage += "\n"
     })
-
-    return overlaps
+    overlapMessage += "Do you want to continue?"
+    return overlapMessage
   }
 
   const validateActivityForm = () => {
@@ -542,151 +344,6 @@ const AddItemModal = ({ isOpen, onClose }) => {
       }
 
       const currentUser = JSON.parse(localStorage.getItem("user") || "{}")
-      const allMemberEmails = [currentUser.email, ...validEmails]
-      const memberActivities = {}
-      const teamMembers = []
-      const memberGoals = {}
-      const memberTeams = {}
-
-      for (const email of allMemberEmails) {
-        try {
-          const userResponse = await fetch(`/api/users/by-email/${encodeURIComponent(email)}`)
-
-          if (userResponse.ok) {
-            const userData = await userResponse.json()
-            const userId = userData.user.userid
-
-            teamMembers.push({
-              userid: userId,
-              username: userData.user.username,
-              email: userData.user.useremail,
-            })
-
-            // Get their activities
-            const activitiesResponse = await fetch(`/api/activities?userId=${userId}`)
-            if (activitiesResponse.ok) {
-              const activitiesData = await activitiesResponse.json()
-
-              // Filter activities within date range
-              const filteredActivities = activitiesData.activities.filter((activity) => {
-                if (!activity.activitydate) return false
-
-                const activityDate = new Date(activity.activitydate)
-                const startDate = new Date(meeting.dateRangeStart)
-                const endDate = new Date(meeting.dateRangeEnd)
-
-                if (isNaN(activityDate.getTime()) || isNaN(startDate.getTime()) || isNaN(endDate.getTime())) {
-                  console.warn(`Invalid date found for activity: ${activity.activitytitle}`, {
-                    activityDate: activity.activitydate,
-                    startDate: meeting.dateRangeStart,
-                    endDate: meeting.dateRangeEnd,
-                  })
-                  return false
-                }
-
-                const isInRange = activityDate >= startDate && activityDate <= endDate
-                return isInRange
-              })
-
-              memberActivities[userId] = filteredActivities
-            } else {
-              console.warn(`Failed to fetch activities for ${userData.user.username}`)
-              memberActivities[userId] = []
-            }
-
-            // Get their goals with timelines
-            const goalsResponse = await fetch(`/api/goals?userId=${userId}`)
-            if (goalsResponse.ok) {
-              const goalsData = await goalsResponse.json()
-
-              // Filter goal timelines within date range
-              const filteredGoals = goalsData.goals
-                .map((goal) => ({
-                  ...goal,
-                  timelines: goal.timelines.filter((timeline) => {
-                    if (!timeline.timelinestartdate || !timeline.timelineenddate) return false
-
-                    const timelineStart = new Date(timeline.timelinestartdate)
-                    const timelineEnd = new Date(timeline.timelineenddate)
-                    const rangeStart = new Date(meeting.dateRangeStart)
-                    const rangeEnd = new Date(meeting.dateRangeEnd)
-
-                    if (
-                      isNaN(timelineStart.getTime()) ||
-                      isNaN(timelineEnd.getTime()) ||
-                      isNaN(rangeStart.getTime()) ||
-                      isNaN(rangeEnd.getTime())
-                    ) {
-                      console.warn(`Invalid date in timeline: ${timeline.timelinetitle}`)
-                      return false
-                    }
-
-                    const overlaps = timelineStart <= rangeEnd && timelineEnd >= rangeStart
-                    return overlaps
-                  }),
-                }))
-                .filter((goal) => goal.timelines.length > 0)
-
-              memberGoals[userId] = filteredGoals
-            } else {
-              console.warn(`Failed to fetch goals for ${userData.user.username}`)
-              memberGoals[userId] = []
-            }
-
-            // Get their team meetings
-            const teamsResponse = await fetch(`/api/teams?userId=${userId}`)
-            if (teamsResponse.ok) {
-              const teamsData = await teamsResponse.json()
-              // Extract all meetings within date range
-              const allMeetings = []
-              teamsData.teams.forEach((team) => {
-                team.meetings.forEach((teamMeeting) => {
-                  const meetingDate = new Date(teamMeeting.meetingdate)
-                  const startDate = new Date(meeting.dateRangeStart)
-                  const endDate = new Date(meeting.dateRangeEnd)
-                  if (meetingDate >= startDate && meetingDate <= endDate) {
-                    allMeetings.push(teamMeeting)
-                  }
-                })
-              })
-              memberTeams[userId] = allMeetings
-            } else {
-              memberTeams[userId] = []
-            }
-          } else {
-            console.warn(`User not found for email: ${email}`)
-            // Add as unknown user for AI analysis
-            teamMembers.push({
-              userid: `unknown_${email}`,
-              username: email.split("@")[0],
-              email: email,
-            })
-            memberActivities[`unknown_${email}`] = []
-            memberGoals[`unknown_${email}`] = []
-            memberTeams[`unknown_${email}`] = []
-          }
-        } catch (error) {
-          console.error(`Error fetching data for ${email}:`, error)
-          // Add as unknown user with empty data
-          teamMembers.push({
-            userid: `unknown_${email}`,
-            username: email.split("@")[0],
-            email: email,
-          })
-          memberActivities[`unknown_${email}`] = []
-          memberGoals[`unknown_${email}`] = []
-          memberTeams[`unknown_${email}`] = []
-        }
-      }
-
-      const allMemberSchedules = {}
-      Object.keys(memberActivities).forEach((userId) => {
-        allMemberSchedules[userId] = {
-          activities: memberActivities[userId] || [],
-          goals: memberGoals[userId] || [],
-          meetings: memberTeams[userId] || [],
-        }
-      })
 
       if (!meeting.dateRangeStart || !meeting.dateRangeEnd) {
         setApiError("Please specify both start and end dates for the meeting range")
@@ -702,28 +359,28 @@ const AddItemModal = ({ isOpen, onClose }) => {
         return
       }
 
-      const aiService = (await import("../services/aiService.js")).default
-      const result = await aiService.findOptimalMeetingTimes(
-        teamMembers,
-        {
-          startDate: meeting.dateRangeStart,
-          endDate: meeting.dateRangeEnd,
-        },
-        meeting.duration,
-        {
-          start: team.teamStartWorkingHour || "09:00",
-          end: team.teamEndWorkingHour || "17:00",
-        },
-        meeting.timePreference,
-        allMemberSchedules,
-      )
+      const response = await fetch(`/api/meetings/suggest`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+          emails: [currentUser.email, ...validEmails],
+          from: meeting.dateRangeStart,
+          to: meeting.dateRangeEnd,
+          duration: meeting.duration,
+          workingHourStart: team.teamStartWorkingHour || "09:00",
+          workingHourEnd: team.teamEndWorkingHour || "17:00",
+          timePreference: meeting.timePreference,
+          rankWithAI: Boolean(meeting.timePreference.trim()),
+        }),
+      })
+      const result = await response.json()
 
-      if (result.success) {
+      if (response.ok && result.success) {
         setAiSuggestions(result.suggestions)
         setSelectedSuggestion(null)
         setShowAISuggestions(true)
       } else {
-        setApiError(result.error || "Failed to generate meeting suggestions")
+        setApiError(result.message || "Failed to generate meeting suggestions")
       }
     } catch (error) {
       console.error("Error in AI scheduling:", error)
@@ -759,21 +416,6 @@ const AddItemModal = ({ isOpen, onClose }) => {
           return
         }
 
-        const overlaps = checkActivityOverlaps(activity)
-        if (overlaps.length > 0) {
-          const overlapDetails = overlaps
-            .map((overlap) => `• ${overlap.title} (${overlap.time}) [${overlap.type}]`)
-            .join("\n")
-
-          const confirmOverlap = window.confirm(
-            `This activity intersects with the following items:\n\n${overlapDetails}\n\nDo you want to continue?`,
-          )
-          if (!confirmOverlap) {
-            setIsLoading(false)
-            return
-          }
-        }
-
         const activityData = {
           userId: getUserId(),
           activityTitle: activity.activityTitle,
@@ -785,15 +427,18 @@ const AddItemModal = ({ isOpen, onClose }) => {
           activityEndTime: activity.activityEndTime,
         }
 
-        const response = await fetch(`/api/activities`, {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify(activityData),
-        })
-
-        const data = await response.json()
+        const result = await saveWithConflictCheck(
+          `/api/activities`,
+          "POST",
+          activityData,
+          (conflicts) =>
+            `This activity intersects with the following items:\n\n${conflicts.map(formatConflict).join("\n")}\n\nDo you want to continue?`,
+        )
+        if (!result) {
+          setIsLoading(false)
+          return
+        }
+        const { response, data } = result
 
         if (response.ok) {
           setSuccessMessage("Activity created successfully!")
@@ -810,38 +455,6 @@ const AddItemModal = ({ isOpen, onClose }) => {
           return
         }
 
-        const allOverlaps = []
-        timelines.forEach((timeline, index) => {
-          if (timeline.timelineTitle.trim() && timeline.timelineStartDate && timeline.timelineEndDate) {
-            const overlaps = checkGoalTimelineOverlaps(timeline)
-            if (overlaps.length > 0) {
-              allOverlaps.push({
-                timelineIndex: index + 1,
-                timelineTitle: timeline.timelineTitle,
-                overlaps: overlaps,
-              })
-            }
-          }
-        })
-
-        if (allOverlaps.length > 0) {
-          let overlapMessage = "The following goal timelines have intersections:\n\n"
-          allOverlaps.forEach(({ timelineIndex, timelineTitle, overlaps }) => {
-            overlapMessage += `Timeline ${timelineIndex} (${timelineTitle}):\n`
-            overlaps.forEach((overlap) => {
-              overlapMessage += `  • ${overlap.title} (${overlap.time}) [${overlap.type}]\n`
-            })
-            overlapMessage += "\n"
-          })
-          overlapMessage += "Do you want to continue?"
-
-          const confirmOverlap = window.confirm(overlapMessage)
-          if (!confirmOverlap) {
-            setIsLoading(false)
-            return
-          }
-        }
-
         const goalData = {
           userId: getUserId(),
           goalTitle: goal.goalTitle,
@@ -857,15 +470,12 @@ const AddItemModal = ({ isOpen, onClose }) => {
           })),
         }
 
-        const response = await fetch(`/api/goals`, {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify(goalData),
-        })
-
-        const data = await response.json()
+        const result = await saveWithConflictCheck(`/api/goals`, "POST", goalData, describeTimelineConflicts)
+        if (!result) {
+          setIsLoading(false)
+          return
+        }
+        const { response, data } = result
 
         if (response.ok) {
           setSuccessMessage("Goal created successfully!")
@@ -910,7 +520,12 @@ const AddItemModal = ({ isOpen, onClose }) => {
         const data = await response.json()
 
         if (response.ok) {
-          setSuccessMessage("Team created successfully!")
+          const unknownEmails = data.unknownEmails || []
+          setSuccessMessage(
+            unknownEmails.length > 0
+              ? `Team created. No account found for: ${unknownEmails.join(", ")}`
+              : "Team created successfully!",
+          )
           setTimeout(() => {
             onClose()
           }, 1500)
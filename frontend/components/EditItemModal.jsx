@@ -8,8 +8,6 @@ const EditItemModal = ({ isOpen, onClose, item }) => {
   const [apiError, setApiError] = useState("")
   const [successMessage, setSuccessMessage] = useState("")
   const [isDeleting, setIsDeleting] = useState(false)
-  const [activities, setActivities] = useState([])
-  const [goals, setGoals] = useState([])
   const [teams, setTeams] = useState([])
 
   const [activity, setActivity] = useState({
@@ -56,36 +54,24 @@ const EditItemModal = ({ isOpen, onClose, item }) => {
     return user.id || null
   }
 
-  // Fetch existing data when modal opens
+  // Fetch teams when a meeting is opened; they are needed to locate the meeting's team
   useEffect(() => {
-    if (isOpen) {
-      fetchExistingData()
+    if (isOpen && item?.type === "meeting") {
+      fetchTeams()
     }
-  }, [isOpen])
+  }, [isOpen, item])
 
-  const fetchExistingData = async () => {
+  const fetchTeams = async () => {
     try {
       const userId = getUserId()
 
-      const activitiesResponse = await fetch(`/api/activities?userId=${userId}`)
-      if (activitiesResponse.ok) {
-        const activitiesData = await activitiesResponse.json()
-        setActivities(activitiesData.activities || [])
-      }
-
-      const goalsResponse = await fetch(`/api/goals?userId=${userId}`)
-      if (goalsResponse.ok) {
-        const goalsData = await goalsResponse.json()
-        setGoals(goalsData.goals || [])
-      }
-
       const teamsResponse = await fetch(`/api/teams?userId=${userId}`)
       if (teamsResponse.ok) {
         const teamsData = await teamsResponse.json()
         setTeams(teamsData.teams || [])
       }
     } catch (error) {
-      console.error("Error fetching existing data:", error)
+      console.error("Error fetching teams:", error)
     }
   }
   
@@ -281,298 +267,48 @@ const EditItemModal = ({ isOpen, onClose, item }) => {
     })
   }
 
-  const checkActivityOverlaps = (newActivity) => {
-    if (!newActivity.activityStartTime || !newActivity.activityEndTime) {
-      return []
-    }
-
-    const newStart = new Date(`${newActivity.activityDate}T${newActivity.activityStartTime}`)
-    const newEnd = new Date(`${newActivity.activityDate}T${newActivity.activityEndTime}`)
-
-    const overlaps = []
-
-    // Check against existing activities (excluding current one)
-    activities.forEach((existingActivity) => {
-      if (existingActivity.activityid === item.id) return // Skip current item
-      if (existingActivity.activitydate !== newActivity.activityDate) return
-      if (!existingActivity.activitystarttime || !existingActivity.activityendtime) return
-
-      const existingStart = new Date(`${existingActivity.activitydate}T${existingActivity.activitystarttime}`)
-      const existingEnd = new Date(`${existingActivity.activitydate}T${existingActivity.activityendtime}`)
-
-      if (newStart < existingEnd && newEnd > existingStart) {
-        overlaps.push({
-          type: "activity",
-          title: existingActivity.activitytitle,
-          time: `${existingActivity.activitystarttime} - ${existingActivity.activityendtime}`,
-        })
-      }
-    })
+  const formatConflict = (conflict) => `• ${conflict.title} (${conflict.time}) [${conflict.type}]`
+
+  // Saves with a server-side conflict check; if the server reports conflicts the user
+  // is asked to confirm and the request is resent without the check.
+  const saveWithConflictCheck = async (url, method, payload, describeConflicts) => {
+    const send = (checkConflicts) =>
+      fetch(url, {
+        method,
+        headers: {
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify({ ...payload, checkConflicts }),
+      })
 
-    // Check against goal timelines
-    goals.forEach((goal) => {
-      if (goal.timelines) {
-        goal.timelines.forEach((timeline) => {
-          const timelineStart = new Date(timeline.timelinestartdate)
-          const timelineEnd = new Date(timeline.timelineenddate)
-          const activityDate = new Date(newActivity.activityDate)
-
-          if (activityDate >= timelineStart && activityDate <= timelineEnd) {
-            if (timeline.timelinestarttime && timeline.timelineendtime) {
-              const timelineStartTime = new Date(`${newActivity.activityDate}T${timeline.timelinestarttime}`)
-              const timelineEndTime = new Date(`${newActivity.activityDate}T${timeline.timelineendtime}`)
-
-              if (newStart < timelineEndTime && newEnd > timelineStartTime) {
-                overlaps.push({
-                  type: "goal",
-                  title: `${goal.goaltitle} - ${timeline.timelinetitle}`,
-                  time: `${timeline.timelinestarttime} - ${timeline.timelineendtime}`,
-                })
-              }
-            } else {
-              overlaps.push({
-                type: "goal",
-                title: `${goal.goaltitle} - ${timeline.timelinetitle}`,
-                time: "All day",
-              })
-            }
-          }
-        })
-      }
-    })
+    let response = await send(true)
+    let data = await response.json()
 
-    // Check against team meetings
-    teams.forEach((team) => {
-      if (team.meetings) {
-        team.meetings.forEach((meeting) => {
-          if (meeting.meetingdate !== newActivity.activityDate) return
-          if (!meeting.meetingstarttime || !meeting.meetingendtime) return
-
-          const meetingStart = new Date(`${meeting.meetingdate}T${meeting.meetingstarttime}`)
-          const meetingEnd = new Date(`${meeting.meetingdate}T${meeting.meetingendtime}`)
-
-          if (newStart < meetingEnd && newEnd > meetingStart) {
-            overlaps.push({
-              type: "meeting",
-              title: meeting.meetingtitle,
-              time: `${meeting.meetingstarttime} - ${meeting.meetingendtime}`,
-            })
-          }
-        })
+    if (response.status === 409 && data.conflicts) {
+      if (!window.confirm(describeConflicts(data.conflicts))) {
+        return null
       }
-    })
-
-    return overlaps
-  }
-
-  // Check for goal timeline overlaps (excluding current item)
-  const checkGoalTimelineOverlaps = (newTimeline) => {
-    const overlaps = []
-
-    if (!newTimeline.timelineStartDate || !newTimeline.timelineEndDate) {
-      return overlaps
+      response = await send(false)
+      data = await response.json()
     }
 
-    const newStart = new Date(newTimeline.timelineStartDate)
-    const newEnd = new Date(newTimeline.timelineEndDate)
-
-    // Check against existing activities
-    activities.forEach((activity) => {
-      const activityDate = new Date(activity.activitydate)
-
-      if (activityDate >= newStart && activityDate <= newEnd) {
-        if (
-          newTimeline.timelineStartTime &&
-          newTimeline.timelineEndTime &&
-          activity.activitystarttime &&
-          activity.activityendtime
-        ) {
-          const timelineStartTime = new Date(`${activity.activitydate}T${newTimeline.timelineStartTime}`)
-          const timelineEndTime = new Date(`${activity.activitydate}T${newTimeline.timelineEndTime}`)
-          const activityStart = new Date(`${activity.activitydate}T${activity.activitystarttime}`)
-          const activityEnd = new Date(`${activity.activitydate}T${activity.activityendtime}`)
-
-          if (timelineStartTime < activityEnd && timelineEndTime > activityStart) {
-            overlaps.push({
-              type: "activity",
-              title: activity.activitytitle,
-              time: `${activity.activitystarttime} - ${activity.activityendtime}`,
-              date: activity.activitydate,
-            })
-          }
-        } else {
-          overlaps.push({
-            type: "activity",
-            title: activity.activitytitle,
-            time: activity.activitystarttime
-              ? `${activity.activitystarttime} - ${activity.activityendtime}`
-              : "All day",
-            date: activity.activitydate,
-          })
-        }
-      }
-    })
-
-    // Check against other goal timelines (excluding current goal)
-    goals.forEach((goal) => {
-      if (goal.goalid === item.id) return // Skip current goal
-      if (goal.timelines) {
-        goal.timelines.forEach((existingTimeline) => {
-          const existingStart = new Date(existingTimeline.timelinestartdate)
-          const existingEnd = new Date(existingTimeline.timelineenddate)
-
-          if (newStart <= existingEnd && newEnd >= existingStart) {
-            if (
-              newTimeline.timelineStartTime &&
-              newTimeline.timelineEndTime &&
-              existingTimeline.timelinestarttime &&
-              existingTimeline.timelineendtime
-            ) {
-              const commonDay = new Date(Math.max(newStart.getTime(), existingStart.getTime()))
-              const newTimelineStartTime = new Date(`${commonDay.toDateString()} ${newTimeline.timelineStartTime}`)
-              const newTimelineEndTime = new Date(`${commonDay.toDateString()} ${newTimeline.timelineEndTime}`)
-              const existingTimelineStartTime = new Date(`${commonDay.toDateString()} ${existingTimeline.timelinestarttime}`)
-              const existingTimelineEndTime = new Date(`${commonDay.toDateString()} ${existingTimeline.timelineendtime}`)
-
-              if (newTimelineStartTime < existingTimelineEndTime && newTimelineEndTime > existingTimelineStartTime) {
-                overlaps.push({
-                  type: "goal",
-                  title: `${goal.goaltitle} - ${existingTimeline.timelinetitle}`,
-                  time: `${existingTimeline.timelinestarttime} - ${existingTimeline.timelineendtime}`,
-                  date: `${existingTimeline.timelinestartdate} to ${existingTimeline.timelineenddate}`,
-                })
-              }
-            }
-          }
-        })
-      }
-    })
-
-    // Check against team meetings
-    teams.forEach((team) => {
-      if (team.meetings) {
-        team.meetings.forEach((meeting) => {
-          const meetingDate = new Date(meeting.meetingdate)
-
-          if (meetingDate >= newStart && meetingDate <= newEnd) {
-            if (
-              newTimeline.timelineStartTime &&
-              newTimeline.timelineEndTime &&
-              meeting.meetingstarttime &&
-              meeting.meetingendtime
-            ) {
-              const timelineStartTime = new Date(`${meeting.meetingdate}T${newTimeline.timelineStartTime}`)
-              const timelineEndTime = new Date(`${meeting.meetingdate}T${newTimeline.timelineEndTime}`)
-              const meetingStart = new Date(`${meeting.meetingdate}T${meeting.meetingstarttime}`)
-              const meetingEnd = new Date(`${meeting.meetingdate}T${meeting.meetingendtime}`)
-
-              if (timelineStartTime < meetingEnd && timelineEndTime > meetingStart) {
-                overlaps.push({
-                  type: "meeting",
-                  title: meeting.meetingtitle,
-                  time: `${meeting.meetingstarttime} - ${meeting.meetingendtime}`,
-                  date: meeting.meetingdate,
-                })
-              }
-            } else {
-              overlaps.push({
-                type: "meeting",
-                title: meeting.meetingtitle,
-                time: meeting.meetingstarttime ? `${meeting.meetingstarttime} - ${meeting.meetingendtime}` : "All day",
-                date: meeting.meetingdate,
-              })
-            }
-          }
-        })
-      }
-    })
-
-    return overlaps
+    return { response, data }
   }
 
-  // Check for meeting overlaps (excluding current item)
-  const checkMeetingOverlaps = (newMeeting) => {
-    if (!newMeeting.meetingStartTime || !newMeeting.meetingEndTime) {
-      return []
-    }
-
-    const newStart = new Date(`${newMeeting.meetingDate}T${newMeeting.meetingStartTime}`)
-    const newEnd = new Date(`${newMeeting.meetingDate}T${newMeeting.meetingEndTime}`)
-
-    const overlaps = []
-
-    // Check against existing activities
-    activities.forEach((activity) => {
-      if (activity.activitydate !== newMeeting.meetingDate) return
-      if (!activity.activitystarttime || !activity.activityendtime) return
-
-      const activityStart = new Date(`${activity.activitydate}T${activity.activitystarttime}`)
-      const activityEnd = new Date(`${activity.activitydate}T${activity.activityendtime}`)
-
-      if (newStart < activityEnd && newEnd > activityStart) {
-        overlaps.push({
-          type: "activity",
-          title: activity.activitytitle,
-          time: `${activity.activitystarttime} - ${activity.activityendtime}`,
-        })
-      }
-    })
-
-    // Check against goal timelines
-    goals.forEach((goal) => {
-      if (goal.timelines) {
-        goal.timelines.forEach((timeline) => {
-          const timelineStart = new Date(timeline.timelinestartdate)
-          const timelineEnd = new Date(timeline.timelineenddate)
-          const meetingDate = new Date(newMeeting.meetingDate)
-
-          if (meetingDate >= timelineStart && meetingDate <= timelineEnd) {
-            if (timeline.timelinestarttime && timeline.timelineendtime) {
-              const timelineStartTime = new Date(`${newMeeting.meetingDate}T${timeline.timelinestarttime}`)
-              const timelineEndTime = new Date(`${newMeeting.meetingDate}T${timeline.timelineendtime}`)
-
-              if (newStart < timelineEndTime && newEnd > timelineStartTime) {
-                overlaps.push({
-                  type: "goal",
-                  title: `${goal.goaltitle} - ${timeline.timelinetitle}`,
-                  time: `${timeline.timelinestarttime} - ${timeline.timelineendtime}`,
-                })
-              }
-            } else {
-              overlaps.push({
-                type: "goal",
-                title: `${goal.goaltitle} - ${timeline.timelinetitle}`,
-                time: "All day",
-              })
-            }
-          }
-        })
-      }
-    })
-
-    // Check against other team meetings (excluding current one)
-    teams.forEach((team) => {
-      if (team.meetings) {
-        team.meetings.forEach((meeting) => {
-          if (meeting.teammeetingid === item.id) return // Skip current meeting
-          if (meeting.meetingdate !== newMeeting.meetingDate) return
-          if (!meeting.meetingstarttime || !meeting.meetingendtime) return
-
-          const meetingStart = new Date(`${meeting.meetingdate}T${meeting.meetingstarttime}`)
-          const meetingEnd = new Date(`${meeting.meetingdate}T${meeting.meetingendtime}`)
-
-          if (newStart < meetingEnd && newEnd > meetingStart) {
-            overlaps.push({
-              type: "meeting",
-              title: meeting.meetingtitle,
-              time: `${meeting.meetingstarttime} - ${meeting.meetingendtime}`,
-            })
-          }
+  const describeTimelineConflicts = (conflicts) => {
+    let overlapMessage = "The following goal timelines have intersections:\n\n"
+    const timelineIndexes = [...new Set(conflicts.map((conflict) => conflict.window))]
+    timelineIndexes.forEach((timelineIndex) => {
+      overlapMessage += `Timeline ${timelineIndex + 1} (${timelines[timelineIndex].timelineTitle}):\n`
+      conflicts
+        .filter((conflict) => conflict.window === timelineIndex)
+        .forEach((conflict) => {
+          overlapMessage += `  ${formatConflict(conflict)}\n`
         })
-      }
+      overlapMessage += "\n"
     })
-
-    return overlaps
+    overlapMessage += "Do you want to continue?"
+    return overlapMessage
   }
 
   // Validate activity form
@@ -632,21 +368,6 @@ const EditItemModal = ({ isOpen, onClose, item }) => {
           return
         }
         
-        const overlaps = checkActivityOverlaps(activity)
-        if (overlaps.length > 0) {
-          const overlapDetails = overlaps
-            .map((overlap) => `• ${overlap.title} (${overlap.time}) [${overlap.type}]`)
-            .join("\n")
-
-          const confirmOverlap = window.confirm(
-            `This activity intersects with the following items:\n\n${overlapDetails}\n\nDo you want to continue?`,
-          )
-          if (!confirmOverlap) {
-            setIsLoading(false)
-            return
-          }
-        }
-
         const activityData = {
           activityTitle: activity.activityTitle,
           activityDescription: activity.activityDescription,
@@ -657,15 +378,18 @@ const EditItemModal = ({ isOpen, onClose, item }) => {
           activityEndTime: activity.activityEndTime,
         }
 
-        const response = await fetch(`/api/activities/${item.id}`, {
-          method: "PUT",
-          headers: {
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify(activityData),
-        })
-
-        const data = await response.json()
+        const result = await saveWithConflictCheck(
+          `/api/activities/${item.id}`,
+          "PUT",
+          activityData,
+          (conflicts) =>
+            `This activity intersects with the following items:\n\n${conflicts.map(formatConflict).join("\n")}\n\nDo you want to continue?`,
+        )
+        if (!result) {
+          setIsLoading(false)
+          return
+        }
+        const { response, data } = result
 
         if (response.ok) {
           setSuccessMessage("Activity updated successfully!")
@@ -684,38 +408,6 @@ const EditItemModal = ({ isOpen, onClose, item }) => {
           return
         }
         
-        const allOverlaps = []
-        timelines.forEach((timeline, index) => {
-          if (timeline.timelineTitle.trim() && timeline.timelineStartDate && timeline.timelineEndDate) {
-            const overlaps = checkGoalTimelineOverlaps(timeline)
-            if (overlaps.length > 0) {
-              allOverlaps.push({
-                timelineIndex: index + 1,
-                timelineTitle: timeline.timelineTitle,
-                overlaps: overlaps,
-              })
-            }
-          }
-        })
-
-        if (allOverlaps.length > 0) {
-          let overlapMessage = "The following goal timelines have intersections:\n\n"
-          allOverlaps.forEach(({ timelineIndex, timelineTitle, overlaps }) => {
-            overlapMessage += `Timeline ${timelineIndex} (${timelineTitle}):\n`
-            overlaps.forEach((overlap) => {
-              overlapMessage += `  • ${overlap.title} (${overlap.time}) [${overlap.type}]\n`
-            })
-            overlapMessage += "\n"
-          })
-          overlapMessage += "Do you want to continue?"
-
-          const confirmOverlap = window.confirm(overlapMessage)
-          if (!confirmOverlap) {
-            setIsLoading(false)
-            return
-          }
-        }
-
         const goalData = {
           goalTitle: goal.goalTitle,
           goalDescription: goal.goalDescription,
@@ -731,15 +423,12 @@ const EditItemModal = ({ isOpen, onClose, item }) => {
           })),
         }
 
-        const response = await fetch(`/api/goals/${item.id}`, {
-          method: "PUT",
-          headers: {
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify(goalData),
-        })
-
-        const data = await response.json()
+        const result = await saveWithConflictCheck(`/api/goals/${item.id}`, "PUT", goalData, describeTimelineConflicts)
+        if (!result) {
+          setIsLoading(false)
+          return
+        }
+        const { response, data } = result
 
         if (response.ok) {
           setSuccessMessage("Goal updated successfully!")
@@ -758,23 +447,6 @@ const EditItemModal = ({ isOpen, onClose, item }) => {
           return
         }
 
-        if (meeting.meetingStartTime && meeting.meetingEndTime) {
-          const overlaps = checkMeetingOverlaps(meeting)
-          if (overlaps.length > 0) {
-            const overlapDetails = overlaps
-              .map((overlap) => `• ${overlap.title} (${overlap.time}) [${overlap.type}]`)
-              .join("\n")
-
-            const confirmOverlap = window.confirm(
-              `This meeting intersects with the following items:\n\n${overlapDetails}\n\nDo you want to continue?`,
-            )
-            if (!confirmOverlap) {
-              setIsLoading(false)
-              return
-            }
-          }
-        }
-        
         const team = teams.find((t) => t.meetings && t.meetings.some((m) => m.teammeetingid === item.id))
         const originalMeeting = team?.meetings.find((m) => m.teammeetingid === item.id)
 
@@ -789,18 +461,28 @@ const EditItemModal = ({ isOpen, onClose, item }) => {
           originalMeeting: originalMeeting,
         }
 
-        const response = await fetch(`/api/meetings/${item.id}`, {
-          method: "PUT",
-          headers: {
-            "Content-Type": "application/json",
-          },
-          body: JSON.stringify(meetingData),
-        })
-
-        const data = await response.json()
+        const result = await saveWithConflictCheck(
+          `/api/meetings/${item.id}`,
+          "PUT",
+          meetingData,
+          (conflicts) =>
+            `This meeting intersects with the following items:\n\n${conflicts
+              .map((conflict) => `${formatConflict(conflict)} for ${conflict.username}`)
+              .join("\n")}\n\nDo you want to continue?`,
+        )
+        if (!result) {
+          setIsLoading(false)
+          return
+        }
+        const { response, data } = result
 
         if (response.ok) {
-          setSuccessMessage("Meeting updated successfully!")
+          const unknownEmails = data.unknownEmails || []
+          setSuccessMessage(
+            unknownEmails.length > 0
+              ? `Meeting updated. No account found for: ${unknownEmails.join(", ")}`
+              : "Meeting updated successfully!",
+          )
           window.dispatchEvent(new CustomEvent("refreshCalendarData"))
           window.dispatchEvent(new CustomEvent("refreshTeamData"))
 
@@ -20,6 +20,8 @@ const GmailInbox = ({ isOpen, onClose }) => {
   const [authError, setAuthError] = useState("")
   const [nextPageToken, setNextPageToken] = useState(null)
   const [isLoadingMore, setIsLoadingMore] = useState(false)
+  const [detectedEvents, setDetectedEvents] = useState({})
+  const [isScanning, setIsScanning] = useState(false)
   const iframeRef = useRef(null)
 
   const decodeHtmlEntities = (text) => {
@@ -244,15 +246,45 @@ const GmailInbox = ({ isOpen, onClose }) => {
     }
   }
 
+  const toAIEmail = (message) => ({
+    id: message.id,
+    subject: message.subject,
+    from: message.from,
+    body: message.body,
+  })
+
+  // Server accepts at most 100 emails per request
+  const handleScanForEvents = async () => {
+    const pending = messages.filter((message) => !(message.id in detectedEvents))
+    if (pending.length === 0) return
+
+    try {
+      setIsScanning(true)
+      for (let start = 0; start < pending.length; start += 100) {
+        await aiService.extractEvents(pending.slice(start, start + 100).map(toAIEmail), (result) => {
+          if (!result.error) {
+            setDetectedEvents((prev) => ({ ...prev, [result.id]: result.events }))
+          }
+        })
+      }
+    } catch (error) {
+      console.error("Error scanning emails for events:", error)
+      alert("Failed to scan emails for events. Please try again.")
+    } finally {
+      setIsScanning(false)
+    }
+  }
+
   const handleForwardToPlanner = async () => {
     if (!selectedMessage) return
 
     try {
       setIsProcessingAI(true)
 
-      // Analyze email content with AI
-      const emailContent = `Subject: ${selectedMessage.subject}\n\nFrom: ${selectedMessage.from}\n\nContent:\n${selectedMessage.body}`
-      const aiResult = await aiService.analyzeEmailForEvents(emailContent)
+      // Reuse the result of an inbox scan when there is one
+      const aiResult = selectedMessage.id in detectedEvents
+        ? { hasEvent: detectedEvents[selectedMessage.id].length > 0, events: detectedEvents[selectedMessage.id] }
+        : await aiService.analyzeEmailForEvents(toAIEmail(selectedMessage))
 
       if (aiResult.hasEvent && aiResult.events.length > 0) {
         // Process each detected event
@@ -385,6 +417,14 @@ const GmailInbox = ({ isOpen, onClose }) => {
                       >
                       <RefreshCw size={16} className={isLoading ? "animate-spin" : ""} />
                       </button>
+                      <button
+                      onClick={handleScanForEvents}
+                      disabled={isScanning || messages.length === 0}
+                      className="p-2 text-gray-600 hover:text-gray-800 disabled:text-gray-400 hover:bg-gray-200 rounded-lg transition-colors"
+                      title={isScanning ? "Scanning for events..." : "Scan emails for events"}
+                      >
+                      <Calendar size={16} className={isScanning ? "animate-pulse" : ""} />
+                      </button>
                   </div>
               </div>
 
@@ -436,6 +476,15 @@ const GmailInbox = ({ isOpen, onClose }) => {
                                 {decodeHtmlEntities(message.from.split("<")[0].trim() || message.from)}
                               </div>
                               {message.isUnread && <div className="w-2 h-2 bg-blue-600 rounded-full flex-shrink-0"></div>}
+                              {detectedEvents[message.id]?.length > 0 && (
+                                <span
+                                  className="flex items-center text-xs text-green-700 flex-shrink-0"
+                                  title={`${detectedEvents[message.id].length} event(s) detected`}
+                                >
+                                  <Calendar size={12} className="mr-0.5" />
+                                  {detectedEvents[message.id].length}
+                                </span>
+                              )}
                             </div>
                             <div
                               className={`text-sm ${message.isUnread ? "font-semibold" : ""} text-gray-700 truncate mb-1`}
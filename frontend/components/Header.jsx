@@ -7,12 +7,11 @@ const Header = ({ currentDate, setCurrentDate, onProfileClick, onNotificationCli
   const [searchQuery, setSearchQuery] = useState("")
   const [searchResults, setSearchResults] = useState([])
   const [showResults, setShowResults] = useState(false)
-  const [activities, setActivities] = useState([])
-  const [goals, setGoals] = useState([])
-  const [teams, setTeams] = useState([])
   const [userProfileData, setUserProfileData] = useState(null)
   const [unreadCount, setUnreadCount] = useState(0)
   const searchRef = useRef(null)
+  const searchTimeoutRef = useRef(null)
+  const searchControllerRef = useRef(null)
 
   const getUserId = () => {
     const storedUser = JSON.parse(localStorage.getItem("user") || "{}")
@@ -23,7 +22,7 @@ const Header = ({ currentDate, setCurrentDate, onProfileClick, onNotificationCli
     try {
       const userId = getUserId()
       if (!userId) return;
-      const response = await fetch(`/api/notifications?userId=${userId}`)
+      const response = await fetch(`/api/notifications/unread-count?userId=${userId}`)
       if (response.ok) {
         const data = await response.json()
         setUnreadCount(data.unreadCount || 0)
@@ -67,11 +66,30 @@ const Header = ({ currentDate, setCurrentDate, onProfileClick, onNotificationCli
   }
 
   useEffect(() => {
-    fetchAllData()
     fetchNotifications()
     fetchUserProfile()
 
-    const notificationInterval = setInterval(fetchNotifications, 30000)
+    // The server pushes unread-count changes; EventSource reconnects with Last-Event-ID on its own.
+    const userId = getUserId()
+    const notificationSource = userId ? new EventSource(`/api/notifications/stream?userId=${userId}`) : null
+    if (notificationSource) {
+      const handleUnread = (event) => setUnreadCount(JSON.parse(event.data).unreadCount || 0)
+      notificationSource.addEventListener("ready", handleUnread)
+      notificationSource.addEventListener("unread", handleUnread)
+      notificationSource.addEventListener("notification", () => {
+        window.dispatchEvent(new CustomEvent("notificationReceived"))
+      })
+    }
+    // A refused stream (503 when the server has too many open) is not retried by EventSource;
+    // fall back to polling the unread count.
+    let pollInterval = null
+    if (notificationSource) {
+      notificationSource.onerror = () => {
+        if (notificationSource.readyState === EventSource.CLOSED && !pollInterval) {
+          pollInterval = setInterval(fetchNotifications, 30000)
+        }
+      }
+    }
     
     const handleNotificationsUpdate = () => fetchNotifications()
     window.addEventListener("notificationsUpdated", handleNotificationsUpdate)
@@ -80,118 +98,68 @@ const Header = ({ currentDate, setCurrentDate, onProfileClick, onNotificationCli
     window.addEventListener("profileUpdated", handleProfileUpdate)
 
     return () => {
-      clearInterval(notificationInterval)
+      if (notificationSource) notificationSource.close()
+      if (pollInterval) clearInterval(pollInterval)
       window.removeEventListener("notificationsUpdated", handleNotificationsUpdate)
       window.removeEventListener("profileUpdated", handleProfileUpdate)
     }
   }, [dataUpdateTrigger])
 
-  const fetchAllData = async () => {
-    try {
-      const userId = getUserId()
-      if (!userId) return;
-
-      const [activitiesRes, goalsRes, teamsRes] = await Promise.all([
-        fetch(`/api/activities?userId=${userId}`),
-        fetch(`/api/goals?userId=${userId}`),
-        fetch(`/api/teams?userId=${userId}`)
-      ]);
-      
-      if (activitiesRes.ok) {
-        const activitiesData = await activitiesRes.json()
-        setActivities(activitiesData.activities || [])
-      } else {
-        console.error("Failed to fetch activities:", activitiesRes.status)
-      }
-
-      if (goalsRes.ok) {
-        const goalsData = await goalsRes.json()
-        setGoals(goalsData.goals || [])
-      } else {
-        console.error("Failed to fetch goals:", goalsRes.status)
-      }
-
-      if (teamsRes.ok) {
-        const teamsData = await teamsRes.json()
-        setTeams(teamsData.teams || [])
-      } else {
-        console.error("Failed to fetch teams:", teamsRes.status)
-      }
-    } catch (error) {
-      console.error("Error fetching data:", error)
+  const toSearchResult = (result) => {
+    const { item } = result
+    let subtitle = ""
+    if (result.type === "activity") {
+      subtitle = `Activity - ${item.activitydate}`
+    } else if (result.type === "goal") {
+      subtitle = `Goal - ${item.timelinestartdate} to ${item.timelineenddate}`
+    } else if (result.type === "meeting") {
+      subtitle = `Meeting - ${item.teamname} - ${item.meetingdate}`
+    }
+    return {
+      id: result.id,
+      type: result.type,
+      timelineId: result.timelineid || null,
+      title: result.title,
+      subtitle,
+      data: item,
     }
   }
 
+  // Searches on the server after a short pause in typing; older in-flight searches are aborted.
   const performSearch = (query) => {
+    clearTimeout(searchTimeoutRef.current)
+    if (searchControllerRef.current) searchControllerRef.current.abort()
+
     if (!query.trim()) {
       setSearchResults([])
       setShowResults(false)
       return
     }
 
-    const results = []
-    const lowerQuery = query.toLowerCase()
-
-    activities.forEach((activity) => {
-      if (activity.activitytitle?.toLowerCase().includes(lowerQuery)) {
-        results.push({
-          id: activity.activityid,
-          type: "activity",
-          title: activity.activitytitle,
-          subtitle: `Activity - ${activity.activitydate}`,
-          data: activity,
-        })
-      }
-    })
-
-    goals.forEach((goal) => {
-      if (goal.timelines) {
-        goal.timelines.forEach((timeline) => {
-          const goalTimelineTitle = `${goal.goaltitle} - ${timeline.timelinetitle}`
-          if (
-            goalTimelineTitle.toLowerCase().includes(lowerQuery) ||
-            goal.goaltitle?.toLowerCase().includes(lowerQuery) ||
-            timeline.timelinetitle?.toLowerCase().includes(lowerQuery)
-          ) {
-            results.push({
-              id: goal.goalid,
-              type: "goal",
-              timelineId: timeline.timelineid,
-              title: goalTimelineTitle,
-              subtitle: `Goal - ${timeline.timelinestartdate} to ${timeline.timelineenddate}`,
-              data: { ...goal, ...timeline },
-            })
-          }
-        })
-      }
-    })
-
-    teams.forEach((team) => {
-      if (team.meetings) {
-        team.meetings.forEach((meeting) => {
-          if (meeting.meetingtitle?.toLowerCase().includes(lowerQuery)) {
-            results.push({
-              id: meeting.teammeetingid,
-              type: "meeting",
-              title: meeting.meetingtitle,
-              subtitle: `Meeting - ${team.teamname} - ${meeting.meetingdate}`,
-              data: { ...meeting, teamname: team.teamname },
-            })
-          }
-        })
+    searchTimeoutRef.current = setTimeout(async () => {
+      const userId = getUserId()
+      if (!userId) return
+
+      const controller = new AbortController()
+      searchControllerRef.current = controller
+      try {
+        const response = await fetch(
+          `/api/search?userId=${userId}&q=${encodeURIComponent(query.trim())}&limit=10`,
+          { signal: controller.signal },
+        )
+        if (response.ok) {
+          const data = await response.json()
+          setSearchResults((data.results || []).map(toSearchResult))
+          setShowResults(true)
+        } else {
+          console.error("Failed to search:", response.status)
+        }
+      } catch (error) {
+        if (error.name !== "AbortError") {
+          console.error("Error searching:", error)
+        }
       }
-    })
-
-    results.sort((a, b) => {
-      const aExact = a.title.toLowerCase() === lowerQuery
-      const bExact = b.title.toLowerCase() === lowerQuery
-      if (aExact && !bExact) return -1
-      if (!aExact && bExact) return 1
-      return a.title.localeCompare(b.title)
-    })
-
-    setSearchResults(results.slice(0, 10))
-    setShowResults(true)
+    }, 150)
   }
 
   const handleSearchChange = (e) => {
@@ -201,6 +169,7 @@ const Header = ({ currentDate, setCurrentDate, onProfileClick, onNotificationCli
   }
 
   const handleResultClick = (result) => {
+    clearTimeout(searchTimeoutRef.current)
     setSearchQuery("")
     setSearchResults([])
     setShowResults(false)
@@ -243,6 +212,7 @@ const Header = ({ currentDate, setCurrentDate, onProfileClick, onNotificationCli
     document.addEventListener("mousedown", handleClickOutside)
     return () => {
       document.removeEventListener("mousedown", handleClickOutside)
+      clearTimeout(searchTimeoutRef.current)
     }
   }, [])
 
@@ -267,6 +237,7 @@ const Header = ({ currentDate, setCurrentDate, onProfileClick, onNotificationCli
   }
 
   const clearSearch = () => {
+    clearTimeout(searchTimeoutRef.current)
     setSearchQuery("")
     setSearchResults([])
     setShowResults(false)
@@ -132,6 +132,10 @@ const NotificationSidebar = ({ isOpen, onClose }) => {
   useEffect(() => {
     if (isOpen) {
       fetchNotifications()
+
+      const handleNotificationReceived = () => fetchNotifications()
+      window.addEventListener("notificationReceived", handleNotificationReceived)
+      return () => window.removeEventListener("notificationReceived", handleNotificationReceived)
     }
   }, [isOpen])
 
@@ -499,119 +499,6 @@ const ProfileSidebar = ({ isOpen, onClose, setCurrentDate }) => {
         return
       }
 
-      const allMemberEmails = [user.useremail, ...validEmails]
-
-      const memberActivities = {}
-      const teamMembers = []
-      const memberGoals = {}
-      const memberTeams = {}
-
-      for (const email of allMemberEmails) {
-        try {
-          const userResponse = await fetch(`/api/users/by-email/${encodeURIComponent(email)}`)
-
-          if (userResponse.ok) {
-            const userData = await userResponse.json()
-            const userId = userData.user.userid
-
-            teamMembers.push({
-              userid: userId,
-              username: userData.user.username,
-              email: userData.user.useremail,
-            })
-
-            const activitiesResponse = await fetch(`/api/activities?userId=${userId}`)
-            if (activitiesResponse.ok) {
-              const activitiesData = await activitiesResponse.json()
-              const filteredActivities = activitiesData.activities.filter((activity) => {
-                if (!activity.activitydate) return false
-                const activityDate = new Date(activity.activitydate)
-                const startDate = new Date(newMeeting.dateRangeStart)
-                const endDate = new Date(newMeeting.dateRangeEnd)
-                if (isNaN(activityDate.getTime()) || isNaN(startDate.getTime()) || isNaN(endDate.getTime())) {
-                  return false
-                }
-                return activityDate >= startDate && activityDate <= endDate
-              })
-              memberActivities[userId] = filteredActivities
-            } else {
-              memberActivities[userId] = []
-            }
-
-            const goalsResponse = await fetch(`/api/goals?userId=${userId}`)
-            if (goalsResponse.ok) {
-              const goalsData = await goalsResponse.json()
-              const filteredGoals = goalsData.goals
-                .map((goal) => ({
-                  ...goal,
-                  timelines: goal.timelines.filter((timeline) => {
-                    if (!timeline.timelinestartdate || !timeline.timelineenddate) return false
-                    const timelineStart = new Date(timeline.timelinestartdate)
-                    const timelineEnd = new Date(timeline.timelineenddate)
-                    const rangeStart = new Date(newMeeting.dateRangeStart)
-                    const rangeEnd = new Date(newMeeting.dateRangeEnd)
-                    if ( isNaN(timelineStart.getTime()) || isNaN(timelineEnd.getTime()) || isNaN(rangeStart.getTime()) || isNaN(rangeEnd.getTime())) {
-                      return false
-                    }
-                    return timelineStart <= rangeEnd && timelineEnd >= rangeStart
-                  }),
-                }))
-                .filter((goal) => goal.timelines.length > 0)
-              memberGoals[userId] = filteredGoals
-            } else {
-              memberGoals[userId] = []
-            }
-
-            const teamsResponse = await fetch(`/api/teams?userId=${userId}`)
-            if (teamsResponse.ok) {
-              const teamsData = await teamsResponse.json()
-              const allMeetings = []
-              teamsData.teams.forEach((team) => {
-                team.meetings.forEach((teamMeeting) => {
-                  const meetingDate = new Date(teamMeeting.meetingdate)
-                  const startDate = new Date(newMeeting.dateRangeStart)
-                  const endDate = new Date(newMeeting.dateRangeEnd)
-                  if (meetingDate >= startDate && meetingDate <= endDate) {
-                    allMeetings.push(teamMeeting)
-                  }
-                })
-              })
-              memberTeams[userId] = allMeetings
-            } else {
-              memberTeams[userId] = []
-            }
-          } else {
-            teamMembers.push({
-              userid: `unknown_${email}`,
-              username: email.split("@")[0],
-              email: email,
-            })
-            memberActivities[`unknown_${email}`] = []
-            memberGoals[`unknown_${email}`] = []
-            memberTeams[`unknown_${email}`] = []
-          }
-        } catch (error) {
-          console.error(`Error fetching data for ${email}:`, error)
-          teamMembers.push({
-            userid: `unknown_${email}`,
-            username: email.split("@")[0],
-            email: email,
-          })
-          memberActivities[`unknown_${email}`] = []
-          memberGoals[`unknown_${email}`] = []
-          memberTeams[`unknown_${email}`] = []
-        }
-      }
-
-      const allMemberSchedules = {}
-      Object.keys(memberActivities).forEach((userId) => {
-        allMemberSchedules[userId] = {
-          activities: memberActivities[userId] || [],
-          goals: memberGoals[userId] || [],
-          meetings: memberTeams[userId] || [],
-        }
-      })
-
       if (!newMeeting.dateRangeStart || !newMeeting.dateRangeEnd) {
         setError("Please specify both start and end dates for the meeting range")
         setIsLoadingAI(false)
@@ -626,28 +513,29 @@ const ProfileSidebar = ({ isOpen, onClose, setCurrentDate }) => {
         return
       }
 
-      const aiService = (await import("../services/aiService.js")).default
-      const result = await aiService.findOptimalMeetingTimes(
-        teamMembers,
-        {
-          startDate: newMeeting.dateRangeStart,
-          endDate: newMeeting.dateRangeEnd,
-        },
-        newMeeting.duration,
-        {
-          start: teamDetails.teamstartworkinghour || "09:00",
-          end: teamDetails.teamendworkinghour || "17:00",
-        },
-        newMeeting.timePreference,
-        allMemberSchedules,
-      )
+      const response = await fetch(`/api/meetings/suggest`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({
+          emails: [user.useremail, ...validEmails],
+          from: newMeeting.dateRangeStart,
+          to: newMeeting.dateRangeEnd,
+          duration: newMeeting.duration,
+          teamId: teamDetails.teamid,
+          workingHourStart: teamDetails.teamstartworkinghour || "09:00",
+          workingHourEnd: teamDetails.teamendworkinghour || "17:00",
+          timePreference: newMeeting.timePreference,
+          rankWithAI: Boolean(newMeeting.timePreference.trim()),
+        }),
+      })
+      const result = await response.json()
 
-      if (result.success) {
+      if (response.ok && result.success) {
         setAiSuggestions(result.suggestions)
         setSelectedSuggestion(null)
         setShowAISuggestions(true)
       } else {
-        setError(result.error || "Failed to generate meeting suggestions")
+        setError(result.message || "Failed to generate meeting suggestions")
       }
     } catch (error) {
       console.error("Error in AI scheduling:", error)
@@ -691,7 +579,13 @@ const ProfileSidebar = ({ isOpen, onClose, setCurrentDate }) => {
       })
 
       if (response.ok) {
-        setSuccess("Meeting added successfully!")
+        const data = await response.json()
+        const unknownEmails = data.unknownEmails || []
+        setSuccess(
+          unknownEmails.length > 0
+            ? `Meeting added. No account found for: ${unknownEmails.join(", ")}`
+            : "Meeting added successfully!",
+        )
         setIsAddingMeeting(false)
         setNewMeeting({
           meetingTitle: "",